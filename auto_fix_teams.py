@@ -5,29 +5,14 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tipsgolbr_config.settings')
 django.setup()
 
-from tips_core.models import Team, Tip
+from django.core.management import call_command
 
 def fix():
-    print("Iniciando varredura de nomes nas Tips...")
-    
-    # Busca nomes de times que foram escritos mas não têm objeto Team vinculado
-    # ou que existem apenas como texto nas dicas antigas.
-    tips = Tip.objects.all()
-    count_criados = 0
-
-    for tip in tips:
-        # Se você tiver campos de texto ou se os ForeignKeys estiverem vazios,
-        # esse script tenta recuperar o vínculo.
-        if tip.home_team:
-            obj, created = Team.objects.get_or_create(name=tip.home_team.name)
-            if created: count_criados += 1
-            
-        if tip.away_team:
-            obj, created = Team.objects.get_or_create(name=tip.away_team.name)
-            if created: count_criados += 1
-
-    print(f"Varredura concluída!")
-    print(f"Total de times agora no banco: {Team.objects.count()}")
+    # A unificação agora é feita em massa pelo comando de gerenciamento
+    # (equivalente a: python manage.py deduplicar_times). Só nomes idênticos
+    # após a normalização; nomes parecidos exigem revisão com --simular/--confirmar.
+    print("Iniciando unificação de times duplicados...")
+    call_command('deduplicar_times', limite=1.0)
 
 if __name__ == "__main__":
-    fix()
\ No newline at end of file
+    fix()
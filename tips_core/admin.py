@@ -1,10 +1,26 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from . import exportacao
 # Adicionado Team e Assinatura à importação para garantir que tudo funcione
-from .models import CustomUser, Tip, Noticia, PromocaoBanner, Team, Assinatura 
+from .models import CustomUser, Tip, Noticia, PromocaoBanner, Team, Assinatura, EstadoFeed, ResumoDesempenho, TeamStats, TeamAlias, NotificacaoPagSeguro, Plan, SubscriptionPeriod
 
 # --- 1. Configuração Customizada para o Modelo de Usuário ---
+class SubscriptionPeriodInline(admin.TabularInline):
+    model = SubscriptionPeriod
+    extra = 0
+    fields = ('plan', 'inicio', 'fim', 'origem', 'transacao')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class CustomUserAdmin(UserAdmin):
+    # Histórico de períodos pagos (a expiração efetiva é o maior "fim")
+    inlines = [SubscriptionPeriodInline]
     # Campos que você quer que apareçam no formulário de edição de usuário
     fieldsets = UserAdmin.fieldsets + (
         ('Informações Premium', {'fields': ('is_premium_member', 'premium_expiration_date',)}),
@@ -19,10 +35,26 @@ class CustomUserAdmin(UserAdmin):
 admin.site.register(CustomUser, CustomUserAdmin)
 
 # --- NOVO: Registro do Modelo de Times (Cadastro Profissional) ---
+class TeamAliasInline(admin.TabularInline):
+    model = TeamAlias
+    extra = 0
+    fields = ('nome', 'criado_em')
+    readonly_fields = ('criado_em',)
+
+
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
     list_display = ('name', 'logo')
     search_fields = ('name',)
+    # Grafias antigas que apontam para este time (ver comando deduplicar_times)
+    inlines = [TeamAliasInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Mesma busca da lista pública: ignora acentos e ordena por relevância.
+        # Também atende o autocomplete dos times no cadastro de Tips.
+        if not search_term:
+            return queryset, False
+        return queryset.buscar(search_term), False
 
 
 # --- 2. Registro do Modelo de Dica (Tip) ---
@@ -52,6 +84,49 @@ class TipAdmin(admin.ModelAdmin):
     # PERMITE EDITAR O PLACAR E O STATUS DIRETO NA LISTA (Muito útil para estatísticas)
     list_editable = ('score_home', 'score_away', 'status', 'is_active')
 
+    # Seleção de times com busca (autocomplete), em vez de um <select> com todos os times
+    autocomplete_fields = ('home_team', 'away_team')
+
+    actions = ['exportar_historico_csv']
+
+    @admin.action(description='Exportar histórico selecionado (CSV.gz)')
+    def exportar_historico_csv(self, request, queryset):
+        # Gerado em lotes direto na resposta, sem montar o arquivo em memória
+        linhas = exportacao.consulta_historico(queryset=queryset)
+        response = StreamingHttpResponse(
+            exportacao.gerar_csv_gz(exportacao.iterar_lotes(linhas)),
+            content_type='application/gzip',
+        )
+        response['Content-Disposition'] = 'attachment; filename="tips_historico.csv.gz"'
+        return response
+
+
+# --- 2.1 Resumo Mensal de Desempenho (mantido automaticamente pelas Tips) ---
+@admin.register(ResumoDesempenho)
+class ResumoDesempenhoAdmin(admin.ModelAdmin):
+    list_display = ('ano', 'mes', 'method', 'total_aposta', 'lucro_liquido', 'total_wins', 'total_losses', 'ultima_data')
+    list_filter = ('ano', 'method')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# --- 2.2 Estatísticas por Time (mantidas automaticamente pelas Tips) ---
+@admin.register(TeamStats)
+class TeamStatsAdmin(admin.ModelAdmin):
+    list_display = ('team', 'total_jogos', 'odd_media', 'ultimo_metodo', 'ultima_data')
+    search_fields = ('team__name',)
+    list_select_related = ('team',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 # --- 3. Registro do Modelo de Notícia ---
 @admin.register(Noticia)
@@ -64,6 +139,13 @@ class NoticiaAdmin(admin.ModelAdmin):
     search_fields = ('titulo', 'resumo')
 
 
+# --- 3.1 Estado dos Feeds RSS (somente leitura, mantido pelo extrator) ---
+@admin.register(EstadoFeed)
+class EstadoFeedAdmin(admin.ModelAdmin):
+    list_display = ('url', 'etag', 'last_modified', 'ultima_consulta')
+    readonly_fields = ('ultimos_ids',)
+
+
 # --- 4. NOVO: Registro do Modelo de Promoção/Banner ---
 @admin.register(PromocaoBanner)
 class PromocaoBannerAdmin(admin.ModelAdmin):
@@ -77,4 +159,61 @@ class PromocaoBannerAdmin(admin.ModelAdmin):
     list_editable = ('ativo', 'ordem')
 
 # --- 5. Registro do Modelo de Assinatura ---
-admin.site.register(Assinatura)
\ No newline at end of file
+@admin.register(Assinatura)
+class AssinaturaAdmin(admin.ModelAdmin):
+    list_display = ('user', 'is_active', 'start_date')
+    list_filter = ('is_active',)
+    search_fields = ('user__username', 'user__email')
+    list_select_related = ('user',)
+    actions = ['ativar_assinaturas', 'desativar_assinaturas']
+
+    # Ações em massa: um UPDATE nas assinaturas e um nos usuários, sem signals por linha
+    def _alterar(self, request, queryset, ativa):
+        user_ids = list(queryset.exclude(is_active=ativa).values_list('user_id', flat=True))
+        queryset.filter(user_id__in=user_ids).update(is_active=ativa)
+        Assinatura.sincronizar_usuarios(user_ids, ativa)
+        self.message_user(request, f'{len(user_ids)} assinaturas atualizadas.')
+
+    @admin.action(description='Ativar assinaturas selecionadas')
+    def ativar_assinaturas(self, request, queryset):
+        self._alterar(request, queryset, True)
+
+    @admin.action(description='Desativar assinaturas selecionadas')
+    def desativar_assinaturas(self, request, queryset):
+        self._alterar(request, queryset, False)
+
+
+# --- 5.1 Caixa de Entrada de Notificações do PagSeguro ---
+@admin.register(NotificacaoPagSeguro)
+class NotificacaoPagSeguroAdmin(admin.ModelAdmin):
+    list_display = ('codigo', 'status', 'referencia', 'status_transacao', 'credito_aplicado', 'tentativas', 'recebida_em')
+    list_filter = ('status', 'credito_aplicado')
+    search_fields = ('codigo', 'transacao', 'referencia')
+    readonly_fields = [campo.name for campo in NotificacaoPagSeguro._meta.fields]
+    actions = ['reprocessar']
+
+    @admin.action(description='Reprocessar notificações selecionadas')
+    def reprocessar(self, request, queryset):
+        total = queryset.exclude(status='PROCESSADA').update(
+            status='PENDENTE', tentativas=0, proxima_tentativa=timezone.now(),
+        )
+        self.message_user(request, f'{total} notificações voltaram para a fila.')
+
+    def has_add_permission(self, request):
+        return False
+
+
+# --- 5.2 Planos de Assinatura e Histórico de Períodos ---
+@admin.register(Plan)
+class PlanAdmin(admin.ModelAdmin):
+    list_display = ('nome', 'duracao_meses', 'duracao_dias', 'preco', 'ativo', 'ordem', 'atualizado_em')
+    list_editable = ('preco', 'ativo', 'ordem')
+
+
+@admin.register(SubscriptionPeriod)
+class SubscriptionPeriodAdmin(admin.ModelAdmin):
+    list_display = ('user', 'plan', 'inicio', 'fim', 'origem', 'transacao')
+    list_filter = ('origem', 'plan')
+    search_fields = ('user__username', 'transacao')
+    list_select_related = ('user', 'plan')
+    raw_id_fields = ('user',)
@@ -0,0 +1,120 @@
+# tips_core/cache_pagina.py
+# Cache de página inteira para visitantes não logados, com ETag forte e 304.
+#
+# A versão de cada página é montada a partir do próprio banco (a maior
+# data_extracao das notícias, a última alteração dos banners/planos) e do
+# hash do deploy. Por vir do banco, é a mesma em todos os workers, e o
+# navegador/CDN que já tem a página recebe 304 sem nada ser renderizado.
+
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .models import Noticia, PromocaoBanner, Plan, ResumoDesempenho
+
+# O conteúdo em cache só é lido pela versão atual; o TTL só limpa as antigas
+PAGINA_CACHE_TTL = 60 * 60 * 24
+# Navegador revalida sempre (If-None-Match); a CDN pode servir por alguns minutos
+CACHE_CONTROL_PUBLICO = {'public': True, 'max_age': 0, 's_maxage': 300, 'stale_while_revalidate': 60}
+
+# --- O QUE CADA PÁGINA PODE MUDAR ---
+# Cada dependência devolve um valor que muda quando o conteúdo muda. A
+# contagem cobre as exclusões, que não alteram as datas.
+DEPENDENCIAS = {
+    'noticias': lambda: tuple(Noticia.objects.aggregate(ultima=Max('data_extracao'), total=Count('id')).values()),
+    'banners': lambda: tuple(PromocaoBanner.objects.aggregate(ultima=Max('atualizado_em'), total=Count('id')).values()),
+    'planos': lambda: tuple(Plan.objects.aggregate(ultima=Max('atualizado_em'), total=Count('id')).values()),
+    'resumos': lambda: tuple(ResumoDesempenho.objects.aggregate(ultima=Max('atualizado_em'), total=Count('id')).values()),
+}
+
+
+def versao_dependencia(request, dependencia):
+    """
+    Versão atual de uma dependência, lida do banco uma vez por requisição.
+    Também é a chave dos fragmentos em cache do template: como vem do banco,
+    vale para todos os processos (o extrator no cron, o admin, as threads).
+    """
+    versoes = request.__dict__.setdefault('_versoes_dependencias', {})
+    if dependencia not in versoes:
+        versoes[dependencia] = DEPENDENCIAS[dependencia]()
+    return versoes[dependencia]
+
+
+def endereco_da_pagina(request, parametros):
+    """
+    Caminho + parâmetros da query string que mudam a página (`parametros`),
+    em ordem fixa. None se a URL tiver qualquer outro parâmetro: essas
+    variantes (?utm_..., ?x=<aleatório>) não entram no cache.
+    """
+    if set(request.GET) - set(parametros):
+        return None
+    query = urlencode(sorted((chave, valor) for chave in parametros for valor in request.GET.getlist(chave)))
+    return f'{request.path}?{query}' if query else request.path
+
+
+def calcular_etag(request, nome, dependencias, endereco):
+    """ETag forte da página: deploy + endereço + versão de cada dependência."""
+    partes = [settings.DEPLOY_VERSION, nome, endereco]
+    partes += [f'{dependencia}={versao_dependencia(request, dependencia)}' for dependencia in dependencias]
+    return '"%s"' % hashlib.sha1('|'.join(partes).encode()).hexdigest()
+
+
+def _etag_confere(request, etag):
+    recebidos = request.headers.get('If-None-Match', '')
+    return recebidos.strip() == '*' or etag in [valor.strip() for valor in recebidos.split(',')]
+
+
+def _cabecalhos_publicos(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, **CACHE_CONTROL_PUBLICO)
+    # Quem tem cookie de sessão (logado) não pode receber a versão pública
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def cache_pagina_anonima(*dependencias, parametros=()):
+    """
+    Decorator das views públicas. Para visitantes não logados (GET/HEAD):
+    responde 304 se o If-None-Match confere, serve a página do cache se a
+    versão atual já foi renderizada, ou renderiza e guarda. Logados e URLs
+    com parâmetros fora de `parametros` (os que mudam a página; nenhum por
+    padrão) passam direto, com Cache-Control: private.
+    """
+    def decorator(view):
+        nome = f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def _view(request, *args, **kwargs):
+            endereco = endereco_da_pagina(request, parametros)
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated or endereco is None:
+                response = view(request, *args, **kwargs)
+                patch_cache_control(response, private=True)
+                return response
+
+            etag = calcular_etag(request, nome, dependencias, endereco)
+            if _etag_confere(request, etag):
+                return _cabecalhos_publicos(HttpResponseNotModified(), etag)
+
+            chave = f'pagina:{etag}'
+            guardada = cache.get(chave)
+            if guardada is not None:
+                conteudo, content_type = guardada
+                return _cabecalhos_publicos(HttpResponse(conteudo, content_type=content_type), etag)
+
+            response = view(request, *args, **kwargs)
+            # Página que usou o token CSRF é pessoal: não pode ser compartilhada
+            if response.status_code != 200 or response.streaming or request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+                patch_cache_control(response, private=True)
+                return response
+
+            cache.set(chave, (response.content, response['Content-Type']), PAGINA_CACHE_TTL)
+            return _cabecalhos_publicos(response, etag)
+
+        return _view
+    return decorator
@@ -0,0 +1,57 @@
+# tips_core/cache_versionado.py
+
+from django.core.cache import cache
+
+# ----------------------------------------------------------------
+# --- CONTADORES DE VERSÃO PARA INVALIDAÇÃO PRECISA DO CACHE ---
+# ----------------------------------------------------------------
+# Cada conjunto de dados (ex.: 'dashboard') tem um contador guardado no cache.
+# As chaves dos resultados incluem a versão atual; quando os dados mudam,
+# basta incrementar o contador e as entradas antigas deixam de ser lidas
+# (e expiram sozinhas pelo TTL / MAX_ENTRIES do backend).
+
+
+def _chave_versao(nome):
+    return f'versao:{nome}'
+
+
+def versao(nome):
+    """Versão atual do conjunto de dados `nome` (começa em 1)."""
+    return cache.get_or_set(_chave_versao(nome), 1, timeout=None)
+
+
+def incrementar_versao(nome):
+    """Invalida todas as entradas em cache do conjunto de dados `nome`."""
+    try:
+        return cache.incr(_chave_versao(nome))
+    except ValueError:
+        # Contador ainda não existe (ou foi descartado pelo backend)
+        cache.set(_chave_versao(nome), 2, timeout=None)
+        return 2
+
+
+def chave(nome, *partes):
+    """Monta a chave de um resultado já com a versão atual embutida."""
+    return ':'.join([nome, f'v{versao(nome)}', *map(str, partes)])
+
+
+# --- ESTATÍSTICAS DE ACERTO ---
+
+def registrar_acesso(nome, acerto):
+    contador = f'estatisticas:{nome}:{"hits" if acerto else "misses"}'
+    try:
+        cache.incr(contador)
+    except ValueError:
+        cache.set(contador, 1, timeout=None)
+
+
+def estatisticas(nome):
+    hits = cache.get(f'estatisticas:{nome}:hits', 0)
+    misses = cache.get(f'estatisticas:{nome}:misses', 0)
+    total = hits + misses
+    return {
+        'versao': versao(nome),
+        'hits': hits,
+        'misses': misses,
+        'taxa_acerto': round(hits / total, 4) if total else None,
+    }
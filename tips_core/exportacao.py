@@ -0,0 +1,147 @@
+# tips_core/exportacao.py
+# Exportação do histórico de Tips (com os nomes dos times) para análise offline.
+# Parquet quando o pyarrow está instalado; senão, CSV compactado com gzip.
+# As linhas são lidas com iterator(chunk_size=...) e gravadas lote a lote,
+# então a memória usada não cresce com o tamanho do histórico.
+
+import csv
+import gzip
+import io
+from datetime import datetime, time
+
+from django.utils import timezone
+
+from .models import Tip
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+TAMANHO_LOTE = 5000
+
+# (coluna no arquivo, lookup no ORM)
+COLUNAS = [
+    ('id', 'id'),
+    ('match_date', 'match_date'),
+    ('league', 'league'),
+    ('home_team', 'home_team__name'),
+    ('away_team', 'away_team__name'),
+    ('method', 'method'),
+    ('odd_value', 'odd_value'),
+    ('score_home', 'score_home'),
+    ('score_away', 'score_away'),
+    ('status', 'status'),
+    ('access_level', 'access_level'),
+    ('is_active', 'is_active'),
+    ('valor_aposta', 'valor_aposta'),
+    ('valor_ganho', 'valor_ganho'),
+    ('valor_perda', 'valor_perda'),
+]
+COLUNAS_DECIMAIS = {'odd_value', 'valor_aposta', 'valor_ganho', 'valor_perda'}
+
+
+def parquet_disponivel():
+    return pa is not None
+
+
+def consulta_historico(desde=None, ate=None, queryset=None):
+    """
+    Linhas do histórico em ordem de data, já com os nomes dos times (JOIN).
+    `desde` e `ate` são datas locais inclusivas, para exportações incrementais.
+    """
+    queryset = Tip.objects.all() if queryset is None else queryset
+    if desde:
+        queryset = queryset.filter(match_date__gte=timezone.make_aware(datetime.combine(desde, time.min)))
+    if ate:
+        queryset = queryset.filter(match_date__lte=timezone.make_aware(datetime.combine(ate, time.max)))
+    return queryset.order_by('match_date', 'id').values_list(*[lookup for _, lookup in COLUNAS])
+
+
+def iterar_lotes(linhas, tamanho_lote=TAMANHO_LOTE):
+    """Agrupa as linhas em lotes, lendo do banco com cursor no servidor (Postgres)."""
+    lote = []
+    for linha in linhas.iterator(chunk_size=tamanho_lote):
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+# --- PARQUET ---
+def _esquema_parquet():
+    tipos = {
+        'id': pa.int64(),
+        'match_date': pa.timestamp('us', tz='UTC'),
+        'score_home': pa.int32(),
+        'score_away': pa.int32(),
+        'is_active': pa.bool_(),
+    }
+    return pa.schema([
+        (nome, tipos.get(nome, pa.float64() if nome in COLUNAS_DECIMAIS else pa.string()))
+        for nome, _ in COLUNAS
+    ])
+
+
+def exportar_parquet(caminho, linhas, tamanho_lote=TAMANHO_LOTE):
+    """Grava um arquivo Parquet (um row group por lote) e devolve o total de linhas."""
+    if pa is None:
+        raise RuntimeError('pyarrow não está instalado: use o formato CSV.')
+
+    esquema = _esquema_parquet()
+    total = 0
+    with pq.ParquetWriter(caminho, esquema, compression='zstd') as escritor:
+        for lote in iterar_lotes(linhas, tamanho_lote):
+            colunas = list(zip(*lote))
+            for posicao, (nome, _) in enumerate(COLUNAS):
+                if nome in COLUNAS_DECIMAIS:
+                    colunas[posicao] = [float(valor) if valor is not None else None for valor in colunas[posicao]]
+            escritor.write_table(pa.Table.from_arrays(
+                [pa.array(coluna, type=campo.type) for coluna, campo in zip(colunas, esquema)],
+                schema=esquema,
+            ))
+            total += len(lote)
+    return total
+
+
+# --- CSV + GZIP ---
+def gerar_csv_gz(lotes):
+    """
+    Gera o CSV compactado em pedaços de bytes, um por lote de linhas.
+    Serve tanto para gravar em arquivo quanto para um StreamingHttpResponse.
+    """
+    buffer = io.BytesIO()
+    texto = io.TextIOWrapper(gzip.GzipFile(fileobj=buffer, mode='wb'), encoding='utf-8', newline='')
+    escritor = csv.writer(texto)
+
+    escritor.writerow([nome for nome, _ in COLUNAS])
+    for lote in lotes:
+        escritor.writerows(
+            [valor.isoformat() if isinstance(valor, datetime) else valor for valor in linha]
+            for linha in lote
+        )
+        texto.flush()
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    texto.close()
+    yield buffer.getvalue()
+
+
+def exportar_csv_gz(caminho, linhas, tamanho_lote=TAMANHO_LOTE):
+    """Grava o CSV compactado em `caminho` e devolve o total de linhas."""
+    tamanhos = []
+
+    def lotes():
+        for lote in iterar_lotes(linhas, tamanho_lote):
+            tamanhos.append(len(lote))
+            yield lote
+
+    with open(caminho, 'wb') as arquivo:
+        for pedaco in gerar_csv_gz(lotes()):
+            arquivo.write(pedaco)
+    return sum(tamanhos)
@@ -0,0 +1,160 @@
+# tips_core/imagens.py
+# Variantes das imagens enviadas pelo admin (escudos dos times e banners).
+# A cada upload são geradas versões redimensionadas (thumb, card, hero) em
+# WebP e AVIF, mais um placeholder borrado minúsculo, num pool de threads em
+# segundo plano para o admin não esperar. O resultado fica num JSONField do
+# próprio modelo e é usado pela template tag {% imagem_responsiva %}.
+
+import base64
+import io
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageFilter, ImageOps, features
+
+# Largura máxima de cada variante (nunca amplia a imagem original)
+TAMANHOS = {
+    'thumb': 96,
+    'card': 400,
+    'hero': 1200,
+}
+
+# (formato, extensão, opções do Pillow). AVIF só se o Pillow tiver suporte.
+FORMATOS = [('WEBP', 'webp', {'quality': 80, 'method': 4})]
+if features.check('avif'):
+    FORMATOS.insert(0, ('AVIF', 'avif', {'quality': 55, 'speed': 6}))
+
+LARGURA_PLACEHOLDER = 16
+MAX_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMAGENS_WORKERS', MAX_WORKERS),
+                thread_name_prefix='imagens',
+            )
+        return _executor
+
+
+# --- GERAÇÃO DAS VARIANTES ---
+def _abrir(arquivo):
+    arquivo.open('rb')
+    try:
+        imagem = Image.open(arquivo)
+        imagem.load()
+    finally:
+        arquivo.close()
+    # Respeita a orientação EXIF das fotos de celular
+    imagem = ImageOps.exif_transpose(imagem)
+    return imagem.convert('RGBA' if imagem.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+
+def _codificar(imagem, formato, opcoes):
+    buffer = io.BytesIO()
+    imagem.save(buffer, formato, **opcoes)
+    return buffer.getvalue()
+
+
+def gerar_variantes(arquivo):
+    """
+    Gera e grava no storage do campo as variantes de `arquivo` (um FieldFile).
+    Devolve o dicionário guardado no modelo:
+    {'origem', 'largura', 'altura', 'placeholder', 'tamanhos': {nome: {'largura', 'altura', 'avif', 'webp'}}}
+    """
+    imagem = _abrir(arquivo)
+    largura, altura = imagem.size
+    diretorio, nome = posixpath.split(arquivo.name)
+    base = posixpath.splitext(nome)[0]
+
+    tamanhos = {}
+    for nome_tamanho, largura_maxima in TAMANHOS.items():
+        largura_variante = min(largura, largura_maxima)
+        altura_variante = max(1, round(altura * largura_variante / largura))
+        redimensionada = imagem.resize((largura_variante, altura_variante), Image.Resampling.LANCZOS)
+
+        variante = {'largura': largura_variante, 'altura': altura_variante}
+        for formato, extensao, opcoes in FORMATOS:
+            destino = posixpath.join(diretorio, 'variantes', f'{base}_{nome_tamanho}.{extensao}')
+            if arquivo.storage.exists(destino):
+                arquivo.storage.delete(destino)
+            variante[extensao] = arquivo.storage.save(destino, ContentFile(_codificar(redimensionada, formato, opcoes)))
+        tamanhos[nome_tamanho] = variante
+
+    # Placeholder: ~100 bytes embutidos no HTML enquanto a imagem carrega
+    miniatura = imagem.resize(
+        (LARGURA_PLACEHOLDER, max(1, round(altura * LARGURA_PLACEHOLDER / largura))), Image.Resampling.BILINEAR,
+    ).filter(ImageFilter.GaussianBlur(1))
+    placeholder = base64.b64encode(_codificar(miniatura, 'WEBP', {'quality': 30})).decode()
+
+    return {
+        'origem': arquivo.name,
+        'largura': largura,
+        'altura': altura,
+        'placeholder': f'data:image/webp;base64,{placeholder}',
+        'tamanhos': tamanhos,
+    }
+
+
+def variantes_atualizadas(instance, campo):
+    """True se as variantes guardadas correspondem ao arquivo atual do campo."""
+    arquivo = getattr(instance, campo)
+    return not arquivo or getattr(instance, f'{campo}_variantes', {}).get('origem') == arquivo.name
+
+
+def processar(model, pk, campo):
+    """Gera as variantes de um objeto e grava no JSONField `<campo>_variantes`."""
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or variantes_atualizadas(instance, campo):
+        return None
+
+    variantes = gerar_variantes(getattr(instance, campo))
+    setattr(instance, f'{campo}_variantes', variantes)
+    # save() (e não update()) para os signals de invalidação de cache rodarem
+    campos = [f'{campo}_variantes']
+    if any(field.name == 'atualizado_em' for field in model._meta.concrete_fields):
+        campos.append('atualizado_em')
+    instance.save(update_fields=campos)
+    return variantes
+
+
+def processar_com_log(model, pk, campo):
+    try:
+        processar(model, pk, campo)
+    except Exception as e:
+        print(f"Erro ao gerar variantes de {model.__name__} {pk}: {e}")
+
+
+def processar_em_thread(model, pk, campo):
+    try:
+        processar_com_log(model, pk, campo)
+    finally:
+        # A thread do pool abre a própria conexão com o banco
+        connections.close_all()
+
+
+def agendar(instance, campo):
+    """
+    Agenda a geração das variantes para depois do commit (o arquivo e a
+    linha já existem). Com IMAGENS_EM_SEGUNDO_PLANO = False roda na hora.
+    """
+    if variantes_atualizadas(instance, campo):
+        return
+    model, pk = type(instance), instance.pk
+
+    def enviar():
+        if getattr(settings, 'IMAGENS_EM_SEGUNDO_PLANO', True):
+            _pool().submit(processar_em_thread, model, pk, campo)
+        else:
+            processar(model, pk, campo)
+
+    transaction.on_commit(enviar)
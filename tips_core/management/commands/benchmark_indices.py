@@ -0,0 +1,158 @@
+import os
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q, Sum, Count
+from django.utils import timezone
+from tips_core.models import Tip, Team, METHOD_CHOICES
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera um conjunto sintético de Tips e compara os planos (EXPLAIN) e os tempos '
+        'das consultas principais sem e com os índices compostos. Tudo é desfeito no final. '
+        'ATENÇÃO: os índices são removidos dentro de uma transação; no Postgres o DROP INDEX '
+        'trava a tabela de Tips (ACCESS EXCLUSIVE) até o fim do benchmark e bloqueia o site. '
+        'Rode numa cópia do banco; no banco de produção só com --confirmar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=1_000_000, help='Quantidade de Tips sintéticas.')
+        parser.add_argument('--times', type=int, default=500, help='Quantidade de times sintéticos.')
+        parser.add_argument('--lote', type=int, default=10_000, help='Tamanho do lote do bulk_create.')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Execuções por consulta na medição.')
+        parser.add_argument(
+            '--confirmar', action='store_true',
+            help='Roda mesmo fora de um banco de teste, aceitando o bloqueio da tabela de Tips durante o benchmark.',
+        )
+
+    @staticmethod
+    def banco_descartavel():
+        """True para o banco de testes do Django, uma cópia chamada test_* ou um SQLite em memória."""
+        nome = os.path.basename(str(connection.settings_dict['NAME']))
+        return nome.startswith('test_') or 'memory' in nome
+
+    def handle(self, *args, **options):
+        if not options['confirmar'] and not self.banco_descartavel():
+            raise CommandError(
+                f"O banco '{connection.settings_dict['NAME']}' não é de teste: o DROP INDEX trava a tabela "
+                f"{Tip._meta.db_table} até o fim do benchmark. Use uma cópia do banco ou passe --confirmar."
+            )
+
+        with transaction.atomic():
+            times = self.gerar_dados(options['linhas'], options['times'], options['lote'])
+            consultas = self.consultas(times)
+
+            self.remover_indices()
+            self.analisar()
+            antes = self.medir(consultas, options['repeticoes'], 'SEM ÍNDICES COMPOSTOS')
+
+            self.criar_indices()
+            self.analisar()
+            depois = self.medir(consultas, options['repeticoes'], 'COM ÍNDICES COMPOSTOS')
+
+            self.stdout.write(self.style.NOTICE('\n=== RESUMO (mediana em ms) ==='))
+            for nome in consultas:
+                self.stdout.write(f'{nome:<22} {antes[nome]:>10.2f} -> {depois[nome]:>10.2f}')
+
+            # Nada do benchmark fica no banco
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark concluído. Dados sintéticos descartados.'))
+
+    # --- GERAÇÃO DOS DADOS SINTÉTICOS ---
+    def gerar_dados(self, linhas, qtd_times, lote):
+        self.stdout.write(self.style.NOTICE(f'Gerando {qtd_times} times e {linhas} tips sintéticas...'))
+        inicio = time.monotonic()
+        aleatorio = random.Random(42)
+
+        Team.objects.bulk_create([Team(name=f'Benchmark Time {i}') for i in range(qtd_times)])
+        times = list(Team.objects.filter(name__startswith='Benchmark Time ').values_list('pk', flat=True))
+
+        metodos = [codigo for codigo, _ in METHOD_CHOICES]
+        status = ['WIN'] * 45 + ['LOSS'] * 35 + ['VOID'] * 5 + ['PENDING'] * 15
+        agora = timezone.now()
+
+        for deslocamento in range(0, linhas, lote):
+            tips = []
+            for _ in range(min(lote, linhas - deslocamento)):
+                casa, visitante = aleatorio.sample(times, 2)
+                tips.append(Tip(
+                    home_team_id=casa,
+                    away_team_id=visitante,
+                    league='Benchmark',
+                    match_date=agora - timedelta(minutes=aleatorio.randint(-20_000, 1_500_000)),
+                    method=aleatorio.choice(metodos),
+                    odd_value=Decimal(aleatorio.randint(101, 900)) / 100,
+                    status=aleatorio.choice(status),
+                    access_level='PREMIUM' if aleatorio.random() < 0.3 else 'FREE',
+                    is_active=aleatorio.random() < 0.9,
+                    valor_aposta=Decimal('100.00'),
+                    valor_ganho=Decimal('50.00'),
+                    valor_perda=Decimal('100.00'),
+                ))
+            Tip.objects.bulk_create(tips)
+
+        self.stdout.write(f'Dados gerados em {time.monotonic() - inicio:.1f}s.')
+        return times
+
+    # --- CONSULTAS QUENTES DAS VIEWS ---
+    def consultas(self, times):
+        agora = timezone.now()
+        time_id = times[0]
+        return {
+            'home (FREE)': Tip.objects.filter(
+                access_level='FREE', is_active=True, match_date__gte=agora - timedelta(days=1),
+            ).order_by('match_date')[:50],
+            'premium': Tip.objects.filter(
+                access_level='PREMIUM', is_active=True,
+            ).order_by('-match_date')[:20],
+            'dashboard (mês)': Tip.objects.filter(
+                status__in=['WIN', 'LOSS'],
+                match_date__gte=agora - timedelta(days=30), match_date__lt=agora,
+            ).values('method').annotate(total=Sum('valor_aposta'), apostas=Count('id')),
+            'time (histórico)': Tip.objects.filter(
+                Q(home_team=time_id) | Q(away_team=time_id),
+            ).order_by('-match_date')[:25],
+        }
+
+    # --- MEDIÇÃO ---
+    def medir(self, consultas, repeticoes, titulo):
+        self.stdout.write(self.style.NOTICE(f'\n=== {titulo} ==='))
+        medianas = {}
+        for nome, queryset in consultas.items():
+            self.stdout.write(self.style.WARNING(f'\n--- {nome} ---'))
+            self.stdout.write(queryset.explain())
+
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                list(queryset.all())
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            medianas[nome] = sorted(tempos)[len(tempos) // 2]
+            self.stdout.write(f'mediana: {medianas[nome]:.2f} ms')
+        return medianas
+
+    # --- CONTROLE DOS ÍNDICES ---
+    # O SQL é executado diretamente porque o schema_editor do SQLite não pode
+    # ser aberto dentro de transaction.atomic().
+    def remover_indices(self):
+        with connection.cursor() as cursor:
+            for indice in Tip._meta.indexes:
+                cursor.execute(f'DROP INDEX {connection.ops.quote_name(indice.name)}')
+
+    def criar_indices(self):
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for indice in Tip._meta.indexes:
+                cursor.execute(str(indice.create_sql(Tip, editor)))
+
+    def analisar(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'ANALYZE {Tip._meta.db_table}')
+            else:
+                cursor.execute('ANALYZE')
@@ -0,0 +1,226 @@
+import math
+import re
+import time
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, When, Value, Count
+from tips_core.models import Team, TeamAlias, TeamStats, Tip, normalizar_nome
+
+# Padrão: só nomes idênticos após a normalização. A similaridade por
+# trigramas junta clubes diferentes ("Palmeiras" x "Palmeiras B"), então
+# é opcional (--limite) e só grava com --confirmar, depois de revisar o plano.
+LIMITE_PADRAO = 1.0
+LIMITE_SUGERIDO = 0.8
+LOTE_UPDATE = 500
+
+# Palavras que distinguem equipes do mesmo clube (reservas, base, feminino)
+QUALIFICADORES = {
+    'b', 'c', 'ii', 'iii', 'reserva', 'reservas', 'sub', 'juniores', 'junior', 'jr',
+    'feminino', 'fem', 'women', 'w', 'youth', 'academy', 'aspirantes',
+}
+RE_CATEGORIA = re.compile(r'\b(?:sub|u)[\s-]?(\d+)\b')
+
+
+# --- SIMILARIDADE DE NOMES (TRIGRAMAS) ---
+def trigramas(nome):
+    """Trigramas do nome normalizado, no mesmo formato do pg_trgm ("  vasco " -> "  v", " va", ...)."""
+    trigramas_nome = set()
+    for palavra in nome.split():
+        palavra = f'  {palavra} '
+        trigramas_nome.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return trigramas_nome
+
+
+def qualificadores(nome):
+    """Palavras do nome normalizado que indicam outra equipe do clube ("b", "sub20", "feminino"...)."""
+    categorias = {f'sub{idade}' for idade in RE_CATEGORIA.findall(nome)}
+    palavras = set(RE_CATEGORIA.sub(' ', nome).replace('-', ' ').split())
+    return frozenset(categorias | (palavras & QUALIFICADORES))
+
+
+def agrupar_times(times, limite):
+    """
+    Agrupa os times cujos nomes normalizados são iguais ou têm similaridade
+    de Jaccard (sobre trigramas) >= limite. Um índice invertido trigrama -> times
+    limita a comparação aos candidatos, e uma estrutura union-find junta os
+    pares em grupos. Nomes com qualificadores diferentes ("Palmeiras" x
+    "Palmeiras B") nunca são unidos, por mais parecidos que sejam.
+    """
+    pai = {time_id: time_id for time_id in times}
+
+    def raiz(time_id):
+        while pai[time_id] != time_id:
+            pai[time_id] = pai[pai[time_id]]
+            time_id = pai[time_id]
+        return time_id
+
+    def unir(a, b):
+        raiz_a, raiz_b = raiz(a), raiz(b)
+        if raiz_a != raiz_b:
+            pai[max(raiz_a, raiz_b)] = min(raiz_a, raiz_b)
+
+    # 1. Nomes idênticos após normalização (acentos, maiúsculas, espaços)
+    por_nome = {}
+    for time_id, nome in times.items():
+        if nome in por_nome:
+            unir(time_id, por_nome[nome])
+        else:
+            por_nome[nome] = time_id
+
+    # 2. Nomes parecidos, comparando só um representante de cada nome distinto.
+    # Filtro de prefixo: ordenando os trigramas do mais raro para o mais comum,
+    # dois conjuntos com Jaccard >= limite sempre compartilham algum trigrama
+    # entre os primeiros |A| - ceil(limite * |A|) + 1 de cada um. Só esses vão
+    # para o índice invertido, o que descarta os trigramas comuns ("  a").
+    if limite < 1:
+        conjuntos = {time_id: trigramas(nome) for nome, time_id in por_nome.items()}
+        equipes = {time_id: qualificadores(nome) for nome, time_id in por_nome.items()}
+        frequencia = defaultdict(int)
+        for trigramas_nome in conjuntos.values():
+            for trigrama in trigramas_nome:
+                frequencia[trigrama] += 1
+
+        indice = defaultdict(list)
+        for time_id, trigramas_nome in sorted(conjuntos.items(), key=lambda item: len(item[1])):
+            tamanho = len(trigramas_nome)
+            prefixo = sorted(trigramas_nome, key=lambda trigrama: (frequencia[trigrama], trigrama))
+            prefixo = prefixo[:tamanho - math.ceil(limite * tamanho) + 1]
+
+            candidatos = {candidato for trigrama in prefixo for candidato in indice[trigrama]}
+            for candidato in candidatos:
+                outro = conjuntos[candidato]
+                # Filtro de tamanho: o menor conjunto precisa ter >= limite * o maior
+                if len(outro) < limite * tamanho:
+                    continue
+                if equipes[candidato] != equipes[time_id]:
+                    continue
+                iguais = len(trigramas_nome & outro)
+                if iguais / (tamanho + len(outro) - iguais) >= limite:
+                    unir(time_id, candidato)
+
+            for trigrama in prefixo:
+                indice[trigrama].append(time_id)
+
+    grupos = defaultdict(list)
+    for time_id in times:
+        grupos[raiz(time_id)].append(time_id)
+    return [grupo for grupo in grupos.values() if len(grupo) > 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Unifica times duplicados (mesmo nome sem acento/maiúsculas ou nomes muito parecidos): '
+        'as Tips passam para o time canônico, os nomes antigos viram TeamAlias e os duplicados '
+        'são apagados, tudo numa única transação.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limite', type=float, default=LIMITE_PADRAO,
+            help=(
+                'Similaridade mínima (0 a 1) para considerar dois nomes o mesmo time. Padrão: 1 (só nomes '
+                f'idênticos após a normalização). Abaixo de 1 (ex.: {LIMITE_SUGERIDO}) só grava com --confirmar.'
+            ),
+        )
+        parser.add_argument('--simular', action='store_true', help='Só mostra os grupos encontrados, sem alterar nada.')
+        parser.add_argument(
+            '--confirmar', action='store_true',
+            help='Aplica a unificação por similaridade (--limite < 1) depois de revisar o plano mostrado sem esta opção.',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        # Unificação por similaridade nunca grava sem revisão: sem --confirmar vira simulação
+        if options['limite'] < 1 and not options['confirmar'] and not options['simular']:
+            self.stdout.write(self.style.WARNING(
+                f"--limite {options['limite']} une nomes apenas parecidos: mostrando o plano sem alterar nada. "
+                'Revise os grupos e rode de novo com --confirmar para aplicar.'
+            ))
+            options['simular'] = True
+
+        # 1. Normaliza os nomes (corrige times gravados sem passar pelo save())
+        times = list(Team.objects.only('pk', 'name', 'nome_normalizado', 'logo'))
+        desatualizados = []
+        for time_obj in times:
+            nome_normalizado = normalizar_nome(time_obj.name)
+            if time_obj.nome_normalizado != nome_normalizado:
+                time_obj.nome_normalizado = nome_normalizado
+                desatualizados.append(time_obj)
+        if desatualizados and not options['simular']:
+            Team.objects.bulk_update(desatualizados, ['nome_normalizado'], batch_size=1000)
+
+        # 2. Agrupa os duplicados
+        grupos = agrupar_times({t.pk: t.nome_normalizado for t in times}, options['limite'])
+        if not grupos:
+            self.stdout.write(self.style.SUCCESS(f'Nenhum time duplicado entre {len(times)} times.'))
+            return
+
+        # 3. O canônico de cada grupo é o time com mais Tips (empate: o mais antigo)
+        jogos = defaultdict(int)
+        for lado in ('home_team', 'away_team'):
+            for time_id, total in Tip.objects.values_list(lado).annotate(total=Count('id')).order_by():
+                jogos[time_id] += total
+
+        por_id = {t.pk: t for t in times}
+        destino = {}
+        for grupo in grupos:
+            canonico = min(grupo, key=lambda time_id: (-jogos[time_id], time_id))
+            for time_id in grupo:
+                if time_id != canonico:
+                    destino[time_id] = canonico
+            self.stdout.write(
+                f"  {por_id[canonico].name} <- "
+                + ', '.join(por_id[time_id].name for time_id in grupo if time_id != canonico)
+            )
+
+        if options['simular']:
+            self.stdout.write(self.style.WARNING(
+                f'Simulação: {len(destino)} times seriam unificados em {len(grupos)} grupos.'
+            ))
+            return
+
+        # 4. Aplica tudo numa transação: Tips, aliases, escudos e exclusão dos duplicados
+        with transaction.atomic():
+            tips_movidas = self.repontar(Tip, ('home_team', 'away_team'), destino)
+            self.repontar(TeamAlias, ('team',), destino)
+
+            TeamAlias.objects.bulk_create(
+                [
+                    TeamAlias(nome=por_id[duplicado].name, nome_normalizado=por_id[duplicado].nome_normalizado, team_id=canonico)
+                    for duplicado, canonico in destino.items()
+                    if por_id[duplicado].nome_normalizado != por_id[canonico].nome_normalizado
+                ],
+                ignore_conflicts=True,
+            )
+
+            sem_logo = []
+            for duplicado, canonico in destino.items():
+                if por_id[duplicado].logo and not por_id[canonico].logo:
+                    por_id[canonico].logo = por_id[duplicado].logo
+                    sem_logo.append(por_id[canonico])
+            if sem_logo:
+                Team.objects.bulk_update(sem_logo, ['logo'])
+
+            Team.objects.filter(pk__in=destino).delete()
+
+            # UPDATE em massa não dispara os signals da Tip
+            TeamStats.recalcular(set(destino.values()))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(destino)} times duplicados unificados em {len(grupos)} times canônicos; '
+            f'{tips_movidas} referências de Tips atualizadas em {time.monotonic() - inicio:.2f}s.'
+        ))
+
+    def repontar(self, model, campos, destino):
+        """Troca as FKs dos duplicados pelo canônico com um UPDATE ... CASE por lote."""
+        ids = list(destino)
+        total = 0
+        for campo in campos:
+            coluna = f'{campo}_id'
+            for inicio in range(0, len(ids), LOTE_UPDATE):
+                lote = ids[inicio:inicio + LOTE_UPDATE]
+                total += model.objects.filter(**{f'{coluna}__in': lote}).update(**{
+                    coluna: Case(*[When(**{coluna: antigo}, then=Value(destino[antigo])) for antigo in lote])
+                })
+        return total
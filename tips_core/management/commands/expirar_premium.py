@@ -0,0 +1,35 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from tips_core.models import Assinatura
+
+
+class Command(BaseCommand):
+    help = (
+        'Desativa em massa os Premium vencidos (is_premium_member e Assinatura) com dois UPDATEs, '
+        'sem passar pelo save() nem pelos signals. Seguro para rodar a cada minuto (cron).'
+    )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        hoje = timezone.localdate()
+
+        vencimento = Q(premium_expiration_date__lt=hoje) | Q(premium_expiration_date__isnull=True)
+        # Usa o índice parcial user_premium_vencimento_idx (só usuários ainda marcados como Premium)
+        vencidos = get_user_model().objects.filter(is_premium_member=True).filter(vencimento)
+
+        with transaction.atomic():
+            # As assinaturas pela data, independente de is_premium_member: um save()
+            # do usuário depois do vencimento já desliga a flag, mas não a Assinatura
+            assinaturas = Assinatura.objects.filter(
+                is_active=True, user__in=get_user_model().objects.filter(vencimento).values('pk'),
+            ).update(is_active=False)
+            usuarios = vencidos.update(is_premium_member=False)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{usuarios} usuários e {assinaturas} assinaturas expirados '
+            f'em {(time.monotonic() - inicio) * 1000:.1f} ms.'
+        ))
@@ -0,0 +1,49 @@
+import argparse
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from tips_core import exportacao
+
+
+def data_iso(valor):
+    # Chamada pelo argparse (type=): só ArgumentTypeError vira mensagem de uso em vez de traceback
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Data inválida: {valor} (use AAAA-MM-DD).')
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta o histórico de Tips com os nomes dos times para Parquet (se o pyarrow estiver '
+        'instalado) ou CSV compactado, lendo o banco em lotes. Use --desde/--ate para exportações incrementais.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--saida', help='Arquivo de saída (padrão: tips_historico.parquet ou .csv.gz).')
+        parser.add_argument('--formato', choices=['auto', 'parquet', 'csv'], default='auto')
+        parser.add_argument('--desde', type=data_iso, help='Primeira data do jogo (AAAA-MM-DD), inclusiva.')
+        parser.add_argument('--ate', type=data_iso, help='Última data do jogo (AAAA-MM-DD), inclusiva.')
+        parser.add_argument('--lote', type=int, default=exportacao.TAMANHO_LOTE, help='Linhas lidas do banco por vez.')
+
+    def handle(self, *args, **options):
+        formato = options['formato']
+        if formato == 'auto':
+            formato = 'parquet' if exportacao.parquet_disponivel() else 'csv'
+        elif formato == 'parquet' and not exportacao.parquet_disponivel():
+            raise CommandError('pyarrow não está instalado: use --formato csv.')
+
+        saida = options['saida'] or ('tips_historico.parquet' if formato == 'parquet' else 'tips_historico.csv.gz')
+        linhas = exportacao.consulta_historico(options['desde'], options['ate'])
+
+        inicio = time.monotonic()
+        if formato == 'parquet':
+            total = exportacao.exportar_parquet(saida, linhas, options['lote'])
+        else:
+            total = exportacao.exportar_csv_gz(saida, linhas, options['lote'])
+
+        duracao = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} tips exportadas para {saida} em {duracao:.2f}s '
+            f'({total / duracao if duracao else 0:.0f} linhas/s).'
+        ))
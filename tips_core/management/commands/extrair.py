@@ -1,12 +1,20 @@
 from datetime import timedelta
 from django.utils import timezone
 from django.core.management.base import BaseCommand
-from tips_core.models import Noticia 
-from tips_core.tasks import extrair_noticias_rss # IMPORTAÇÃO CHAVE
+from tips_core.models import Noticia
+from tips_core.tasks import executar_extracao, PRAZO_GLOBAL # IMPORTAÇÃO CHAVE
 
 class Command(BaseCommand):
     help = 'Extrai notícias de fontes externas e limpa notícias muito antigas.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prazo',
+            type=float,
+            default=PRAZO_GLOBAL,
+            help='Tempo máximo (segundos) para a extração inteira.',
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.NOTICE('Iniciando a extração de notícias e limpeza de dados antigos...'))
 
@@ -16,6 +24,24 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'Limpeza concluída. {deleted_count} notícias antigas removidas.'))
 
         # 2. LÓGICA DE EXTRAÇÃO REAL
-        summary_message = extrair_noticias_rss()
+        resultado = executar_extracao(prazo=options['prazo'])
+
+        # 3. RELATÓRIO DE LATÊNCIA POR FEED
+        for feed_url, dados in resultado['feeds'].items():
+            # Feed que não respondeu até o prazo fica sem latência (None)
+            latencia = f"{dados['latencia']:.2f}s" if dados['latencia'] is not None else 'sem resposta'
+            if dados['erro']:
+                self.stdout.write(self.style.ERROR(f"  {feed_url}: ERRO ({dados['erro']})"))
+            elif dados['nao_modificado']:
+                self.stdout.write(f"  {feed_url}: {latencia}, não modificado (304)")
+            else:
+                self.stdout.write(
+                    f"  {feed_url}: {latencia}, "
+                    f"{dados['itens']} itens, {dados['novas']} novas"
+                )
 
-        self.stdout.write(self.style.SUCCESS(summary_message))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(
+            f"Extração concluída. {resultado['novas']} novas notícias inseridas, "
+            f"{resultado['ignoradas']} ignoradas (já existentes ou inválidas) "
+            f"em {resultado['duracao']:.2f}s."
+        ))
@@ -0,0 +1,214 @@
+import json
+import time
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from tips_core.models import Team, TeamAlias, TeamStats, Tip, PromocaoBanner, ResumoDesempenho, normalizar_nome
+
+TAMANHO_LEITURA = 64 * 1024
+MODELOS_SUPORTADOS = {
+    'tips_core.team': Team,
+    'tips_core.tip': Tip,
+    'tips_core.promocaobanner': PromocaoBanner,
+}
+
+
+# --- LEITURA INCREMENTAL DO JSON ---
+def iterar_registros(arquivo, tamanho_leitura=TAMANHO_LEITURA):
+    """
+    Percorre um dump do `dumpdata` (uma lista JSON) registro a registro,
+    lendo o arquivo em blocos: a memória usada depende do maior registro,
+    não do tamanho do arquivo.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    inicio_lista = False
+    fim_arquivo = False
+
+    while True:
+        # Descarta espaços e separadores entre os registros
+        buffer = buffer.lstrip()
+        if not inicio_lista and buffer:
+            if buffer[0] != '[':
+                raise CommandError('O arquivo não é uma lista JSON gerada pelo dumpdata.')
+            buffer = buffer[1:].lstrip()
+            inicio_lista = True
+        if inicio_lista and buffer[:1] == ',':
+            buffer = buffer[1:].lstrip()
+        if inicio_lista and buffer[:1] == ']':
+            return
+
+        if buffer:
+            try:
+                registro, fim = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if fim_arquivo:
+                    raise CommandError('JSON inválido ou truncado no final do arquivo.')
+            else:
+                # Um registro que termina exatamente no fim do buffer pode estar incompleto
+                if fim < len(buffer) or fim_arquivo:
+                    buffer = buffer[fim:]
+                    yield registro
+                    continue
+
+        if fim_arquivo:
+            if buffer.strip():
+                raise CommandError('JSON inválido ou truncado no final do arquivo.')
+            return
+        bloco = arquivo.read(tamanho_leitura)
+        fim_arquivo = not bloco
+        buffer += bloco
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa times, tips e banners de um dump JSON (dumpdata) lendo o arquivo de forma '
+        'incremental e gravando em lotes com upsert (bulk_create com update_conflicts).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', nargs='?', default='dados_reais.json', help='Caminho do dump JSON.')
+        parser.add_argument('--lote', type=int, default=2000, help='Registros por lote/transação.')
+
+    def handle(self, *args, **options):
+        self.lote = options['lote']
+        self.inicio = time.monotonic()
+        self.contagem = {modelo: 0 for modelo in MODELOS_SUPORTADOS}
+        self.ignorados = {}
+        self.lidos = 0
+        self.times_afetados = set()
+        # pk do time no dump -> pk do time neste banco (nomes já existentes são reaproveitados)
+        self.mapa_times = {}
+
+        pendentes = {modelo: [] for modelo in MODELOS_SUPORTADOS}
+
+        try:
+            arquivo = open(options['arquivo'], 'r', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f'Erro ao abrir o arquivo: {e}')
+
+        with arquivo:
+            for registro in iterar_registros(arquivo):
+                self.lidos += 1
+                modelo = registro.get('model')
+                if modelo not in MODELOS_SUPORTADOS:
+                    self.ignorados[modelo] = self.ignorados.get(modelo, 0) + 1
+                    continue
+
+                pendentes[modelo].append(registro)
+                if len(pendentes[modelo]) >= self.lote:
+                    # Times antes das tips, para que os pks já estejam mapeados
+                    if modelo == 'tips_core.tip':
+                        self.gravar('tips_core.team', pendentes['tips_core.team'])
+                    self.gravar(modelo, pendentes[modelo])
+
+        for modelo in MODELOS_SUPORTADOS:
+            self.gravar(modelo, pendentes[modelo])
+
+        self.finalizar()
+
+        duracao = time.monotonic() - self.inicio
+        total = sum(self.contagem.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Importação concluída: {self.contagem['tips_core.team']} times, "
+            f"{self.contagem['tips_core.tip']} tips e {self.contagem['tips_core.promocaobanner']} banners "
+            f"em {duracao:.2f}s ({total / duracao if duracao else 0:.0f} linhas/s)."
+        ))
+        for modelo, quantidade in self.ignorados.items():
+            self.stdout.write(self.style.WARNING(f'  {quantidade} registros de {modelo} ignorados (modelo não importado).'))
+
+    # --- GRAVAÇÃO EM LOTES ---
+    def gravar(self, modelo, registros):
+        if not registros:
+            return
+        objetos = [item.object for item in serializers.deserialize('python', registros, ignorenonexistent=True)]
+        registros.clear()
+
+        with transaction.atomic():
+            if modelo == 'tips_core.team':
+                self.gravar_times(objetos)
+            elif modelo == 'tips_core.tip':
+                self.gravar_tips(objetos)
+            else:
+                self.upsert(PromocaoBanner, objetos, excluir=('data_criacao',))
+
+        self.contagem[modelo] += len(objetos)
+        duracao = time.monotonic() - self.inicio
+        self.stdout.write(f'  {self.lidos} registros lidos ({self.lidos / duracao:.0f} linhas/s)')
+
+    def upsert(self, model, objetos, excluir=()):
+        campos = [
+            campo.name for campo in model._meta.concrete_fields
+            if not campo.primary_key and campo.name not in excluir
+        ]
+        model.objects.bulk_create(objetos, update_conflicts=True, unique_fields=['pk'], update_fields=campos)
+
+    def gravar_times(self, times):
+        """
+        Times do dump são casados com os deste banco pelo nome normalizado
+        (ou por um TeamAlias); só os realmente novos são inseridos.
+        """
+        for time_obj in times:
+            time_obj.nome_normalizado = normalizar_nome(time_obj.name)
+        nomes_dump = {time_obj.pk: time_obj.nome_normalizado for time_obj in times}
+
+        existentes = dict(
+            TeamAlias.objects.filter(nome_normalizado__in=nomes_dump.values()).values_list('nome_normalizado', 'team_id')
+        )
+        existentes.update(Team.objects.filter(nome_normalizado__in=nomes_dump.values()).values_list('nome_normalizado', 'pk'))
+
+        novos = {}
+        for time_obj in times:
+            if time_obj.nome_normalizado not in existentes:
+                novos.setdefault(time_obj.nome_normalizado, time_obj)
+
+        # Se o pk do dump já pertence a outro time neste banco, o banco gera um novo
+        ocupados = set(Team.objects.filter(pk__in=[t.pk for t in novos.values()]).values_list('pk', flat=True))
+        for time_obj in novos.values():
+            if time_obj.pk in ocupados:
+                time_obj.pk = None
+        Team.objects.bulk_create(list(novos.values()))
+
+        existentes.update((time_obj.nome_normalizado, time_obj.pk) for time_obj in novos.values())
+        self.mapa_times.update((pk, existentes[nome]) for pk, nome in nomes_dump.items())
+
+    def gravar_tips(self, tips):
+        # Resolve todos os times do lote de uma vez
+        # Tips sem time (FK nula) continuam sem time: None não vira 'Time None'
+        referenciados = {time_id for tip in tips for time_id in (tip.home_team_id, tip.away_team_id)}
+        sem_mapa = referenciados - set(self.mapa_times) - {None}
+        if sem_mapa:
+            # Dumps sem os registros de time: usa o pk existente, o time provisório
+            # já criado com o mesmo nome (noutro pk) ou cria um novo
+            existentes = set(Team.objects.filter(pk__in=sem_mapa).values_list('pk', flat=True))
+            self.mapa_times.update((pk, pk) for pk in existentes)
+            faltando = {f'time {pk}': pk for pk in sem_mapa - existentes}
+            por_nome = dict(Team.objects.filter(nome_normalizado__in=faltando).values_list('nome_normalizado', 'pk'))
+            self.mapa_times.update((pk, por_nome[nome]) for nome, pk in faltando.items() if nome in por_nome)
+            # Sem ignore_conflicts: um conflito aqui é erro de verdade, não pode sumir em silêncio
+            Team.objects.bulk_create(
+                [Team(pk=pk, name=f'Time {pk}', nome_normalizado=nome) for nome, pk in faltando.items() if nome not in por_nome]
+            )
+            self.mapa_times.update((pk, pk) for nome, pk in faltando.items() if nome not in por_nome)
+
+        for tip in tips:
+            tip.home_team_id = self.mapa_times.get(tip.home_team_id)
+            tip.away_team_id = self.mapa_times.get(tip.away_team_id)
+            self.times_afetados.update(time_id for time_id in (tip.home_team_id, tip.away_team_id) if time_id)
+
+        self.upsert(Tip, tips)
+
+    # --- PÓS-IMPORTAÇÃO ---
+    def finalizar(self):
+        """O bulk_create não dispara signals: reconstrói os resumos e acerta as sequências."""
+        if self.contagem['tips_core.tip']:
+            ResumoDesempenho.reconstruir()
+            TeamStats.recalcular(self.times_afetados)
+
+        # No Postgres, pks explícitos não avançam a sequência do id
+        comandos = connection.ops.sequence_reset_sql(no_style(), list(set(MODELOS_SUPORTADOS.values())))
+        if comandos:
+            with connection.cursor() as cursor:
+                for comando in comandos:
+                    cursor.execute(comando)
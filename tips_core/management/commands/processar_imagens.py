@@ -0,0 +1,56 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from tips_core import imagens
+from tips_core.models import Team, PromocaoBanner
+
+# (modelo, campo da imagem)
+IMAGENS = [
+    (Team, 'logo'),
+    (PromocaoBanner, 'imagem'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera as variantes (thumb/card/hero em WebP e AVIF + placeholder) dos escudos e banners '
+        'que ainda não têm ou cujo arquivo mudou. Use depois do deploy para as imagens antigas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true', help='Refaz as variantes de todas as imagens.')
+        parser.add_argument('--workers', type=int, default=imagens.MAX_WORKERS, help='Imagens processadas em paralelo.')
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        pendentes = []
+        for model, campo in IMAGENS:
+            if options['todas']:
+                model.objects.update(**{f'{campo}_variantes': {}})
+            for instance in model.objects.exclude(**{campo: ''}).exclude(**{f'{campo}__isnull': True}):
+                if not imagens.variantes_atualizadas(instance, campo):
+                    pendentes.append((model, instance.pk, campo))
+
+        if not pendentes:
+            self.stdout.write(self.style.SUCCESS('Todas as imagens já têm variantes.'))
+            return
+
+        self.stdout.write(self.style.NOTICE(f'Gerando variantes de {len(pendentes)} imagens...'))
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                for pendente in pendentes:
+                    executor.submit(imagens.processar_em_thread, *pendente)
+        else:
+            for pendente in pendentes:
+                imagens.processar_com_log(*pendente)
+
+        erros = 0
+        for model, pk, campo in pendentes:
+            instance = model.objects.filter(pk=pk).first()
+            if instance is None or not imagens.variantes_atualizadas(instance, campo):
+                erros += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(pendentes) - erros} imagens processadas em {time.monotonic() - inicio:.1f}s'
+            + (f' ({erros} com erro).' if erros else '.')
+        ))
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from tips_core.pagamentos import criar_sessao, processar_pendentes
+
+
+class Command(BaseCommand):
+    help = (
+        'Processa as notificações do PagSeguro guardadas pelo webhook: consulta cada transação '
+        '(com timeouts e novas tentativas) e aplica o resultado à assinatura uma única vez.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=100, help='Notificações por rodada.')
+        parser.add_argument('--continuo', action='store_true', help='Fica rodando como worker.')
+        parser.add_argument('--intervalo', type=float, default=10, help='Segundos entre rodadas no modo contínuo.')
+
+    def handle(self, *args, **options):
+        sessao = criar_sessao()
+        while True:
+            inicio = time.monotonic()
+            resultado = processar_pendentes(options['lote'], sessao)
+
+            if any(resultado.values()) or not options['continuo']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{resultado['processadas']} notificações processadas "
+                    f"({resultado['creditadas']} com crédito), {resultado['falhas']} falhas "
+                    f"em {time.monotonic() - inicio:.2f}s."
+                ))
+
+            if not options['continuo']:
+                break
+            # Lote cheio: provavelmente há mais na fila, segue sem esperar
+            if resultado['processadas'] + resultado['falhas'] < options['lote']:
+                time.sleep(options['intervalo'])
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from tips_core.models import ResumoDesempenho, TeamStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstrói do zero os resumos mensais de desempenho usados pelo dashboard de análise '
+        'e as estatísticas por time usadas na lista de times.'
+    )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        total = ResumoDesempenho.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} resumos (ano, mês, método) reconstruídos em {time.monotonic() - inicio:.2f}s.'
+        ))
+
+        inicio = time.monotonic()
+        total = TeamStats.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} estatísticas de times reconstruídas em {time.monotonic() - inicio:.2f}s.'
+        ))
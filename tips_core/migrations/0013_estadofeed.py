@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0012_tip_observation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True, verbose_name='URL do Feed')),
+                ('etag', models.CharField(blank=True, default='', max_length=255, verbose_name='ETag')),
+                ('last_modified', models.CharField(blank=True, default='', max_length=100, verbose_name='Last-Modified')),
+                ('ultimos_ids', models.JSONField(blank=True, default=list, verbose_name='IDs das Últimas Entradas')),
+                ('ultima_consulta', models.DateTimeField(blank=True, null=True, verbose_name='Última Consulta')),
+            ],
+            options={
+                'verbose_name': 'Estado do Feed RSS',
+                'verbose_name_plural': 'Estados dos Feeds RSS',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0013_estadofeed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tip',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['access_level', 'match_date'], name='tip_ativa_acesso_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tip',
+            index=models.Index(condition=models.Q(('status__in', ['WIN', 'LOSS'])), fields=['match_date', 'method'], name='tip_concluida_data_metodo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tip',
+            index=models.Index(fields=['home_team', 'match_date'], name='tip_casa_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tip',
+            index=models.Index(fields=['away_team', 'match_date'], name='tip_visitante_data_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:01
+
+from django.db import migrations, models
+from django.db.models import Case, Count, DecimalField, F, Max, Q, Sum, When
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def popular_resumos(apps, schema_editor):
+    Tip = apps.get_model('tips_core', 'Tip')
+    ResumoDesempenho = apps.get_model('tips_core', 'ResumoDesempenho')
+
+    lucro = Case(
+        When(status='WIN', then=F('valor_ganho')),
+        When(status='LOSS', then=F('valor_perda') * -1),
+        default=0,
+        output_field=DecimalField(),
+    )
+    linhas = Tip.objects.filter(status__in=['WIN', 'LOSS']).annotate(
+        ano=ExtractYear('match_date'),
+        mes=ExtractMonth('match_date'),
+    ).values('ano', 'mes', 'method').annotate(
+        total_aposta=Sum('valor_aposta'),
+        lucro_liquido=Sum(lucro),
+        total_wins=Count('id', filter=Q(status='WIN')),
+        total_losses=Count('id', filter=Q(status='LOSS')),
+        ultima_data=Max('match_date'),
+    ).order_by()
+
+    ResumoDesempenho.objects.bulk_create([
+        ResumoDesempenho(**{**linha, 'total_aposta': linha['total_aposta'] or 0, 'lucro_liquido': linha['lucro_liquido'] or 0})
+        for linha in linhas
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0014_indices_compostos_tip'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoDesempenho',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.PositiveSmallIntegerField(verbose_name='Ano')),
+                ('mes', models.PositiveSmallIntegerField(verbose_name='Mês')),
+                ('method', models.CharField(choices=[('LAY0X1', 'LAY 0x1'), ('LAY0X2', 'LAY 0x2'), ('LAY0X3', 'LAY 0x3'), ('LAY1X0', 'LAY 1x0'), ('LAY2X0', 'LAY 2x0'), ('LAY3X0', 'LAY 3x0'), ('LAY2X2', 'LAY 2x2'), ('LAYGC', 'LAY GOLEADA CASA'), ('LAYGV', 'LAY GOLEADA VISITANTE'), ('BACKC', 'BACK CASA'), ('BACKV', 'BACK VISITANTE'), ('OVER05HT', 'OVER 0.5 HT'), ('OVER05FT', 'OVER 0.5 FT'), ('OVER15FT', 'OVER 1.5 FT')], max_length=10, verbose_name='Método de Aposta')),
+                ('total_aposta', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total Apostado')),
+                ('lucro_liquido', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Lucro Líquido')),
+                ('total_wins', models.PositiveIntegerField(default=0, verbose_name='Ganhos')),
+                ('total_losses', models.PositiveIntegerField(default=0, verbose_name='Perdas')),
+                ('ultima_data', models.DateTimeField(blank=True, null=True, verbose_name='Último Jogo')),
+            ],
+            options={
+                'verbose_name': 'Resumo Mensal de Desempenho',
+                'verbose_name_plural': 'Resumos Mensais de Desempenho',
+                'ordering': ['ano', 'mes', 'method'],
+                'constraints': [models.UniqueConstraint(fields=('ano', 'mes', 'method'), name='resumo_ano_mes_metodo_unico')],
+            },
+        ),
+        migrations.RunPython(popular_resumos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Sum
+
+
+def popular_estatisticas(apps, schema_editor):
+    Tip = apps.get_model('tips_core', 'Tip')
+    Team = apps.get_model('tips_core', 'Team')
+    TeamStats = apps.get_model('tips_core', 'TeamStats')
+
+    totais = {}
+    for lado in ('home_team', 'away_team'):
+        linhas = Tip.objects.filter(**{f'{lado}__isnull': False}).values(lado).annotate(
+            jogos=Count('id'), odds=Sum('odd_value'), ultima=Max('match_date'),
+        ).order_by()
+        for linha in linhas:
+            total = totais.setdefault(linha[lado], {'total_jogos': 0, 'soma_odds': 0, 'ultima_data': None})
+            total['total_jogos'] += linha['jogos']
+            total['soma_odds'] += linha['odds'] or 0
+            if total['ultima_data'] is None or linha['ultima'] > total['ultima_data']:
+                total['ultima_data'] = linha['ultima']
+
+    ultima_tip = Tip.objects.filter(
+        Q(home_team=OuterRef('pk')) | Q(away_team=OuterRef('pk'))
+    ).order_by('-match_date', '-id').values('method')[:1]
+    metodos = Team.objects.annotate(metodo=Subquery(ultima_tip)).values_list('pk', 'metodo')
+
+    TeamStats.objects.bulk_create([
+        TeamStats(team_id=team_id, ultimo_metodo=metodo or '', **totais.get(team_id, {}))
+        for team_id, metodo in metodos
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0015_resumodesempenho'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStats',
+            fields=[
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='tips_core.team', verbose_name='Time')),
+                ('total_jogos', models.PositiveIntegerField(default=0, verbose_name='Total de Jogos')),
+                ('soma_odds', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Soma das Odds')),
+                ('ultimo_metodo', models.CharField(blank=True, choices=[('LAY0X1', 'LAY 0x1'), ('LAY0X2', 'LAY 0x2'), ('LAY0X3', 'LAY 0x3'), ('LAY1X0', 'LAY 1x0'), ('LAY2X0', 'LAY 2x0'), ('LAY3X0', 'LAY 3x0'), ('LAY2X2', 'LAY 2x2'), ('LAYGC', 'LAY GOLEADA CASA'), ('LAYGV', 'LAY GOLEADA VISITANTE'), ('BACKC', 'BACK CASA'), ('BACKV', 'BACK VISITANTE'), ('OVER05HT', 'OVER 0.5 HT'), ('OVER05FT', 'OVER 0.5 FT'), ('OVER15FT', 'OVER 1.5 FT')], default='', max_length=10, verbose_name='Último Método')),
+                ('ultima_data', models.DateTimeField(blank=True, null=True, verbose_name='Último Jogo')),
+            ],
+            options={
+                'verbose_name': 'Estatística de Time',
+                'verbose_name_plural': 'Estatísticas de Times',
+            },
+        ),
+        migrations.RunPython(popular_estatisticas, migrations.RunPython.noop),
+    ]
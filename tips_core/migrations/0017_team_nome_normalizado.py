@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:06
+
+import unicodedata
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+# Cópia de tips_core.models.normalizar_nome como era nesta migração: mudanças
+# futuras no models não podem alterar (nem quebrar) o que ela grava.
+def normalizar_nome(texto):
+    sem_acento = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acento.lower().split())
+
+
+def popular_nomes_normalizados(apps, schema_editor):
+    Team = apps.get_model('tips_core', 'Team')
+    times = list(Team.objects.only('pk', 'name'))
+    for time in times:
+        time.nome_normalizado = normalizar_nome(time.name)
+    Team.objects.bulk_update(times, ['nome_normalizado'], batch_size=1000)
+
+
+# O índice GIN de trigramas só existe no Postgres; no SQLite fica o B-tree do campo.
+def criar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS team_nome_normalizado_trgm_idx '
+            'ON tips_core_team USING gin (nome_normalizado gin_trgm_ops)'
+        )
+
+
+def remover_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS team_nome_normalizado_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0016_teamstats'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='team',
+            name='nome_normalizado',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(popular_nomes_normalizados, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_trigramas, remover_indice_trigramas),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0017_team_nome_normalizado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, verbose_name='Nome Alternativo')),
+                ('nome_normalizado', models.CharField(editable=False, max_length=100, unique=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='tips_core.team', verbose_name='Time')),
+            ],
+            options={
+                'verbose_name': 'Nome Alternativo de Time',
+                'verbose_name_plural': 'Nomes Alternativos de Times',
+                'ordering': ['nome'],
+            },
+        ),
+    ]
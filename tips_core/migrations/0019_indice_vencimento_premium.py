@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('tips_core', '0018_teamalias'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('is_premium_member', True)), fields=['premium_expiration_date'], name='user_premium_vencimento_idx'),
+        ),
+    ]
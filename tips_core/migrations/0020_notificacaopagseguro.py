@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0019_indice_vencimento_premium'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacaoPagSeguro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=100, unique=True, verbose_name='Código da Notificação')),
+                ('tipo', models.CharField(default='transaction', max_length=30)),
+                ('status', models.CharField(choices=[('PENDENTE', 'Pendente'), ('PROCESSADA', 'Processada'), ('FALHOU', 'Falhou')], default='PENDENTE', max_length=10)),
+                ('recebida_em', models.DateTimeField(auto_now_add=True)),
+                ('proxima_tentativa', models.DateTimeField(default=django.utils.timezone.now)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('ultimo_erro', models.TextField(blank=True)),
+                ('processada_em', models.DateTimeField(blank=True, null=True)),
+                ('transacao', models.CharField(blank=True, max_length=100, verbose_name='Código da Transação')),
+                ('referencia', models.CharField(blank=True, max_length=150)),
+                ('status_transacao', models.CharField(blank=True, max_length=2)),
+                ('credito_aplicado', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name': 'Notificação do PagSeguro',
+                'verbose_name_plural': 'Notificações do PagSeguro',
+                'ordering': ['-recebida_em'],
+                'indexes': [models.Index(condition=models.Q(('status', 'PENDENTE')), fields=['proxima_tentativa'], name='notificacao_pendente_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('credito_aplicado', True)), fields=('transacao',), name='notificacao_credito_unico')],
+            },
+        ),
+    ]
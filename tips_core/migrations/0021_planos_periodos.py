@@ -0,0 +1,86 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import migrations, models
+
+
+PLANOS_INICIAIS = [
+    # (pk, nome, meses, dias, preço)
+    (1, 'Plano Mensal', 1, 30, '50.00'),
+    (3, 'Plano Trimestral', 3, 90, '120.00'),
+    (6, 'Plano Semestral', 6, 180, '185.00'),
+]
+
+
+def popular_planos_e_periodos(apps, schema_editor):
+    Plan = apps.get_model('tips_core', 'Plan')
+    SubscriptionPeriod = apps.get_model('tips_core', 'SubscriptionPeriod')
+    CustomUser = apps.get_model('tips_core', 'CustomUser')
+
+    urls = getattr(settings, 'PAGSEGURO_PLAN_URLS', {})
+    Plan.objects.bulk_create([
+        Plan(pk=pk, nome=nome, duracao_meses=meses, duracao_dias=dias, preco=preco,
+             pagseguro_url=urls.get(pk, ''), ordem=ordem)
+        for ordem, (pk, nome, meses, dias, preco) in enumerate(PLANOS_INICIAIS)
+    ], ignore_conflicts=True)
+    # pks explícitos: no Postgres a sequência precisa avançar para os próximos planos do admin
+    for comando in schema_editor.connection.ops.sequence_reset_sql(no_style(), [Plan]):
+        schema_editor.execute(comando)
+
+    # Quem já tem uma data de expiração ganha um período equivalente no histórico
+    SubscriptionPeriod.objects.bulk_create([
+        SubscriptionPeriod(user_id=user_id, inicio=fim, fim=fim, origem='MIGRACAO')
+        for user_id, fim in CustomUser.objects.exclude(premium_expiration_date=None).values_list('pk', 'premium_expiration_date')
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0020_notificacaopagseguro'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Plan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=60, verbose_name='Nome do Plano')),
+                ('duracao_meses', models.PositiveSmallIntegerField(verbose_name='Duração (meses)')),
+                ('duracao_dias', models.PositiveSmallIntegerField(verbose_name='Dias de Acesso')),
+                ('preco', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Preço (R$)')),
+                ('pagseguro_url', models.URLField(blank=True, max_length=500, verbose_name='Link de Pagamento')),
+                ('ativo', models.BooleanField(default=True)),
+                ('ordem', models.PositiveSmallIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Plano',
+                'verbose_name_plural': 'Planos',
+                'ordering': ['ordem', 'duracao_meses'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubscriptionPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inicio', models.DateField()),
+                ('fim', models.DateField()),
+                ('origem', models.CharField(choices=[('PAGSEGURO', 'PagSeguro'), ('MANUAL', 'Manual'), ('MIGRACAO', 'Migração')], default='MANUAL', max_length=10)),
+                ('transacao', models.CharField(blank=True, max_length=100, verbose_name='Código da Transação')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('plan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='periodos', to='tips_core.plan')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='periodos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Período de Assinatura',
+                'verbose_name_plural': 'Períodos de Assinatura',
+                'ordering': ['-fim'],
+                'indexes': [models.Index(fields=['user', 'fim'], name='periodo_usuario_fim_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('transacao', ''), _negated=True), fields=('transacao',), name='periodo_transacao_unica')],
+            },
+        ),
+        migrations.RunPython(popular_planos_e_periodos, migrations.RunPython.noop),
+    ]
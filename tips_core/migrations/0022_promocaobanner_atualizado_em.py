@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0021_planos_periodos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promocaobanner',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0022_promocaobanner_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promocaobanner',
+            name='imagem_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='logo_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def criar_tabela_cache(apps, schema_editor):
+    # Cria a tabela do DatabaseCache (settings.CACHES) no deploy, junto com o
+    # migrate; não faz nada se já existir ou se o cache for local.
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0023_variantes_imagens'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_tabela_cache, migrations.RunPython.noop),
+    ]
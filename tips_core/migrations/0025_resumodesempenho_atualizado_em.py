@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_core', '0024_tabela_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumodesempenho',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -3,9 +3,58 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings 
-from django.db.models.signals import post_save 
+from django.db.models import Sum, Count, Max, F, Q, Case, When, Value, DecimalField, OuterRef, Subquery
+from django.db.models.functions import ExtractYear, ExtractMonth, Least
+from django.db import transaction, connection
 from django.utils import timezone 
-from datetime import date 
+from datetime import date, datetime, timedelta
+import unicodedata
+
+# --- BUSCA DE TIMES ---
+def normalizar_nome(texto):
+    """Remove acentos, passa para minúsculas e junta espaços repetidos ("Grêmio " -> "gremio")."""
+    sem_acento = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acento.lower().split())
+
+
+class TeamQuerySet(models.QuerySet):
+    def buscar(self, termo):
+        """
+        Busca tolerante a acentos e maiúsculas, ordenada por relevância.
+        No Postgres usa similaridade de trigramas (índice GIN em nome_normalizado);
+        nos demais bancos, exige todas as palavras do termo e ordena por
+        nome exato > começa com > contém. Um termo que fica vazio depois de
+        normalizado (só espaços ou símbolos) não filtra nada, mas também
+        recebe `relevancia`.
+        """
+        termo = normalizar_nome(termo)
+        if not termo:
+            return self.annotate(relevancia=Value(0, output_field=models.IntegerField()))
+
+        todas_as_palavras = Q()
+        for palavra in termo.split():
+            todas_as_palavras &= Q(nome_normalizado__contains=palavra)
+
+        relevancia = Case(
+            When(nome_normalizado=termo, then=0),
+            When(nome_normalizado__startswith=termo, then=1),
+            default=2,
+            output_field=models.IntegerField(),
+        )
+
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramSimilarity
+            # O lookup trigram_similar (operador %, limite pg_trgm.similarity_threshold,
+            # 0.3 por padrão) usa o índice GIN; filtrar pela anotação não usaria.
+            return self.filter(
+                todas_as_palavras | Q(nome_normalizado__trigram_similar=termo)
+            ).annotate(
+                relevancia=relevancia,
+                similaridade=TrigramSimilarity('nome_normalizado', termo),
+            ).order_by('relevancia', '-similaridade', 'name', 'pk')
+
+        return self.filter(todas_as_palavras).annotate(relevancia=relevancia).order_by('relevancia', 'name', 'pk')
+
 
 # --- NOVO MODELO: CADASTRO DE TIMES (PROFISSIONAL) ---
 class Team(models.Model):
@@ -14,26 +63,63 @@ class Team(models.Model):
     Permite centralizar nomes e escudos/logos.
     """
     name = models.CharField(max_length=100, unique=True, verbose_name="Nome do Time")
+    # Nome sem acentos e em minúsculas, usado pela busca. No Postgres recebe
+    # também um índice GIN de trigramas (criado na migração 0017).
+    nome_normalizado = models.CharField(max_length=100, db_index=True, editable=False, default='')
     logo = models.ImageField(
         upload_to='team_logos/', 
         blank=True, 
         null=True, 
         verbose_name="Escudo/Logo"
     )
+    # Versões redimensionadas (WebP/AVIF) e placeholder do escudo, geradas por tips_core.imagens
+    logo_variantes = models.JSONField(default=dict, blank=True, editable=False)
+
+    objects = TeamQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Time"
         verbose_name_plural = "Times"
         ordering = ['name']
 
+    def save(self, *args, **kwargs):
+        self.nome_normalizado = normalizar_nome(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'nome_normalizado'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
+class TeamAlias(models.Model):
+    """
+    Grafias alternativas de um time ("Vasco da gama", "Gremio"...), guardadas
+    quando times duplicados são unificados, para que importações futuras
+    apontem para o time canônico em vez de recriar o duplicado.
+    """
+    nome = models.CharField(max_length=100, verbose_name="Nome Alternativo")
+    nome_normalizado = models.CharField(max_length=100, unique=True, editable=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='aliases', verbose_name="Time")
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Nome Alternativo de Time"
+        verbose_name_plural = "Nomes Alternativos de Times"
+        ordering = ['nome']
+
+    def save(self, *args, **kwargs):
+        self.nome_normalizado = normalizar_nome(self.nome)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.nome} -> {self.team}"
+
 # --- 1. MODELO DE USUÁRIO CUSTOMIZADO ---
 class CustomUser(AbstractUser):
     """
     Modelo de Usuário estendido para o TipsGolBR.
-    A lógica de save() garante que is_premium_member seja controlado pela data.
+    O acesso Premium vale pela data de expiração (ver premium_ativo).
     """
     is_premium_member = models.BooleanField(
         default=False,
@@ -52,20 +138,22 @@ class CustomUser(AbstractUser):
         Sobrescreve o save() para garantir que is_premium_member seja sempre
         calculado pela data de expiração (Prevalência da data).
         """
-        today = date.today()
-        
-        # Correção para evitar IntegrityError: 
-        # Verificamos se existe uma data antes de comparar.
-        if self.premium_expiration_date:
-            is_active_by_date = self.premium_expiration_date >= today
-        else:
-            is_active_by_date = False
-        
         # Garante que o campo booleano nunca seja NULL ao salvar no banco
-        self.is_premium_member = is_active_by_date
+        self.is_premium_member = self.premium_ativo
         
         super().save(*args, **kwargs)
 
+    @property
+    def premium_ativo(self):
+        """
+        Direito ao Premium calculado na hora pela data de expiração (no fuso do
+        site). Não depende de um save() depois do vencimento e não consulta o
+        banco: a data já vem com o usuário carregado pelo AuthenticationMiddleware.
+        """
+        if not self.premium_expiration_date:
+            return False
+        return self.premium_expiration_date >= timezone.localdate()
+
     # --- CORREÇÃO DO ERRO E304 (Chaves Estrangeiras Colidindo) ---
     groups = models.ManyToManyField(
         'auth.Group',
@@ -82,6 +170,16 @@ class CustomUser(AbstractUser):
         verbose_name='user permissions',
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Varredura de vencimentos (expirar_premium): só toca quem ainda está marcado como Premium
+            models.Index(
+                fields=['premium_expiration_date'],
+                condition=Q(is_premium_member=True),
+                name='user_premium_vencimento_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.username
 
@@ -220,6 +318,24 @@ class Tip(models.Model):
     class Meta:
         verbose_name = "Dica de Aposta"
         verbose_name_plural = "Dicas de Apostas"
+        # Índices alinhados às consultas das views (ver comando benchmark_indices)
+        indexes = [
+            # Home (FREE) e Premium: só tips ativas, por nível de acesso e data
+            models.Index(
+                fields=['access_level', 'match_date'],
+                condition=models.Q(is_active=True),
+                name='tip_ativa_acesso_data_idx',
+            ),
+            # Dashboard de análise: apenas apostas concluídas, por data e método
+            models.Index(
+                fields=['match_date', 'method'],
+                condition=models.Q(status__in=['WIN', 'LOSS']),
+                name='tip_concluida_data_metodo_idx',
+            ),
+            # Páginas de times: jogos como mandante/visitante em ordem de data
+            models.Index(fields=['home_team', 'match_date'], name='tip_casa_data_idx'),
+            models.Index(fields=['away_team', 'match_date'], name='tip_visitante_data_idx'),
+        ]
 
     # 🌟 CORREÇÃO DE SEGURANÇA PARA EVITAR AttributeError 'NoneType'
     def __str__(self):
@@ -227,6 +343,201 @@ class Tip(models.Model):
             return f"{self.home_team.name} x {self.away_team.name} - {self.get_method_display()}"
         return f"Dica ID {self.id} (Sem times definidos)"
         
+
+
+
+# --- 2.1 RESUMO MENSAL DE DESEMPENHO (ROLLUP DO DASHBOARD) ---
+
+STATUS_CONCLUIDOS = ['WIN', 'LOSS']
+
+
+def lucro_liquido_expr():
+    """Lucro líquido de uma Tip: ganho se WIN, perda negativa se LOSS."""
+    return Case(
+        When(status='WIN', then=F('valor_ganho')),
+        When(status='LOSS', then=F('valor_perda') * -1),
+        default=0,
+        output_field=DecimalField(),
+    )
+
+
+class ResumoDesempenho(models.Model):
+    """
+    Totais das apostas concluídas (WIN/LOSS) por mês e método, na data local.
+    Mantido pelos signals de Tip e reconstruível com `manage.py reconstruir_resumos`,
+    permite ao dashboard responder sem varrer a tabela de Tips.
+    """
+    ano = models.PositiveSmallIntegerField(verbose_name="Ano")
+    mes = models.PositiveSmallIntegerField(verbose_name="Mês")
+    method = models.CharField(max_length=10, choices=METHOD_CHOICES, verbose_name='Método de Aposta')
+
+    total_aposta = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Total Apostado')
+    lucro_liquido = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Lucro Líquido')
+    total_wins = models.PositiveIntegerField(default=0, verbose_name='Ganhos')
+    total_losses = models.PositiveIntegerField(default=0, verbose_name='Perdas')
+    ultima_data = models.DateTimeField(null=True, blank=True, verbose_name='Último Jogo')
+    # Com a contagem de linhas, forma a versão dos dados do dashboard em cache
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Resumo Mensal de Desempenho"
+        verbose_name_plural = "Resumos Mensais de Desempenho"
+        ordering = ['ano', 'mes', 'method']
+        constraints = [
+            models.UniqueConstraint(fields=['ano', 'mes', 'method'], name='resumo_ano_mes_metodo_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:02d}/{self.ano} - {self.get_method_display()}"
+
+    @staticmethod
+    def chave(tip):
+        """(ano, mês, método) do resumo em que a Tip entra, ou None se não estiver concluída."""
+        if tip.status not in STATUS_CONCLUIDOS or not tip.match_date:
+            return None
+        data_local = timezone.localtime(tip.match_date)
+        return (data_local.year, data_local.month, tip.method)
+
+    @classmethod
+    def recalcular(cls, ano, mes, method):
+        """
+        Recalcula um único resumo a partir das Tips do mês/método.
+        Usa o índice parcial de apostas concluídas (match_date, method).
+        """
+        tz = timezone.get_current_timezone()
+        inicio = timezone.make_aware(datetime(ano, mes, 1), tz)
+        fim = timezone.make_aware(datetime(ano + mes // 12, mes % 12 + 1, 1), tz)
+
+        totais = Tip.objects.filter(
+            status__in=STATUS_CONCLUIDOS,
+            method=method,
+            match_date__gte=inicio,
+            match_date__lt=fim,
+        ).aggregate(
+            total_aposta=Sum('valor_aposta'),
+            lucro_liquido=Sum(lucro_liquido_expr()),
+            total_wins=Count('id', filter=models.Q(status='WIN')),
+            total_losses=Count('id', filter=models.Q(status='LOSS')),
+            ultima_data=Max('match_date'),
+        )
+
+        if not totais['total_wins'] and not totais['total_losses']:
+            cls.objects.filter(ano=ano, mes=mes, method=method).delete()
+            return
+
+        totais['total_aposta'] = totais['total_aposta'] or 0
+        totais['lucro_liquido'] = totais['lucro_liquido'] or 0
+        cls.objects.update_or_create(ano=ano, mes=mes, method=method, defaults=totais)
+
+    @classmethod
+    def reconstruir(cls):
+        """Refaz todos os resumos com uma única agregação sobre as Tips."""
+        linhas = Tip.objects.filter(status__in=STATUS_CONCLUIDOS).annotate(
+            ano=ExtractYear('match_date'),
+            mes=ExtractMonth('match_date'),
+        ).values('ano', 'mes', 'method').annotate(
+            total_aposta=Sum('valor_aposta'),
+            lucro_liquido=Sum(lucro_liquido_expr()),
+            total_wins=Count('id', filter=models.Q(status='WIN')),
+            total_losses=Count('id', filter=models.Q(status='LOSS')),
+            ultima_data=Max('match_date'),
+        ).order_by()
+
+        resumos = [
+            cls(**{**linha, 'total_aposta': linha['total_aposta'] or 0, 'lucro_liquido': linha['lucro_liquido'] or 0})
+            for linha in linhas
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(resumos, batch_size=1000)
+        return len(resumos)
+
+
+# --- 2.2 ESTATÍSTICAS DESNORMALIZADAS POR TIME (LISTA DE TIMES) ---
+class TeamStats(models.Model):
+    """
+    Contagem de jogos, soma das odds e último método de cada time.
+    Mantido pelos signals de Tip, evita que a lista de times junte as duas
+    relações reversas (casa x fora) e faça uma subconsulta por linha.
+    """
+    team = models.OneToOneField(
+        Team,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Time'
+    )
+    total_jogos = models.PositiveIntegerField(default=0, verbose_name='Total de Jogos')
+    soma_odds = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Soma das Odds')
+    ultimo_metodo = models.CharField(max_length=10, choices=METHOD_CHOICES, blank=True, default='', verbose_name='Último Método')
+    ultima_data = models.DateTimeField(null=True, blank=True, verbose_name='Último Jogo')
+
+    class Meta:
+        verbose_name = "Estatística de Time"
+        verbose_name_plural = "Estatísticas de Times"
+
+    def __str__(self):
+        return f"Estatísticas de {self.team}"
+
+    @property
+    def odd_media(self):
+        """Média real das odds (não a média das médias de casa e fora)."""
+        return self.soma_odds / self.total_jogos if self.total_jogos else 0
+
+    @classmethod
+    def recalcular(cls, team_ids):
+        """
+        Recalcula as estatísticas dos times informados com duas agregações
+        (como mandante e como visitante) e uma subconsulta para o último
+        método, gravando tudo num único upsert.
+        """
+        team_ids = [team_id for team_id in set(team_ids) if team_id]
+        if not team_ids:
+            return
+
+        totais = {team_id: {'total_jogos': 0, 'soma_odds': 0, 'ultima_data': None} for team_id in team_ids}
+        for lado in ('home_team', 'away_team'):
+            linhas = Tip.objects.filter(**{f'{lado}__in': team_ids}).values(lado).annotate(
+                jogos=Count('id'),
+                odds=Sum('odd_value'),
+                ultima=Max('match_date'),
+            ).order_by()
+            for linha in linhas:
+                total = totais[linha[lado]]
+                total['total_jogos'] += linha['jogos']
+                total['soma_odds'] += linha['odds'] or 0
+                if total['ultima_data'] is None or (linha['ultima'] and linha['ultima'] > total['ultima_data']):
+                    total['ultima_data'] = linha['ultima']
+
+        ultima_tip = Tip.objects.filter(
+            Q(home_team=OuterRef('pk')) | Q(away_team=OuterRef('pk'))
+        ).order_by('-match_date', '-id').values('method')[:1]
+        metodos = dict(
+            Team.objects.filter(pk__in=team_ids).annotate(
+                metodo=Subquery(ultima_tip)
+            ).values_list('pk', 'metodo')
+        )
+
+        # Times apagados no meio do caminho ficam de fora (não estão em `metodos`)
+        cls.objects.bulk_create(
+            [
+                cls(team_id=team_id, ultimo_metodo=metodos[team_id] or '', **total)
+                for team_id, total in totais.items()
+                if team_id in metodos
+            ],
+            update_conflicts=True,
+            unique_fields=['team'],
+            update_fields=['total_jogos', 'soma_odds', 'ultimo_metodo', 'ultima_data'],
+        )
+
+    @classmethod
+    def reconstruir(cls, lote=500):
+        """Recalcula as estatísticas de todos os times, em lotes."""
+        team_ids = list(Team.objects.values_list('pk', flat=True))
+        for inicio in range(0, len(team_ids), lote):
+            cls.recalcular(team_ids[inicio:inicio + lote])
+        return len(team_ids)
+
         
 # --- 3. MODELO DE NOTÍCIA ---
 class Noticia(models.Model):
@@ -251,6 +562,27 @@ class Noticia(models.Model):
     def __str__(self):
         return self.titulo
         
+
+
+# --- 3.1 ESTADO DE CADA FEED RSS (CONDITIONAL GET) ---
+class EstadoFeed(models.Model):
+    """
+    Guarda o ETag/Last-Modified devolvidos por cada feed e os IDs das
+    últimas entradas vistas, para o extrator pedir apenas o que mudou.
+    """
+    url = models.URLField(max_length=500, unique=True, verbose_name="URL do Feed")
+    etag = models.CharField(max_length=255, blank=True, default='', verbose_name="ETag")
+    last_modified = models.CharField(max_length=100, blank=True, default='', verbose_name="Last-Modified")
+    ultimos_ids = models.JSONField(default=list, blank=True, verbose_name="IDs das Últimas Entradas")
+    ultima_consulta = models.DateTimeField(null=True, blank=True, verbose_name="Última Consulta")
+
+    class Meta:
+        verbose_name = "Estado do Feed RSS"
+        verbose_name_plural = "Estados dos Feeds RSS"
+
+    def __str__(self):
+        return self.url
+
         
 # --- 4. MODELO DE ASSINATURA ---
 class Assinatura(models.Model):
@@ -269,6 +601,184 @@ class Assinatura(models.Model):
     def __str__(self):
         return f"Assinatura de {self.user.username} - Ativa: {self.is_active}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Guarda o estado lido do banco para o signal saber se is_active mudou
+        instance = super().from_db(db, field_names, values)
+        instance._is_active_original = instance.__dict__.get('is_active')
+        return instance
+
+    @staticmethod
+    def sincronizar_usuarios(user_ids, ativa):
+        """
+        Aplica o estado da assinatura aos usuários com UPDATEs em massa,
+        pulando quem já está certo:
+        - inativa: encerra os períodos em vigor e remove a data e o Premium;
+        - ativa: is_premium_member passa a refletir a data de expiração.
+        """
+        usuarios = CustomUser.objects.filter(pk__in=user_ids)
+        if not ativa:
+            SubscriptionPeriod.encerrar(user_ids)
+            return usuarios.exclude(
+                premium_expiration_date__isnull=True, is_premium_member=False,
+            ).update(premium_expiration_date=None, is_premium_member=False)
+
+        em_dia = Q(premium_expiration_date__gte=timezone.localdate())
+        return usuarios.filter(
+            (em_dia & Q(is_premium_member=False)) | (~em_dia & Q(is_premium_member=True))
+        ).update(is_premium_member=Case(When(em_dia, then=True), default=False))
+
+
+# --- 4.2 PLANOS E HISTÓRICO DE PERÍODOS DE ASSINATURA ---
+class Plan(models.Model):
+    """Planos vendidos na página de checkout (o pk é o id usado nos links do PagSeguro)."""
+    nome = models.CharField(max_length=60, verbose_name="Nome do Plano")
+    duracao_meses = models.PositiveSmallIntegerField(verbose_name="Duração (meses)")
+    duracao_dias = models.PositiveSmallIntegerField(verbose_name="Dias de Acesso")
+    preco = models.DecimalField(max_digits=8, decimal_places=2, verbose_name="Preço (R$)")
+    pagseguro_url = models.URLField(max_length=500, blank=True, verbose_name="Link de Pagamento")
+    ativo = models.BooleanField(default=True)
+    ordem = models.PositiveSmallIntegerField(default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Plano"
+        verbose_name_plural = "Planos"
+        ordering = ['ordem', 'duracao_meses']
+
+    def __str__(self):
+        return f"{self.nome} - R$ {self.preco}"
+
+
+class SubscriptionPeriod(models.Model):
+    """
+    Livro-razão das assinaturas: cada pagamento (ou ativação manual) vira um
+    período [inicio, fim]. A expiração efetiva do usuário é o maior `fim`,
+    obtido com um único MAX sobre o índice (user, fim), e é copiada para
+    CustomUser.premium_expiration_date para a checagem de acesso não precisar
+    de consulta extra.
+    """
+    ORIGEM_CHOICES = [
+        ('PAGSEGURO', 'PagSeguro'),
+        ('MANUAL', 'Manual'),
+        ('MIGRACAO', 'Migração'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='periodos')
+    plan = models.ForeignKey(Plan, on_delete=models.PROTECT, null=True, blank=True, related_name='periodos')
+    inicio = models.DateField()
+    fim = models.DateField()
+    origem = models.CharField(max_length=10, choices=ORIGEM_CHOICES, default='MANUAL')
+    transacao = models.CharField(max_length=100, blank=True, verbose_name="Código da Transação")
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Período de Assinatura"
+        verbose_name_plural = "Períodos de Assinatura"
+        ordering = ['-fim']
+        indexes = [
+            models.Index(fields=['user', 'fim'], name='periodo_usuario_fim_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['transacao'], condition=~Q(transacao=''), name='periodo_transacao_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} ({self.inicio:%d/%m/%Y} - {self.fim:%d/%m/%Y})"
+
+    @classmethod
+    def expiracoes(cls, user_ids):
+        """Expiração efetiva de vários usuários numa única agregação agrupada."""
+        return dict(
+            cls.objects.filter(user_id__in=user_ids).values('user').annotate(fim=Max('fim')).values_list('user', 'fim')
+        )
+
+    @classmethod
+    def registrar(cls, user, plan, origem='MANUAL', transacao=''):
+        """
+        Acrescenta um período para o plano, emendado no fim do período atual
+        (ou começando hoje, se já venceu), e atualiza a expiração do usuário.
+        Sem plano (nenhum cadastrado/ativo) levanta ValueError, sem gravar nada.
+        """
+        if plan is None:
+            raise ValueError('Nenhum plano para registrar o período de assinatura.')
+        hoje = timezone.localdate()
+        with transaction.atomic():
+            # Trava o usuário: dois pagamentos simultâneos não calculam o mesmo início.
+            # A data gravada no usuário também conta (ajustes manuais feitos no admin).
+            data_usuario = CustomUser.objects.select_for_update().filter(pk=user.pk).values_list(
+                'premium_expiration_date', flat=True,
+            ).get()
+            fim_atual = cls.objects.filter(user=user).aggregate(fim=Max('fim'))['fim']
+
+            inicio = max(data for data in (fim_atual, data_usuario, hoje) if data)
+            periodo = cls.objects.create(
+                user=user, plan=plan, origem=origem, transacao=transacao,
+                inicio=inicio, fim=inicio + timedelta(days=plan.duracao_dias),
+            )
+
+            user.premium_expiration_date = periodo.fim
+            user.save(update_fields=['premium_expiration_date', 'is_premium_member'])
+        return periodo
+
+    @classmethod
+    def encerrar(cls, user_ids):
+        """
+        Cancelamento: encerra ontem os períodos que ainda estavam valendo. Os
+        que ainda não tinham começado (renovações emendadas) ficam vazios em
+        ontem, para o fim nunca ser anterior ao início.
+        """
+        ontem = timezone.localdate() - timedelta(days=1)
+        return cls.objects.filter(user_id__in=user_ids, fim__gt=ontem).update(
+            inicio=Least('inicio', Value(ontem, output_field=models.DateField())), fim=ontem,
+        )
+
+
+# --- 4.1 CAIXA DE ENTRADA DAS NOTIFICAÇÕES DO PAGSEGURO ---
+class NotificacaoPagSeguro(models.Model):
+    """
+    Cada notificação recebida no webhook vira uma linha (única por código) e é
+    processada depois pelo comando processar_notificacoes. O crédito de um
+    pagamento é aplicado no máximo uma vez por transação (ver a constraint).
+    """
+    STATUS_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('PROCESSADA', 'Processada'),
+        ('FALHOU', 'Falhou'),
+    ]
+
+    codigo = models.CharField(max_length=100, unique=True, verbose_name="Código da Notificação")
+    tipo = models.CharField(max_length=30, default='transaction')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDENTE')
+    recebida_em = models.DateTimeField(auto_now_add=True)
+    proxima_tentativa = models.DateTimeField(default=timezone.now)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    ultimo_erro = models.TextField(blank=True)
+    processada_em = models.DateTimeField(null=True, blank=True)
+
+    # Preenchidos a partir da consulta à API do PagSeguro
+    transacao = models.CharField(max_length=100, blank=True, verbose_name="Código da Transação")
+    referencia = models.CharField(max_length=150, blank=True)
+    status_transacao = models.CharField(max_length=2, blank=True)
+    credito_aplicado = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Notificação do PagSeguro"
+        verbose_name_plural = "Notificações do PagSeguro"
+        ordering = ['-recebida_em']
+        indexes = [
+            models.Index(fields=['proxima_tentativa'], condition=Q(status='PENDENTE'), name='notificacao_pendente_idx'),
+        ]
+        constraints = [
+            # Garante no banco que um pagamento nunca estende a assinatura duas vezes
+            models.UniqueConstraint(
+                fields=['transacao'], condition=Q(credito_aplicado=True), name='notificacao_credito_unico',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.codigo} ({self.get_status_display()})"
+
 
 # --- 5. MODELO DE PROMOÇÃO/BANNER PARA CARROSSEL ---
 class PromocaoBanner(models.Model):
@@ -279,11 +789,14 @@ class PromocaoBanner(models.Model):
         upload_to='promo_banners/', 
         verbose_name="Imagem/Banner (Upload)"
     )
+    # Versões redimensionadas (WebP/AVIF) e placeholder do banner, geradas por tips_core.imagens
+    imagem_variantes = models.JSONField(default=dict, blank=True, editable=False)
 
     link_url = models.URLField(max_length=500, verbose_name="URL de Redirecionamento", help_text="Link para onde o banner irá direcionar.")
     ativo = models.BooleanField(default=True, verbose_name="Banner Ativo", help_text="Marque para exibir o banner no carrossel.")
     ordem = models.IntegerField(default=0, help_text="Defina a ordem de exibição (menor número aparece primeiro).")
     data_criacao = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['ordem', '-data_criacao']
@@ -291,23 +804,4 @@ class PromocaoBanner(models.Model):
         verbose_name_plural = "Banners de Promoções"
 
     def __str__(self):
-        return self.titulo or f"Banner ID {self.id}" 
-
-# ----------------------------------------------------------------
-# --- LOGICA DE SINCRONIZAÇÃO VIA SIGNALS (REVISADA) ---
-# ----------------------------------------------------------------
-
-def sync_premium_status(sender, instance, **kwargs):
-    """
-    Sincroniza a Assinatura com o CustomUser.
-    """
-    user = instance.user
-    
-    # Se a assinatura for marcada como inativa, podemos limpar a data (opcional)
-    if not instance.is_active:
-        user.premium_expiration_date = None
-        
-    # Salva o usuário, o que dispara o método save() do CustomUser e recalcula tudo
-    user.save() 
-
-post_save.connect(sync_premium_status, sender=Assinatura)
\ No newline at end of file
+        return self.titulo or f"Banner ID {self.id}"
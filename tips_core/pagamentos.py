@@ -0,0 +1,185 @@
+# tips_core/pagamentos.py
+# Processamento das notificações do PagSeguro guardadas pelo webhook.
+# A consulta à API acontece fora do ciclo da requisição, com sessão HTTP
+# reaproveitada, timeouts e novas tentativas; o crédito na assinatura é
+# aplicado uma única vez por transação.
+
+import logging
+import xml.etree.ElementTree as ET
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Assinatura, NotificacaoPagSeguro, Plan, SubscriptionPeriod
+
+TIMEOUT_CONEXAO = 3.05      # segundos para abrir a conexão
+TIMEOUT_LEITURA = 10        # segundos para receber a resposta
+MAX_TENTATIVAS = 8          # depois disso a notificação fica como FALHOU
+
+STATUS_PAGOS = ('3', '4')        # Paga, Disponível
+STATUS_CANCELADOS = ('6', '7')   # Devolvida, Cancelada
+
+logger = logging.getLogger(__name__)
+
+
+class NotificacaoInvalida(Exception):
+    """Resposta do PagSeguro sem os dados necessários (não adianta tentar de novo)."""
+
+
+def criar_sessao():
+    """Sessão com pool de conexões e novas tentativas para falhas temporárias (5xx, 429, rede)."""
+    sessao = requests.Session()
+    tentativas = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET',),
+    )
+    sessao.mount('https://', HTTPAdapter(max_retries=tentativas, pool_maxsize=4))
+    sessao.mount('http://', HTTPAdapter(max_retries=tentativas, pool_maxsize=4))
+    return sessao
+
+
+def consultar_transacao(sessao, codigo):
+    """Busca no PagSeguro os dados da transação de uma notificação."""
+    response = sessao.get(
+        f'{settings.PAGSEGURO_NOTIFICATION_URL}{codigo}',
+        params={'email': settings.PAGSEGURO_SELLER_EMAIL, 'token': settings.PAGSEGURO_TOKEN},
+        timeout=(TIMEOUT_CONEXAO, TIMEOUT_LEITURA),
+    )
+    response.raise_for_status()
+
+    try:
+        raiz = ET.fromstring(response.content)
+    except ET.ParseError as e:
+        raise NotificacaoInvalida(f'XML inválido: {e}')
+
+    dados = {campo: (raiz.findtext(campo) or '').strip() for campo in ('code', 'reference', 'status')}
+    if not all(dados.values()):
+        raise NotificacaoInvalida('Resposta sem code, reference ou status.')
+    dados['item'] = (raiz.findtext('items/item/id') or '').strip()
+    dados['valor'] = (raiz.findtext('grossAmount') or '').strip()
+    return dados
+
+
+def identificar_plano(dados):
+    """
+    Plano pago: pelo id do item, senão pelo valor. None se nenhum dos dois
+    bate (ex.: preço alterado, desconto): não se adivinha o plano, a
+    notificação falha para a equipe resolver no admin.
+    """
+    planos = Plan.objects.order_by('duracao_dias')
+    if dados.get('item', '').isdigit():
+        plano = planos.filter(pk=int(dados['item'])).first()
+        if plano:
+            return plano
+    try:
+        plano = planos.filter(preco=Decimal(dados.get('valor', ''))).first()
+    except InvalidOperation:
+        plano = None
+    return plano
+
+
+def aplicar_notificacao(notificacao_id, dados):
+    """
+    Aplica o resultado da transação ao usuário (referência = username) numa
+    transação só. O usuário fica travado (select_for_update) enquanto se
+    verifica se a transação já rendeu crédito, então duas notificações do
+    mesmo pagamento (ex.: status 3 e depois 4) nunca estendem duas vezes.
+    """
+    User = get_user_model()
+
+    with transaction.atomic():
+        notificacao = NotificacaoPagSeguro.objects.select_for_update().get(pk=notificacao_id)
+        if notificacao.status == 'PROCESSADA':
+            return notificacao
+
+        notificacao.transacao = dados['code']
+        notificacao.referencia = dados['reference']
+        notificacao.status_transacao = dados['status']
+
+        user = User.objects.select_for_update().filter(username=dados['reference']).first()
+        if user is None:
+            # Fica como FALHOU (e não PROCESSADA) para poder ser reprocessada pelo admin
+            # depois de corrigir o usuário; repetir sozinha não adianta
+            raise NotificacaoInvalida(
+                f"Usuário {dados['reference']} não encontrado via referência (transação {dados['code']})."
+            )
+
+        if dados['status'] in STATUS_PAGOS:
+            ja_creditada = NotificacaoPagSeguro.objects.filter(
+                transacao=dados['code'], credito_aplicado=True,
+            ).exists()
+            if not ja_creditada:
+                plano = identificar_plano(dados)
+                if plano is None:
+                    raise NotificacaoInvalida(
+                        f"Plano não identificado (item '{dados.get('item')}', valor '{dados.get('valor')}') "
+                        f"na transação {dados['code']}: ajuste o plano e reprocesse pelo admin."
+                    )
+                # Novo período do plano pago, emendado no fim do período atual
+                SubscriptionPeriod.registrar(user, plano, origem='PAGSEGURO', transacao=dados['code'])
+                Assinatura.objects.update_or_create(user=user, defaults={'is_active': True})
+                notificacao.credito_aplicado = True
+
+        elif dados['status'] in STATUS_CANCELADOS:
+            # A sincronização da Assinatura encerra os períodos e remove o Premium do usuário
+            Assinatura.objects.update_or_create(user=user, defaults={'is_active': False})
+
+        notificacao.status = 'PROCESSADA'
+        notificacao.processada_em = timezone.now()
+        notificacao.save()
+    return notificacao
+
+
+def registrar_falha(notificacao, erro, definitiva=False):
+    """Agenda uma nova tentativa com espera exponencial (1, 2, 4... minutos)."""
+    notificacao.tentativas += 1
+    notificacao.ultimo_erro = str(erro)[:2000]
+    if definitiva or notificacao.tentativas >= MAX_TENTATIVAS:
+        notificacao.status = 'FALHOU'
+    else:
+        notificacao.proxima_tentativa = timezone.now() + timedelta(minutes=2 ** (notificacao.tentativas - 1))
+    notificacao.save(update_fields=['tentativas', 'ultimo_erro', 'status', 'proxima_tentativa'])
+
+
+def processar_pendentes(lote=100, sessao=None):
+    """Processa as notificações pendentes cuja próxima tentativa já chegou."""
+    sessao = sessao or criar_sessao()
+    resultado = {'processadas': 0, 'creditadas': 0, 'falhas': 0}
+
+    pendentes = NotificacaoPagSeguro.objects.filter(
+        status='PENDENTE', proxima_tentativa__lte=timezone.now(),
+    ).order_by('proxima_tentativa')[:lote]
+
+    for notificacao in pendentes:
+        try:
+            dados = consultar_transacao(sessao, notificacao.codigo)
+            notificacao = aplicar_notificacao(notificacao.pk, dados)
+        except NotificacaoInvalida as e:
+            logger.warning("Notificação %s inválida: %s", notificacao.codigo, e)
+            registrar_falha(notificacao, e, definitiva=True)
+            resultado['falhas'] += 1
+        except (requests.RequestException, IntegrityError) as e:
+            # IntegrityError: outro worker creditou a mesma transação ao mesmo tempo
+            logger.warning("Erro ao processar notificação %s: %s", notificacao.codigo, e)
+            registrar_falha(notificacao, e)
+            resultado['falhas'] += 1
+        except Exception as e:
+            # Erro inesperado numa notificação não pode travar as seguintes do lote:
+            # fica registrado e segue a mesma espera exponencial das demais falhas
+            logger.exception("Erro inesperado ao processar notificação %s", notificacao.codigo)
+            registrar_falha(notificacao, e)
+            resultado['falhas'] += 1
+        else:
+            resultado['processadas'] += 1
+            resultado['creditadas'] += int(notificacao.credito_aplicado)
+
+    return resultado
@@ -1,21 +1,121 @@
-from django.db.models.signals import post_save
-from django.contrib.auth import update_session_auth_hash
-from .models import Assinatura 
+from django.db.models.signals import post_save, pre_save, post_delete
+from .models import Assinatura, Tip, Team, ResumoDesempenho, TeamStats, Plan, PromocaoBanner
+from . import cache_versionado, imagens
 
-def sync_premium_status(sender, instance, created, **kwargs):
+# ----------------------------------------------------------------
+# --- ASSINATURA -> USUÁRIO: SINCRONIZAÇÃO DO PREMIUM ---
+# ----------------------------------------------------------------
+
+def sync_premium_status(sender, instance, created, raw=False, update_fields=None, **kwargs):
     """
-    Sincroniza o status 'is_active' da Assinatura com o campo 'is_premium_member' do Usuário.
-    Executado após o modelo Assinatura ser salvo.
+    Único caminho de sincronização da Assinatura para o CustomUser: um UPDATE
+    direcionado (sem passar pelo save() do usuário), e só quando is_active
+    mudou ou a assinatura é nova.
     """
-    # 1. Puxa o objeto do usuário
-    user = instance.user
-    
-    # 2. Atualiza o status do usuário com o status da Assinatura
-    user.is_premium_member = instance.is_active
-    
-    # 3. Salva o objeto do usuário
-    # Usar update_fields evita que este signal chame recursivamente outros signals
-    user.save(update_fields=['is_premium_member']) 
+    if raw:
+        return
+    if update_fields is not None and 'is_active' not in update_fields:
+        return
+    if not created and getattr(instance, '_is_active_original', None) == instance.is_active:
+        return
+
+    Assinatura.sincronizar_usuarios([instance.user_id], instance.is_active)
+    instance._is_active_original = instance.is_active
 
 # Conecta a função ao evento post_save do modelo Assinatura
-post_save.connect(sync_premium_status, sender=Assinatura)
\ No newline at end of file
+post_save.connect(sync_premium_status, sender=Assinatura)
+
+
+# --- PLANOS: INVALIDAÇÃO DO CACHE DA PÁGINA DE CHECKOUT ---
+def invalidar_cache_planos(sender, **kwargs):
+    cache_versionado.incrementar_versao('planos')
+
+post_save.connect(invalidar_cache_planos, sender=Plan)
+post_delete.connect(invalidar_cache_planos, sender=Plan)
+
+
+# --- UPLOADS: VARIANTES DOS ESCUDOS E BANNERS ---
+# Só agenda quando o arquivo mudou; a gravação das variantes não reagenda.
+def agendar_variantes_logo(sender, instance, raw=False, **kwargs):
+    if not raw:
+        imagens.agendar(instance, 'logo')
+
+
+def agendar_variantes_banner(sender, instance, raw=False, **kwargs):
+    if not raw:
+        imagens.agendar(instance, 'imagem')
+
+post_save.connect(agendar_variantes_logo, sender=Team)
+post_save.connect(agendar_variantes_banner, sender=PromocaoBanner)
+
+
+# ----------------------------------------------------------------
+# --- RESUMOS DERIVADOS DAS TIPS: MANUTENÇÃO INCREMENTAL ---
+# ----------------------------------------------------------------
+# ResumoDesempenho (dashboard) e TeamStats (lista de times) são recalculados
+# apenas para os meses/métodos e times que a alteração realmente tocou.
+
+CAMPOS_RESUMO = ('status', 'method', 'match_date', 'valor_aposta', 'valor_ganho', 'valor_perda')
+CAMPOS_TIMES = ('home_team_id', 'away_team_id', 'odd_value', 'match_date', 'method')
+CAMPOS_MONITORADOS = tuple(dict.fromkeys(CAMPOS_RESUMO + CAMPOS_TIMES))
+
+
+def _mudou(anterior, instance, campos):
+    if anterior is None:
+        return True
+    return any(anterior[campo] != getattr(instance, campo) for campo in campos)
+
+
+def guardar_tip_anterior(sender, instance, raw=False, **kwargs):
+    """
+    Antes de salvar, guarda na instância os campos que afetam os resumos,
+    para o post_save saber de qual mês/método e de quais times a Tip saiu.
+    """
+    instance._estado_anterior = None
+    if raw or not instance.pk:
+        return
+    instance._estado_anterior = Tip.objects.filter(pk=instance.pk).values(*CAMPOS_MONITORADOS).first()
+
+
+def atualizar_resumos_tip(sender, instance, raw=False, **kwargs):
+    """
+    Recalcula os resumos (ano, mês, método) e as estatísticas dos times
+    afetados pela Tip, antes e depois da alteração. Edições que não mexem
+    nesses campos (ex.: observação) não geram nenhuma consulta extra.
+    """
+    if raw:
+        return
+
+    anterior = getattr(instance, '_estado_anterior', None)
+
+    if _mudou(anterior, instance, CAMPOS_RESUMO):
+        chaves = {ResumoDesempenho.chave(instance)}
+        if anterior:
+            chaves.add(ResumoDesempenho.chave(Tip(**{campo: anterior[campo] for campo in CAMPOS_RESUMO})))
+        chaves.discard(None)
+
+        for chave in chaves:
+            ResumoDesempenho.recalcular(*chave)
+
+    if _mudou(anterior, instance, CAMPOS_TIMES):
+        times = {instance.home_team_id, instance.away_team_id}
+        if anterior:
+            times |= {anterior['home_team_id'], anterior['away_team_id']}
+        TeamStats.recalcular(times)
+
+
+def remover_tip_dos_resumos(sender, instance, origin=None, **kwargs):
+    chave = ResumoDesempenho.chave(instance)
+    if chave:
+        ResumoDesempenho.recalcular(*chave)
+
+    # Se a Tip está sendo apagada em cascata junto com o próprio time,
+    # as estatísticas dele também serão apagadas: não há o que recalcular.
+    if isinstance(origin, Team) or getattr(origin, 'model', None) is Team:
+        return
+    TeamStats.recalcular({instance.home_team_id, instance.away_team_id})
+
+
+pre_save.connect(guardar_tip_anterior, sender=Tip)
+post_save.connect(atualizar_resumos_tip, sender=Tip)
+post_delete.connect(remover_tip_dos_resumos, sender=Tip)
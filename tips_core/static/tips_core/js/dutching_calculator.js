@@ -0,0 +1,450 @@
+Chart.register(ChartDataLabels);
+
+// --- Variáveis Globais de Cores e Formatação ---
+const COLOR_SUCCESS = '#198754';
+const COLOR_LOSS = '#dc3545';
+const COLOR_PRIMARY = '#ffc107';
+// Função de formatação para R$
+const R = (value) => value.toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' });
+
+
+// ######################################################################
+// --- LÓGICA DE ABAS (Alternância) ---
+// ######################################################################
+function showTool(toolId) {
+    document.querySelectorAll('.tab-content').forEach(tab => {
+        tab.style.display = 'none';
+    });
+    document.getElementById(toolId).style.display = 'block';
+
+    document.querySelectorAll('.tab-button').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    document.querySelector(`.tab-button[onclick="showTool('${toolId}')"]`).classList.add('active');
+
+    // Inicialização específica
+    if (toolId === 'dutching') {
+        calculateDutching();
+    } else if (toolId === 'simulador') {
+         // Limpa o display do simulador e calcula o lucro inicial do LAY
+         document.getElementById('simuladorResultados').classList.add('hidden');
+         calcularLucroLay(); // Executa o cálculo inicial para preencher o campo de lucro
+    }
+}
+
+// --- LÓGICA DA CALCULADORA DUTCHING (PRESERVADA) ---
+// Variáveis globais Dutching
+const totalStakeInput = document.getElementById('totalStake');
+const totalPayoutDisplay = document.getElementById('totalPayout');
+const netProfitDisplay = document.getElementById('netProfit');
+const totalStakeDistributedDisplay = document.getElementById('totalStakeDistributed');
+const stakeDifferenceAlert = document.getElementById('stakeDifferenceAlert');
+const stakesResults = document.getElementById('stakesResults');
+const leftColumn = document.getElementById('leftColumn');
+const rightColumn = document.getElementById('rightColumn');
+
+let oddCounter = 0; 
+
+function renderOdds() {
+    leftColumn.innerHTML = ''; rightColumn.innerHTML = '';
+    const initialVisibleOdds = 3; 
+
+    for (let i = 1; i <= 12; i++) {
+        const newRow = document.createElement('div');
+        newRow.className = 'odd-input-row row g-3 align-items-center';
+        newRow.id = `row${i}`;
+
+        const targetColumn = (i <= 6) ? leftColumn : rightColumn;
+        const isDisabled = (i > initialVisibleOdds); 
+
+        let defaultValue = '';
+        if (i === 1) defaultValue = '2.50';
+        if (i === 2) defaultValue = '4.00';
+        if (i === 3) defaultValue = '8.00';
+
+        newRow.innerHTML = `
+            <div class="col-12">
+                <label class="label-odd" for="odd${i}">Aposta ${i}:</label>
+                <input type="number" id="odd${i}" class="form-control odd-input" 
+                        value="${defaultValue}" 
+                        min="1.01" step="0.01" 
+                        oninput="calculateDutching()" 
+                        ${isDisabled ? 'disabled' : ''}>
+                <span id="stakeDisplay${i}" class="fw-bold text-info small ms-2"></span>
+            </div>
+        `;
+        targetColumn.appendChild(newRow);
+    }
+    oddCounter = initialVisibleOdds; 
+}
+
+function addOddInput() {
+    if (oddCounter >= 12) { console.log('O limite é de 12 Odds.'); return; }
+    oddCounter++;
+    const newOddId = oddCounter;
+    const input = document.getElementById(`odd${newOddId}`);
+    if (input) { input.disabled = false; input.value = ''; input.focus(); }
+    calculateDutching();
+}
+
+function removeOddInput() {
+    if (oddCounter <= 1) { console.log('É necessário manter pelo menos 1 slot de Odd visível.'); return; }
+    const input = document.getElementById(`odd${oddCounter}`);
+    if (input) { input.value = ''; input.disabled = true; }
+    document.getElementById(`stakeDisplay${oddCounter}`).textContent = '';
+    oddCounter--;
+    calculateDutching();
+}
+
+function calculateDutching() {
+    const totalStake = parseFloat(totalStakeInput.value) || 0;
+    const oddInputs = [];
+
+    for (let i = 1; i <= oddCounter; i++) {
+        const inputElement = document.getElementById(`odd${i}`);
+        if (inputElement && !inputElement.disabled) {
+            if (inputElement.value.trim() === '') { document.getElementById(`stakeDisplay${i}`).textContent = ''; continue; }
+            const oddValue = parseFloat(inputElement.value);
+            if (!isNaN(oddValue) && oddValue > 1.0) {
+                oddInputs.push({ odd: oddValue, index: i });
+            } else {
+                stakeDifferenceAlert.textContent = `Erro: Aposta ${i} (Odd ${inputElement.value}) deve ser um número maior que 1.0.`;
+                stakeDifferenceAlert.style.display = 'block';
+                renderIndividualStakes([], 0, 0); return;
+            }
+        }
+    }
+
+    if (oddInputs.length < 1 || totalStake <= 0) {
+        stakeDifferenceAlert.style.display = 'none'; 
+        totalPayoutDisplay.textContent = 'R$ 0,00'; netProfitDisplay.textContent = 'R$ 0,00'; netProfitDisplay.className = 'fw-bold';
+        totalStakeDistributedDisplay.textContent = 'R$ 0,00';
+        renderIndividualStakes([], 0, 0);
+        return;
+    }
+
+    stakeDifferenceAlert.style.display = 'none'; 
+
+    const sumOfInverses = oddInputs.reduce((sum, item) => sum + (1 / item.odd), 0);
+    const totalPayout = totalStake / sumOfInverses; 
+    let totalActualStake = 0;
+
+    oddInputs.forEach(item => {
+        const stakeIndividual = totalPayout / item.odd;
+        totalActualStake += stakeIndividual;
+        document.getElementById(`stakeDisplay${item.index}`).textContent = `R$ ${stakeIndividual.toFixed(2)}`;
+    });
+
+    const netProfit = totalPayout - totalStake;
+
+    totalPayoutDisplay.textContent = `R$ ${totalPayout.toFixed(2)}`;
+    netProfitDisplay.textContent = `R$ ${netProfit.toFixed(2)}`;
+    netProfitDisplay.className = netProfit >= 0 ? 'text-win fw-bold' : netProfit < 0 ? 'text-loss fw-bold' : 'text-secondary fw-bold';
+
+    totalStakeDistributedDisplay.textContent = `R$ ${totalActualStake.toFixed(2)}`;
+
+    const difference = Math.abs(totalActualStake - totalStake);
+    if (difference > 0.01) { 
+        stakeDifferenceAlert.textContent = `Atenção: A soma das Stakes (R$ ${totalActualStake.toFixed(2)}) é diferente da Stake Total (R$ ${totalStake.toFixed(2)}) devido ao arredondamento.`;
+        stakeDifferenceAlert.style.display = 'block';
+    } else {
+        stakeDifferenceAlert.style.display = 'none';
+    }
+
+    renderIndividualStakes(oddInputs, totalPayout, totalStake);
+}
+
+function renderIndividualStakes(oddInputs, totalPayout, totalStake) {
+    let resultsHTML = '';
+
+    if (oddInputs.length < 1) {
+         stakesResults.innerHTML = '<p class="text-secondary small mb-0">Insira pelo menos 1 Odd válida para ver a distribuição.</p>';
+         return;
+    }
+
+    oddInputs.forEach(item => {
+        const stakeIndividual = totalPayout / item.odd;
+
+        resultsHTML += `
+            <div class="result-row row">
+                <div class="col-md-6 text-warning fw-bold">Aposta ${item.index} (Odd ${item.odd.toFixed(2)}):</div>
+                <div class="col-md-6">
+                    Stake: 
+                    <span class="fw-bold text-info">R$ ${stakeIndividual.toFixed(2)}</span>
+                </div>
+            </div>
+        `;
+    });
+
+    stakesResults.innerHTML = resultsHTML;
+}
+
+
+// ######################################################################
+// --- 2. LÓGICA DO SIMULADOR DE STAKE (LAY/BACK FOCADO) ---
+// ######################################################################
+
+let simuladorChartInstance = null; 
+
+// Função para calcular lucro LAY ou BACK e Prejuízo por Red (Stop-Loss)
+function calcularLucroLay() {
+    const stakeFixa = parseFloat(document.getElementById('simuladorStakeFixa').value);
+    const oddEntrada = parseFloat(document.getElementById('simuladorOddEntrada').value);
+    const lossPercentValue = parseFloat(document.getElementById('simuladorLossPercent').value) / 100;
+    const modalidade = document.getElementById('simuladorModalidade').value; 
+
+    const displayLucro = document.getElementById('lucroCalculadoLay');
+    const displayPrejuizoRed = document.getElementById('simuladorPrejuizoRedDisplay');
+
+    if (isNaN(stakeFixa) || isNaN(oddEntrada) || oddEntrada <= 1.0 || stakeFixa <= 0) {
+         displayLucro.textContent = 'R$ 0.00';
+         displayPrejuizoRed.textContent = 'R$ 0.00';
+         return;
+    }
+
+    let lucroCalculado;
+
+    if (modalidade === 'LAY') {
+        lucroCalculado = stakeFixa / (oddEntrada - 1);
+    } else { // Modalidade === 'BACK'
+        lucroCalculado = stakeFixa * (oddEntrada - 1);
+    }
+
+    const prejuizoRed = stakeFixa * lossPercentValue;
+
+    // Atualiza o display do Green/Lucro
+    displayLucro.textContent = R(lucroCalculado);
+
+    // Atualiza o display do Red/Stop-Loss
+    displayPrejuizoRed.textContent = R(prejuizoRed);
+
+    // Atualiza o rótulo do display de Red para refletir a % atual
+    document.querySelector('#simuladorResultados .row .col-md-4:last-child p').textContent = `Perda Fixa por Red (${(lossPercentValue * 100).toFixed(0)}% sobre Stake):`;
+
+}
+
+// Função principal de simulação (Lógica LAY/BACK integrada)
+function simular() {
+
+const modalidade = document.getElementById('simuladorModalidade').value;
+const maxDias = 365; // Limite de 365 dias.
+
+const stakeFixa = parseFloat(document.getElementById('simuladorStakeFixa').value);
+const oddEntrada = parseFloat(document.getElementById('simuladorOddEntrada').value);
+const winRateStr = document.getElementById('simuladorWinRate').value;
+const lossPercent = parseFloat(document.getElementById('simuladorLossPercent').value) / 100; 
+
+const [winsPerCycle, lossesPerCycle] = winRateStr.split(':').map(Number);
+const cycleLength = winsPerCycle + lossesPerCycle;
+
+const resultadosDiv = document.getElementById('simuladorResultados');
+const tabelaCorpo = document.getElementById('simuladorTabelaCorpo');
+const mensagemDiv = document.getElementById('simuladorMensagem');
+const loadingDiv = document.getElementById('simuladorLoading');
+
+// Validação básica
+if (isNaN(stakeFixa) || isNaN(oddEntrada) || stakeFixa <= 0 || oddEntrada <= 1.0) {
+mensagemDiv.className = 'alert alert-danger d-block';
+mensagemDiv.textContent = 'Por favor, insira valores válidos para Stake e Odd (Odd > 1.0).';
+resultadosDiv.classList.add('hidden');
+loadingDiv.classList.add('hidden');
+return;
+}
+
+// Inicializações
+let stakeAtual = Math.round(stakeFixa * 100) / 100; // Stake ACUMULADA (inicia com a Stake base)
+const stakeInicialOriginal = stakeAtual;
+let dia = 0;
+let historico = [];
+
+mensagemDiv.classList.add('hidden');
+loadingDiv.classList.remove('hidden');
+resultadosDiv.classList.add('hidden');
+
+if (simuladorChartInstance) { simuladorChartInstance.destroy(); }
+
+// Garante que os displays iniciais estejam corretos
+calcularLucroLay(); 
+
+// Loop síncrono: aplica ciclo Win:Loss e juros compostos/stake fixa
+while (stakeAtual > 0 && dia < maxDias) { 
+dia++;
+let resultado = 0;
+let stakeAnteriorAcumulada = stakeAtual;
+let status;
+
+// Stake Usada na Aposta (Cálculo): 
+// LAY (Juros Compostos): USA a stake atual acumulada 
+// BACK (Stake Fixa): USA a stake inicial original
+const stakeBaseParaCalculo = (modalidade === 'LAY') ? stakeAnteriorAcumulada : stakeInicialOriginal;
+
+// 🌟 CORREÇÃO AQUI 🌟
+// 1. Calcula a posição dentro do ciclo (0 a cycleLength - 1)
+const cicloIndex = (dia - 1) % cycleLength; 
+
+// 2. Determina se este índice está na faixa de Losses.
+// As losses ocorrem nos últimos 'lossesPerCycle' dias do ciclo.
+const isLossDay = lossesPerCycle > 0 && cicloIndex >= winsPerCycle;
+
+if (isLossDay) {
+    // PERDA: Stop-Loss Composto (Mesma regra para LAY e BACK)
+    const perdaPorRed = Math.round(stakeBaseParaCalculo * lossPercent * 100) / 100;
+    resultado = -perdaPorRed;
+
+    // A Stake ACUMULADA diminui pelo valor perdido
+    stakeAtual = Math.round((stakeAtual + resultado) * 100) / 100;
+    status = 'RED';
+
+} else {
+    // LUCRO: Varia conforme a modalidade
+    let lucroPorGreen;
+
+    if (modalidade === 'LAY') {
+        // LAY: Stake / (Odd - 1)
+        lucroPorGreen = Math.round((stakeBaseParaCalculo / (oddEntrada - 1)) * 100) / 100;
+    } else { // BACK
+        // BACK: Stake * (Odd - 1)
+        lucroPorGreen = Math.round((stakeBaseParaCalculo * (oddEntrada - 1)) * 100) / 100;
+    }
+
+    resultado = lucroPorGreen;
+
+    // A Stake ACUMULADA aumenta pelo valor do lucro
+    stakeAtual = Math.round((stakeAtual + resultado) * 100) / 100;
+    status = 'GREEN';
+}
+
+// Segurança: se stakeAtual <= 0, consideramos quebra da stake e paramos
+if (stakeAtual <= 0) {
+    historico.push({ 
+        dia, 
+        stakeInicialDia: stakeBaseParaCalculo, // Exibe a stake usada (Fixa ou Composta)
+        resultado, 
+        stakeFinal: 0.00, 
+        status 
+    });
+    stakeAtual = 0;
+    break;
+}
+
+// registra histórico
+historico.push({ 
+    dia, 
+    stakeInicialDia: stakeBaseParaCalculo, // Exibe a stake usada
+    resultado, 
+    stakeFinal: stakeAtual, // Exibe o acumulado total
+    status 
+});
+}
+
+// Finalização e exibição
+loadingDiv.classList.add('hidden');
+resultadosDiv.classList.remove('hidden');
+
+const diasTotal = historico.length;
+const stakeFinal = Math.max(0, stakeAtual);
+
+// Crescimento acumulado exibido como variação percentual da STAKE inicial
+const lucroPercentual = stakeInicialOriginal > 0 ? ((stakeFinal / stakeInicialOriginal) * 100) - 100 : 0;
+
+document.getElementById('simuladorDiasNecessarios').textContent = diasTotal < maxDias ? diasTotal : `${maxDias}`;
+document.getElementById('simuladorLucroTotal').textContent = `${lucroPercentual.toFixed(2)}%`;
+
+renderizarSimuladorTabela(tabelaCorpo, historico);
+renderizarSimuladorGrafico(historico);
+
+if (stakeFinal <= 0) {
+mensagemDiv.className = 'alert alert-danger d-block';
+mensagemDiv.textContent = `FALHA: A stake foi reduzida a zero no Dia ${diasTotal}. Ajuste a gestão de risco.`;
+} else if (diasTotal >= maxDias) {
+ mensagemDiv.className = 'alert alert-warning d-block';
+ mensagemDiv.textContent = `SIMULAÇÃO CONCLUÍDA: ${diasTotal} dias. A Stake final é ${R(stakeFinal)}.`;
+} else {
+mensagemDiv.className = 'alert alert-success d-block';
+mensagemDiv.textContent = `Simulação concluída. A Stake final é ${R(stakeFinal)} após ${diasTotal} dias.`;
+}
+}
+
+
+// 6. Funções de Renderização Simulador
+function renderizarSimuladorTabela(tabelaCorpo, historico) {
+    tabelaCorpo.innerHTML = '';
+    historico.forEach(item => {
+        const row = tabelaCorpo.insertRow();
+        row.className = item.status === 'RED' ? 'table-danger' : item.status === 'GREEN' ? 'table-success' : 'table-dark';
+
+        row.insertCell().textContent = item.dia;
+        row.insertCell().textContent = R(item.stakeInicialDia); // Agora exibe o valor da stake usada (fixa no BACK)
+        row.insertCell().innerHTML = `<span class="fw-bold ${item.status === 'RED' ? 'text-loss' : 'text-win'}">${R(item.resultado)}</span>`;
+        row.insertCell().innerHTML = `<span class="fw-bold">${R(item.stakeFinal)}</span>`; // Continua exibindo o acumulado
+    });
+}
+
+// O gráfico plota a evolução da Stake.
+function renderizarSimuladorGrafico(historico) {
+    const ctx = document.getElementById('curvaCrescimentoSimulador').getContext('2d');
+
+    if (simuladorChartInstance) { simuladorChartInstance.destroy(); }
+
+    const chartLabels = historico.map(item => item.dia);
+    const chartData = historico.map(item => item.stakeFinal);
+    const pointColors = historico.map(item => item.status === 'RED' ? COLOR_LOSS : COLOR_SUCCESS);
+
+
+    simuladorChartInstance = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: chartLabels,
+            datasets: [
+                {
+                    label: 'Stake Base (R$)',
+                    data: chartData,
+                    borderColor: COLOR_SUCCESS,
+                    backgroundColor: 'rgba(255, 193, 7, 0.1)', // Cor amarela/warning
+                    pointBorderColor: COLOR_PRIMARY,
+                    fill: true,
+                    tension: 0.4,
+                    pointRadius: 4,
+                    pointBackgroundColor: pointColors
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            interaction: { intersect: false, mode: 'index' },
+            scales: {
+                y: { title: { display: true, text: 'Valor da Stake (R$)', color: '#f8f9fa' }, ticks: { color: '#f8f9fa' } },
+                x: { title: { display: true, text: 'Dia', color: '#f8f9fa' }, ticks: { color: '#f8f9fa' } }
+            },
+            plugins: {
+                legend: { display: false },
+                tooltip: {
+                    callbacks: {
+                        title: (context) => `Dia ${context[0].label}`,
+                        label: (context) => `Stake: ${R(context.parsed.y)}`
+                    }
+                },
+                datalabels: { display: false }
+            }
+        }
+    });
+}
+
+// --- Inicialização no DOMContentLoaded ---
+document.addEventListener('DOMContentLoaded', () => {
+    renderOdds(); // Inicializa inputs Dutching
+
+    // Amarra o evento de clique ao botão do Simulador
+    document.getElementById('iniciarSimuladorButton').addEventListener('click', simular);
+
+    // Inicialização dos inputs de Stake, Odd, Loss% e Modalidade
+    document.getElementById('simuladorModalidade').addEventListener('input', calcularLucroLay); 
+    document.getElementById('simuladorStakeFixa').addEventListener('input', calcularLucroLay);
+    document.getElementById('simuladorOddEntrada').addEventListener('input', calcularLucroLay);
+    document.getElementById('simuladorLossPercent').addEventListener('input', calcularLucroLay); 
+    calcularLucroLay(); // Executa o cálculo inicial ao carregar a página
+
+    showTool('dutching'); // Ativa a aba Dutching por padrão
+    calculateDutching(); // Executa o cálculo inicial da Dutching
+});
@@ -0,0 +1,37 @@
+function closeRGAlert() {
+    localStorage.setItem('rg-alert-closed', new Date().getTime());
+    document.getElementById('responsible-gaming-alert').style.display = 'none';
+}
+
+document.addEventListener("DOMContentLoaded", function() {
+    const lastClosed = localStorage.getItem('rg-alert-closed');
+    const now = new Date().getTime();
+    // Reapresenta após 24 horas (86400000 ms)
+    if (!lastClosed || (now - lastClosed) > 86400000) {
+        document.getElementById('responsible-gaming-alert').style.display = 'block';
+    }
+});
+
+function calcularProtecao() {
+    const o1 = parseFloat(document.getElementById('odd1').value);
+    const o2 = parseFloat(document.getElementById('odd2').value);
+    const total = parseFloat(document.getElementById('investimento').value);
+
+    if (o1 > 1 && o2 > 0 && total > 0) {
+        // 1. Valor para recuperar o total investido na Odd 1
+        const aposta1 = total / o1;
+
+        // 2. O que sobra vai para a Odd 2
+        const aposta2 = total - aposta1;
+
+        // 3. Lucro se a Odd 2 vencer (Retorno da aposta 2)
+        const lucroBrutoAposta2 = aposta2 * o2;
+
+        document.getElementById('resAposta1').innerText = "R$ " + aposta1.toFixed(2);
+        document.getElementById('resAposta2').innerText = "R$ " + aposta2.toFixed(2);
+        document.getElementById('resLucroAbsoluto').innerText = "R$ " + lucroBrutoAposta2.toFixed(2);
+
+        document.querySelectorAll('.valTotal').forEach(el => el.innerText = total.toFixed(2));
+        document.getElementById('resultadoView').style.display = 'block';
+    }
+}
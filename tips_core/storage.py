@@ -0,0 +1,266 @@
+# tips_core/storage.py
+# Storage dos arquivos estáticos: além do que o WhiteNoise já faz (hash no
+# nome + gzip/brotli), o collectstatic recomprime as imagens, gera irmãos
+# WebP e tamanhos responsivos, minifica o CSS/JS do tips_core e informa
+# quantos bytes cada arquivo economizou. Os arquivos gerados entram no
+# manifesto e também recebem o hash no nome (cache "para sempre" no WhiteNoise).
+
+import io
+import posixpath
+import re
+
+from django.core.files.base import ContentFile
+from django.utils.text import slugify
+from PIL import Image, ImageOps
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+EXTENSOES_IMAGEM = ('.jpg', '.jpeg', '.png')
+EXTENSOES_CODIGO = ('.css', '.js')
+# Só o CSS/JS do próprio app; os do admin e de terceiros ficam como estão
+PREFIXO_CODIGO = 'tips_core/'
+# Larguras dos tamanhos responsivos (só as menores que a original)
+LARGURAS_RESPONSIVAS = (640, 1280, 1920)
+OPCOES_JPEG = {'quality': 80, 'optimize': True, 'progressive': True, 'subsampling': '4:2:0'}
+OPCOES_PNG = {'optimize': True}
+OPCOES_WEBP = {'quality': 78, 'method': 6}
+
+
+def _codificar(imagem, formato, opcoes):
+    buffer = io.BytesIO()
+    imagem.save(buffer, formato, **opcoes)
+    return buffer.getvalue()
+
+
+def _formatar_bytes(tamanho):
+    return f'{tamanho / 1024:.1f} KB'
+
+
+def base_segura(nome):
+    """Caminho sem extensão e com o nome sem espaços/acentos ("img/banner 1.jpg" -> "img/banner-1")."""
+    diretorio, arquivo = posixpath.split(nome)
+    return posixpath.join(diretorio, slugify(posixpath.splitext(arquivo)[0]) or 'imagem')
+
+
+def otimizar_imagem(nome, dados):
+    """
+    Recebe o caminho estático e o conteúdo de uma imagem JPEG/PNG e devolve
+    {caminho: bytes} com a versão recomprimida (só se ficou menor), o irmão
+    WebP e os tamanhos responsivos (JPEG/PNG + WebP). Os arquivos gerados usam
+    um nome sem espaços nem acentos ("banner 1.jpg" -> "banner-1-640w.webp").
+    """
+    extensao = posixpath.splitext(nome)[1].lower()
+    formato, opcoes = ('PNG', OPCOES_PNG) if extensao == '.png' else ('JPEG', OPCOES_JPEG)
+    base = base_segura(nome)
+
+    imagem = ImageOps.exif_transpose(Image.open(io.BytesIO(dados)))
+    if formato == 'JPEG' and imagem.mode != 'RGB':
+        imagem = imagem.convert('RGB')
+    # Os metadados (EXIF, miniaturas) não são copiados; só o perfil de cor
+    if imagem.info.get('icc_profile'):
+        opcoes = {**opcoes, 'icc_profile': imagem.info['icc_profile']}
+
+    recomprimida = _codificar(imagem, formato, opcoes)
+    saidas = {nome: recomprimida if len(recomprimida) < len(dados) else dados}
+    saidas[f'{base}.webp'] = _codificar(imagem, 'WEBP', OPCOES_WEBP)
+
+    largura, altura = imagem.size
+    for largura_alvo in LARGURAS_RESPONSIVAS:
+        if largura_alvo >= largura:
+            continue
+        reduzida = imagem.resize((largura_alvo, round(altura * largura_alvo / largura)), Image.Resampling.LANCZOS)
+        saidas[f'{base}-{largura_alvo}w{extensao}'] = _codificar(reduzida, formato, opcoes)
+        saidas[f'{base}-{largura_alvo}w.webp'] = _codificar(reduzida, 'WEBP', OPCOES_WEBP)
+    return saidas
+
+
+# --- MINIFICAÇÃO DE CSS E JS ---
+# Minificadores conservadores, sem dependências: removem comentários e
+# espaços sem mexer no conteúdo de strings, template literals e regex.
+# Quebras de linha do JS são mantidas (uma por linha de código) para não
+# depender da inserção automática de ponto e vírgula.
+
+RE_STRING_CSS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+RE_COMENTARIO_CSS = re.compile(RE_STRING_CSS.pattern + r'|/\*.*?\*/', re.S)
+RE_CSS_SEPARADORES = re.compile(r'\s*([{};,>])\s*')
+
+
+def minificar_css(texto):
+    # Comentários primeiro (um apóstrofo dentro deles não abre uma string)
+    texto = RE_COMENTARIO_CSS.sub(lambda m: m.group(1) or '', texto)
+    partes = []
+    for trecho in RE_STRING_CSS.split(texto):
+        if trecho[:1] in ('"', "'"):
+            partes.append(trecho)
+            continue
+        trecho = re.sub(r'\s+', ' ', trecho)
+        trecho = RE_CSS_SEPARADORES.sub(r'\1', trecho)
+        trecho = re.sub(r':\s+', ':', trecho)
+        partes.append(trecho.replace(';}', '}'))
+    return ''.join(partes).strip()
+
+
+# Depois destes caracteres (ou palavras), uma "/" começa uma regex, não uma divisão
+ANTES_DE_REGEX = set('(,=:[!&|?{};+-*%<>~^')
+PALAVRAS_ANTES_DE_REGEX = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete', 'throw', 'new')
+
+
+def _caractere_de_palavra(caractere):
+    return caractere.isalnum() or caractere in '_$' or ord(caractere) > 127
+
+
+def minificar_js(texto):
+    saida = []
+    i, tamanho = 0, len(texto)
+
+    def anterior():
+        for caractere in reversed(saida[-1] if saida else ''):
+            if not caractere.isspace():
+                return caractere
+        return ''
+
+    while i < tamanho:
+        caractere = texto[i]
+
+        # Strings e template literals: copiados sem alteração
+        if caractere in '\'"`':
+            fim = i + 1
+            while fim < tamanho and texto[fim] != caractere:
+                fim += 2 if texto[fim] == '\\' else 1
+            saida.append(texto[i:fim + 1])
+            i = fim + 1
+            continue
+
+        if texto.startswith('//', i):
+            fim = texto.find('\n', i)
+            i = tamanho if fim == -1 else fim
+            continue
+        if texto.startswith('/*', i):
+            fim = texto.find('*/', i + 2)
+            i = tamanho if fim == -1 else fim + 2
+            continue
+
+        if caractere == '/':
+            ultimo = anterior()
+            palavra = re.search(r'([A-Za-z_$]+)\s*$', ''.join(saida[-12:]))
+            if not ultimo or ultimo in ANTES_DE_REGEX or (palavra and palavra.group(1) in PALAVRAS_ANTES_DE_REGEX):
+                fim, em_classe = i + 1, False
+                while fim < tamanho and (texto[fim] != '/' or em_classe) and texto[fim] != '\n':
+                    if texto[fim] == '\\':
+                        fim += 1
+                    elif texto[fim] == '[':
+                        em_classe = True
+                    elif texto[fim] == ']':
+                        em_classe = False
+                    fim += 1
+                fim += 1
+                while fim < tamanho and texto[fim].isalpha():
+                    fim += 1
+                saida.append(texto[i:fim])
+                i = fim
+                continue
+
+        if caractere.isspace():
+            fim = i
+            while fim < tamanho and texto[fim].isspace():
+                fim += 1
+            proximo = texto[fim] if fim < tamanho else ''
+            ultimo = saida[-1][-1:] if saida else ''
+            if '\n' in texto[i:fim]:
+                if ultimo and ultimo != '\n' and proximo:
+                    saida.append('\n')
+            elif ultimo and proximo and (
+                (_caractere_de_palavra(ultimo) and _caractere_de_palavra(proximo))
+                or (ultimo in '+-' and proximo in '+-')
+            ):
+                saida.append(' ')
+            i = fim
+            continue
+
+        saida.append(caractere)
+        i += 1
+
+    return ''.join(saida).strip() + '\n'
+
+
+class StaticOtimizadoStorage(CompressedManifestStaticFilesStorage):
+    """
+    CompressedManifestStaticFilesStorage com uma etapa antes do hash: as
+    imagens são sempre recomprimidas a partir do arquivo original do app
+    (nunca da cópia já otimizada, para não perder qualidade a cada deploy).
+    """
+
+    def stored_name(self, name):
+        # Sem manifesto (collectstatic não rodou: testes, máquina local) usa o
+        # nome original em vez de derrubar a página com ValueError
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.otimizar_imagens(paths)
+            self.minificar_codigo(paths)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def otimizar_imagens(self, paths):
+        total_antes = total_depois = 0
+        for nome in sorted(paths):
+            if not nome.lower().endswith(EXTENSOES_IMAGEM):
+                continue
+            storage_origem, caminho_origem = paths[nome]
+            with storage_origem.open(caminho_origem) as arquivo:
+                dados = arquivo.read()
+
+            try:
+                saidas = otimizar_imagem(nome, dados)
+            except Exception as e:
+                print(f"Erro ao otimizar {nome}: {e}")
+                continue
+
+            for caminho, conteudo in saidas.items():
+                if self.exists(caminho):
+                    self.delete(caminho)
+                self._save(caminho, ContentFile(conteudo))
+                # O hash do manifesto passa a ser calculado sobre o arquivo otimizado
+                paths[caminho] = (self, caminho)
+
+            antes, depois = len(dados), len(saidas[nome])
+            webp = len(saidas[f'{base_segura(nome)}.webp'])
+            total_antes += antes
+            total_depois += min(depois, webp)
+            print(
+                f"{nome}: {_formatar_bytes(antes)} -> {_formatar_bytes(depois)} ({(depois - antes) / antes:+.0%}), "
+                f"WebP {_formatar_bytes(webp)} ({(webp - antes) / antes:+.0%}), "
+                f"{len(saidas) - 2} arquivos em tamanhos responsivos"
+            )
+
+        if total_antes:
+            print(
+                f"Imagens: {_formatar_bytes(total_antes)} -> {_formatar_bytes(total_depois)} "
+                f"no melhor formato ({(total_depois - total_antes) / total_antes:+.0%})."
+            )
+
+    def minificar_codigo(self, paths):
+        total_antes = total_depois = 0
+        for nome in sorted(paths):
+            if not nome.startswith(PREFIXO_CODIGO) or not nome.endswith(EXTENSOES_CODIGO) or '.min.' in nome:
+                continue
+            storage_origem, caminho_origem = paths[nome]
+            with storage_origem.open(caminho_origem) as arquivo:
+                dados = arquivo.read()
+
+            minificar = minificar_css if nome.endswith('.css') else minificar_js
+            minificado = minificar(dados.decode('utf-8')).encode('utf-8')
+            if self.exists(nome):
+                self.delete(nome)
+            self._save(nome, ContentFile(minificado))
+            paths[nome] = (self, nome)
+
+            total_antes += len(dados)
+            total_depois += len(minificado)
+            print(f"{nome}: {_formatar_bytes(len(dados))} -> {_formatar_bytes(len(minificado))} "
+                  f"({(len(minificado) - len(dados)) / len(dados):+.0%})")
+
+        if total_antes:
+            print(f"CSS/JS: {_formatar_bytes(total_antes)} -> {_formatar_bytes(total_depois)} "
+                  f"({(total_depois - total_antes) / total_antes:+.0%}).")
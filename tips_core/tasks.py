@@ -1,10 +1,17 @@
 # tips_core/tasks.py (ATUALIZADO COM LIMPEZA DE IMAGENS NO RESUMO)
 
+import codecs
 import feedparser
+import hashlib
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, TimeoutError as FuturesTimeout
 from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from django.core.cache import cache
 from django.utils import timezone
-from .models import Noticia
+from .models import Noticia, EstadoFeed
 import requests
 from bs4 import BeautifulSoup
 
@@ -15,6 +22,40 @@ RSS_FEEDS = [
     'https://rss.uol.com.br/esporte/ultimas-noticias.xml',
 ]
 
+# --- LIMITES DE CONCORRÊNCIA DO EXTRATOR ---
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+TIMEOUT_REQUISICAO = 5      # segundos por requisição HTTP
+MAX_WORKERS = 16            # threads totais do pool
+MAX_POR_HOST = 4            # requisições simultâneas por domínio
+PRAZO_GLOBAL = 20           # segundos para a extração inteira
+
+TITULO_MAX = Noticia._meta.get_field('titulo').max_length
+MAX_IDS_POR_FEED = 500      # IDs de entradas lembrados por feed
+
+# --- CACHE DAS IMAGENS DE CAPA (og:image) ---
+CACHE_IMAGEM_TTL = 60 * 60 * 24       # imagem encontrada: 24h
+CACHE_IMAGEM_TTL_FALHA = 60 * 60      # página sem imagem ou com erro: 1h
+MAX_BYTES_HEAD = 64 * 1024            # lê no máximo 64 KB de cada página
+_SEM_IMAGEM = ''                      # marcador do cache negativo
+
+_semaforos_por_host = {}
+_semaforos_lock = threading.Lock()
+
+
+def _semaforo_do_host(url):
+    """
+    Devolve o semáforo do domínio da URL, limitando quantas requisições
+    simultâneas o extrator faz para o mesmo site.
+    """
+    host = urlsplit(url).netloc.lower()
+    with _semaforos_lock:
+        semaforo = _semaforos_por_host.get(host)
+        if semaforo is None:
+            semaforo = threading.BoundedSemaphore(MAX_POR_HOST)
+            _semaforos_por_host[host] = semaforo
+        return semaforo
+
+
 # -------------------------------
 # FUNÇÃO PARA REMOVER <img> DO RESUMO
 # -------------------------------
@@ -38,80 +79,297 @@ def limpar_html_resumo(resumo):
 # -------------------------------
 # FUNÇÃO PARA BUSCAR A IMAGEM DA PÁGINA
 # -------------------------------
+class _OgImageParser(HTMLParser):
+    """
+    Parser incremental que procura a meta og:image e, se o <head> terminar
+    sem ela, continua pelo corpo até o primeiro <img>. Sinaliza `concluido`
+    assim que tem a resposta.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.og_image = None
+        self.primeira_img = None
+        self.fim_do_head = False
+        self.concluido = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'meta' and not self.og_image and not self.fim_do_head:
+            if (attrs.get('property') or attrs.get('name')) == 'og:image' and attrs.get('content'):
+                self.og_image = attrs['content']
+                self.concluido = True
+        elif tag == 'img' and not self.primeira_img and attrs.get('src'):
+            self.primeira_img = attrs['src']
+            self.concluido = self.fim_do_head
+        elif tag == 'body':
+            self._terminar_head()
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self._terminar_head()
+
+    def _terminar_head(self):
+        # Sem og:image no <head>, vale o primeiro <img> (já visto ou o próximo do corpo)
+        self.fim_do_head = True
+        self.concluido = bool(self.og_image or self.primeira_img)
+
+
+def _buscar_imagem_no_head(url):
+    """
+    Lê a página em streaming só até achar a imagem (limitado a
+    MAX_BYTES_HEAD) e devolve a og:image, ou o primeiro <img> se a página
+    não tiver og:image, sem montar o DOM inteiro.
+    """
+    with _semaforo_do_host(url):
+        with requests.get(url, headers=HEADERS, timeout=TIMEOUT_REQUISICAO, stream=True) as response:
+            if response.status_code != 200:
+                return None
+
+            parser = _OgImageParser()
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='ignore')
+            lidos = 0
+            for bloco in response.iter_content(chunk_size=8192):
+                parser.feed(decoder.decode(bloco))
+                lidos += len(bloco)
+                if parser.concluido or lidos >= MAX_BYTES_HEAD:
+                    break
+
+    return parser.og_image or parser.primeira_img
+
+
 def get_image_url_from_page(url):
+    """
+    Devolve a imagem de capa da página, consultando antes o cache por URL.
+    Falhas e páginas sem imagem também são guardadas (cache negativo) por
+    um período menor, para não serem baixadas de novo a cada feed.
+    """
+    chave = 'og_image:' + hashlib.sha1(url.encode('utf-8')).hexdigest()
+    em_cache = cache.get(chave)
+    if em_cache is not None:
+        return em_cache or None
+
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        imagem = _buscar_imagem_no_head(url)
+    except Exception:
+        imagem = None
 
-        # Tenta pegar imagem Open Graph
-        og_image = soup.find('meta', property='og:image')
-        if og_image and og_image.get('content'):
-            return og_image['content']
+    if imagem:
+        cache.set(chave, imagem, CACHE_IMAGEM_TTL)
+    else:
+        cache.set(chave, _SEM_IMAGEM, CACHE_IMAGEM_TTL_FALHA)
+    return imagem
 
-        # Tenta pegar imagem principal
-        img_tag = soup.find('img')
-        if img_tag and img_tag.get('src'):
-            return img_tag['src']
 
-        return None
-    except:
-        return None
+# -------------------------------
+# DOWNLOAD DE UM FEED (EXECUTADO NO POOL)
+# -------------------------------
+def baixar_feed(feed_url, etag='', modified=''):
+    """
+    Baixa e interpreta um feed RSS com timeout, usando GET condicional
+    (If-None-Match / If-Modified-Since) com o estado salvo da última execução.
+    Um 304 volta sem entradas e sem passar pelo feedparser.
+    Retorna as entradas, os novos validadores e a latência para o relatório.
+    """
+    headers = dict(HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    if modified:
+        headers['If-Modified-Since'] = modified
+
+    inicio = time.monotonic()
+    with _semaforo_do_host(feed_url):
+        response = requests.get(feed_url, headers=headers, timeout=TIMEOUT_REQUISICAO)
+
+    if response.status_code == 304:
+        return {
+            'entradas': [],
+            'nao_modificado': True,
+            'etag': etag,
+            'modified': modified,
+            'latencia': time.monotonic() - inicio,
+        }
+
+    response.raise_for_status()
+    feed = feedparser.parse(response.content)
+    return {
+        'entradas': feed.entries,
+        'nao_modificado': False,
+        'etag': response.headers.get('ETag', ''),
+        'modified': response.headers.get('Last-Modified', ''),
+        'latencia': time.monotonic() - inicio,
+    }
+
+
+def _id_da_entrada(item):
+    return getattr(item, 'id', None) or getattr(item, 'link', None)
+
+
+def _data_publicacao(item):
+    pub_date = timezone.now()
+    if hasattr(item, 'published_parsed'):
+        try:
+            timestamp = time.mktime(item.published_parsed)
+            pub_date = datetime.fromtimestamp(timestamp, tz=timezone.get_current_timezone())
+        except:
+            pass
+    return pub_date
 
 
 # -------------------------------
 # EXTRATOR PRINCIPAL
 # -------------------------------
-def extrair_noticias_rss():
-    """Extrai notícias dos feeds RSS e salva no banco."""
-    noticias_novas = 0
-
-    for feed_url in RSS_FEEDS:
-        try:
-            feed = feedparser.parse(feed_url)
+def executar_extracao(feeds=None, prazo=PRAZO_GLOBAL):
+    """
+    Baixa todos os feeds em paralelo, busca as imagens de capa das notícias
+    novas no mesmo pool e grava o resultado no banco com um único
+    bulk_create (títulos já conhecidos são descartados antes do scraping).
 
-            for item in feed.entries:
+    Tudo que não terminar dentro do `prazo` (segundos) é abandonado: feeds
+    atrasados entram no relatório como erro e notícias sem imagem são salvas
+    com imagem_url vazia. Retorna um dicionário com o total inserido, o total
+    ignorado e o relatório por feed.
+    """
+    feeds = RSS_FEEDS if feeds is None else feeds
+    inicio = time.monotonic()
+    limite = inicio + prazo
 
-                # -------------------------------
-                # DATA DA PUBLICAÇÃO
-                # -------------------------------
-                pub_date = timezone.now()
-                if hasattr(item, 'published_parsed'):
-                    try:
-                        timestamp = time.mktime(item.published_parsed)
-                        pub_date = datetime.fromtimestamp(timestamp, tz=timezone.get_current_timezone())
-                    except:
-                        pass
+    relatorio = {
+        feed_url: {'latencia': None, 'itens': 0, 'novas': 0, 'erro': None, 'nao_modificado': False}
+        for feed_url in feeds
+    }
+    estados = {estado.url: estado for estado in EstadoFeed.objects.filter(url__in=feeds)}
+    estados_atualizados = []
+    pendentes = []   # (dados da notícia, future da imagem)
+    titulos_pendentes = set()
 
-                # -------------------------------
-                # CAMPOS OBRIGATÓRIOS
-                # -------------------------------
-                titulo = getattr(item, 'title', None)
-                link = getattr(item, 'link', None)
-                resumo_raw = getattr(item, 'summary', "Sem resumo disponível.")
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    try:
+        futures_feeds = {}
+        for url in feeds:
+            estado = estados.get(url) or EstadoFeed(url=url)
+            estados[url] = estado
+            futures_feeds[executor.submit(baixar_feed, url, estado.etag, estado.last_modified)] = url
 
-                if titulo and link and not Noticia.objects.filter(titulo=titulo).exists():
+        try:
+            for future in as_completed(futures_feeds, timeout=prazo):
+                feed_url = futures_feeds[future]
+                try:
+                    resultado = future.result()
+                except Exception as e:
+                    relatorio[feed_url]['erro'] = str(e)
+                    print(f"Erro ao processar feed {feed_url}: {e}")
+                    continue
 
-                    # --- Limpar resumo (remove <img>) ---
-                    resumo_limpo = limpar_html_resumo(resumo_raw)
+                relatorio[feed_url]['latencia'] = resultado['latencia']
+                relatorio[feed_url]['itens'] = len(resultado['entradas'])
+                relatorio[feed_url]['nao_modificado'] = resultado['nao_modificado']
 
-                    # --- Scraping da imagem ---
-                    imagem_url_capa = get_image_url_from_page(link)
+                estado = estados[feed_url]
+                ids_vistos = set(estado.ultimos_ids)
+                if not resultado['nao_modificado']:
+                    estado.ultimos_ids = [
+                        id_entrada for id_entrada in map(_id_da_entrada, resultado['entradas'])
+                        if id_entrada
+                    ][:MAX_IDS_POR_FEED]
+                estado.etag = resultado['etag']
+                estado.last_modified = resultado['modified']
+                estado.ultima_consulta = timezone.now()
+                estados_atualizados.append(estado)
 
+                # --- DEDUPLICAÇÃO EM LOTE: uma única consulta por feed ---
+                entradas = []
+                for item in resultado['entradas']:
+                    # Entradas já vistas na execução anterior nem chegam ao banco
+                    if _id_da_entrada(item) in ids_vistos:
+                        continue
                     # -------------------------------
-                    # SALVAR NO BANCO
+                    # CAMPOS OBRIGATÓRIOS
                     # -------------------------------
-                    Noticia.objects.create(
-                        titulo=titulo,
-                        fonte_url=link,
-                        resumo=resumo_limpo,
-                        data_publicacao=pub_date,
-                        imagem_url=imagem_url_capa
-                    )
+                    titulo = getattr(item, 'title', None)
+                    link = getattr(item, 'link', None)
+                    if titulo and link:
+                        entradas.append((titulo[:TITULO_MAX], link, item))
+
+                if not entradas:
+                    continue
+
+                conhecidos = set(
+                    Noticia.objects.filter(titulo__in=[titulo for titulo, _, _ in entradas])
+                    .values_list('titulo', flat=True)
+                )
+
+                for titulo, link, item in entradas:
+                    # O mesmo título pode aparecer em mais de um feed
+                    if titulo in conhecidos or titulo in titulos_pendentes:
+                        continue
+                    titulos_pendentes.add(titulo)
 
-                    noticias_novas += 1
+                    resumo_raw = getattr(item, 'summary', "Sem resumo disponível.")
+                    dados = {
+                        'titulo': titulo,
+                        'fonte_url': link,
+                        'resumo': limpar_html_resumo(resumo_raw),
+                        'data_publicacao': _data_publicacao(item),
+                    }
+                    # --- Scraping da imagem em paralelo ---
+                    pendentes.append((feed_url, dados, executor.submit(get_image_url_from_page, link)))
+        except FuturesTimeout:
+            for future, feed_url in futures_feeds.items():
+                if not future.done():
+                    relatorio[feed_url]['erro'] = 'prazo global esgotado'
 
-        except Exception as e:
-            print(f"Erro ao processar feed {feed_url}: {e}")
+        restante = max(0, limite - time.monotonic())
+        wait([future for _, _, future in pendentes], timeout=restante)
+    finally:
+        # Não espera threads atrasadas: o que passou do prazo é descartado
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    return f"Extração concluída. {noticias_novas} novas notícias salvas."
+    # -------------------------------
+    # SALVAR NO BANCO (INSERÇÃO EM LOTE)
+    # -------------------------------
+    novas = [
+        Noticia(
+            imagem_url=future.result() if future.done() and not future.cancelled() else None,
+            **dados
+        )
+        for _, dados, future in pendentes
+    ]
+
+    # ignore_conflicts delega ao índice único de `titulo` os casos em que
+    # outra execução gravou o mesmo título entre a consulta e o INSERT.
+    marca = timezone.now()
+    Noticia.objects.bulk_create(novas, batch_size=500, ignore_conflicts=True)
+    gravados = set(Noticia.objects.filter(
+        titulo__in=[noticia.titulo for noticia in novas],
+        data_extracao__gte=marca,
+    ).values_list('titulo', flat=True)) if novas else set()
+    inseridas = len(gravados)
+    # "novas" de cada feed conta só o que de fato entrou no banco (soma = total)
+    for feed_url, dados, _ in pendentes:
+        if dados['titulo'] in gravados:
+            relatorio[feed_url]['novas'] += 1
+
+    # O estado só é gravado depois das notícias, para uma falha no INSERT
+    # não marcar como vistas entradas que nunca chegaram ao banco.
+    if estados_atualizados:
+        EstadoFeed.objects.bulk_create(
+            estados_atualizados,
+            update_conflicts=True,
+            unique_fields=['url'],
+            update_fields=['etag', 'last_modified', 'ultimos_ids', 'ultima_consulta'],
+        )
+
+    total_itens = sum(dados['itens'] for dados in relatorio.values())
+    return {
+        'novas': inseridas,
+        'ignoradas': total_itens - inseridas,
+        'duracao': time.monotonic() - inicio,
+        'feeds': relatorio,
+    }
+
+
+def extrair_noticias_rss(feeds=None, prazo=PRAZO_GLOBAL):
+    """Extrai notícias dos feeds RSS e salva no banco."""
+    resultado = executar_extracao(feeds=feeds, prazo=prazo)
+    return f"Extração concluída. {resultado['novas']} novas notícias salvas."
@@ -0,0 +1,49 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from tips_core.imagens import FORMATOS
+
+register = template.Library()
+
+TIPOS_MIME = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+@register.simple_tag
+def imagem_responsiva(arquivo, variantes, alt='', sizes='100vw', tamanho='card', classe='', carregamento='lazy'):
+    """
+    <picture> com um srcset por formato (AVIF, WebP) a partir das variantes
+    geradas no upload. O <img> final aponta para o arquivo original (navegadores
+    antigos), com largura/altura da variante `tamanho` para reservar o espaço e o
+    placeholder borrado de fundo. Sem variantes (ainda processando), só o <img>.
+
+    Uso: {% imagem_responsiva banner.imagem banner.imagem_variantes alt=banner.titulo sizes="100vw" tamanho="hero" %}
+    """
+    if not arquivo:
+        return ''
+    if not variantes or variantes.get('origem') != arquivo.name:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="{}">', arquivo.url, alt, classe, carregamento)
+
+    storage = arquivo.storage
+    tamanhos = variantes['tamanhos']
+    fontes = []
+    for _, extensao, _ in FORMATOS:
+        # Tamanhos iguais (imagem original pequena) entram uma vez só no srcset
+        srcset = {}
+        for variante in tamanhos.values():
+            if extensao in variante:
+                srcset.setdefault(variante['largura'], storage.url(variante[extensao]))
+        if srcset:
+            fontes.append((
+                TIPOS_MIME[extensao],
+                ', '.join(f'{url} {largura}w' for largura, url in sorted(srcset.items())),
+                sizes,
+            ))
+
+    referencia = tamanhos.get(tamanho) or next(iter(tamanhos.values()))
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" class="{}" width="{}" height="{}" loading="{}" decoding="async" '
+        'style="background: url({}) center / cover no-repeat"></picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', fontes),
+        arquivo.url, alt, classe, referencia['largura'], referencia['altura'], carregamento,
+        variantes['placeholder'],
+    )
@@ -1,3 +1,1398 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import cache_versionado, exportacao, imagens, tasks
+from .models import Noticia, PromocaoBanner, EstadoFeed, Tip, ResumoDesempenho, Team, TeamStats, TeamAlias, Assinatura, NotificacaoPagSeguro, Plan, SubscriptionPeriod
+
+
+# --- SERVIDOR HTTP LOCAL (STUB) PARA OS TESTES DO EXTRATOR ---
+
+RSS_STUB = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Stub</title>
+{itens}
+</channel></rss>"""
+
+ITEM_STUB = """<item><title>{titulo}</title><link>{link}</link>
+<description>&lt;img src="x.jpg"/&gt;Resumo {titulo}</description></item>"""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    atraso = 0.2   # simula a latência de um site real
+    acessos = []
+
+    def do_GET(self):
+        StubHandler.acessos.append(self.path)
+        time.sleep(self.atraso)
+        base = f"http://{self.headers['Host']}"
+        cabecalhos = {}
+        if self.path.startswith('/feed/'):
+            nome = self.path.rsplit('/', 1)[-1]
+            cabecalhos['ETag'] = f'"v1-{nome}"'
+            if self.headers.get('If-None-Match') == cabecalhos['ETag']:
+                self.send_response(304)
+                self.end_headers()
+                return
+            itens = ''.join(
+                ITEM_STUB.format(titulo=f"{nome} noticia {i}", link=f"{base}/artigo/{nome}-{i}")
+                for i in range(5)
+            )
+            corpo = RSS_STUB.format(itens=itens).encode()
+            tipo = 'application/rss+xml'
+        elif self.path.startswith('/sem-imagem/'):
+            corpo = b'<html><head><title>x</title></head><body>' + b'x' * 200000 + b'</body></html>'
+            tipo = 'text/html'
+        elif self.path.startswith('/so-img/'):
+            corpo = (
+                b'<html><head><title>x</title></head><body>' + b'x' * 20000
+                + f'<img src="{base}/img{self.path}.png"><img src="{base}/outra.png">'.encode()
+                + b'x' * 200000 + b'</body></html>'
+            )
+            tipo = 'text/html'
+        elif self.path.startswith('/artigo/'):
+            corpo = (
+                f'<html><head><meta property="og:image" content="{base}/img{self.path}.jpg">'
+                '</head><body>texto</body></html>'
+            ).encode()
+            tipo = 'text/html'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServidorStubMixin:
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.servidor.server_address[1]}"
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+
+class ExtratorConcorrenteTests(ServidorStubMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        StubHandler.acessos = []
+
+    def test_extrai_feeds_em_paralelo(self):
+        feeds = [f"{self.base_url}/feed/{nome}" for nome in ('a', 'b', 'c')]
+
+        inicio = time.monotonic()
+        resultado = tasks.executar_extracao(feeds=feeds, prazo=10)
+        duracao = time.monotonic() - inicio
+
+        self.assertEqual(resultado['novas'], 15)
+        self.assertEqual(Noticia.objects.count(), 15)
+        # 3 feeds + 15 páginas a 0.2s cada levariam ~3.6s em série
+        self.assertLess(duracao, 2)
+
+        noticia = Noticia.objects.get(titulo='a noticia 0')
+        self.assertEqual(noticia.imagem_url, f"{self.base_url}/img/artigo/a-0.jpg")
+        self.assertNotIn('<img', noticia.resumo)
+
+        for feed_url in feeds:
+            self.assertIsNone(resultado['feeds'][feed_url]['erro'])
+            self.assertEqual(resultado['feeds'][feed_url]['novas'], 5)
+            self.assertIsNotNone(resultado['feeds'][feed_url]['latencia'])
+
+    def test_titulos_conhecidos_sao_ignorados_em_lote(self):
+        feeds = [f"{self.base_url}/feed/a"]
+        Noticia.objects.create(titulo='a noticia 0', fonte_url=f"{self.base_url}/artigo/a-0")
+
+        # estados dos feeds + SELECT de deduplicação + INSERT em lote
+        # + contagem + gravação do estado
+        with self.assertNumQueries(5):
+            resultado = tasks.executar_extracao(feeds=feeds, prazo=10)
+
+        self.assertEqual(resultado['novas'], 4)
+        self.assertEqual(resultado['ignoradas'], 1)
+
+        self.assertEqual(Noticia.objects.count(), 5)
+
+    def test_novas_por_feed_contam_so_o_que_foi_gravado(self):
+        from unittest import mock
+        feeds = [f"{self.base_url}/feed/a"]
+        bulk_create = Noticia.objects.bulk_create
+
+        def outra_execucao_grava_antes(objs, **kwargs):
+            # Outra execução grava o mesmo título entre a deduplicação e o INSERT
+            Noticia.objects.create(titulo='a noticia 1', fonte_url=f"{self.base_url}/artigo/a-1")
+            Noticia.objects.filter(titulo='a noticia 1').update(data_extracao=timezone.now() - timedelta(minutes=1))
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(Noticia.objects, 'bulk_create', outra_execucao_grava_antes):
+            resultado = tasks.executar_extracao(feeds=feeds, prazo=10)
+
+        self.assertEqual(resultado['novas'], 4)
+        self.assertEqual(resultado['feeds'][feeds[0]]['novas'], 4)
+        self.assertEqual(Noticia.objects.count(), 5)
+
+    def test_relatorio_do_comando_aceita_feed_sem_latencia(self):
+        from unittest import mock
+        resultado = {
+            'novas': 0, 'ignoradas': 0, 'duracao': 1.0,
+            'feeds': {'http://feed/lento': {'latencia': None, 'itens': 0, 'novas': 0, 'erro': None, 'nao_modificado': False}},
+        }
+        saida = StringIO()
+        with mock.patch('tips_core.management.commands.extrair.executar_extracao', return_value=resultado):
+            call_command('extrair', stdout=saida)
+        self.assertIn('http://feed/lento: sem resposta', saida.getvalue())
+
+    def test_feed_nao_modificado_volta_304_sem_parse(self):
+        feeds = [f"{self.base_url}/feed/a"]
+        tasks.executar_extracao(feeds=feeds, prazo=10)
+
+        estado = EstadoFeed.objects.get(url=feeds[0])
+        self.assertEqual(estado.etag, '"v1-a"')
+        self.assertEqual(len(estado.ultimos_ids), 5)
+
+        # estados + gravação do estado: nenhuma consulta de notícias
+        with self.assertNumQueries(2):
+            segunda = tasks.executar_extracao(feeds=feeds, prazo=10)
+
+        self.assertTrue(segunda['feeds'][feeds[0]]['nao_modificado'])
+        self.assertEqual(segunda['novas'], 0)
+        self.assertEqual(EstadoFeed.objects.get(url=feeds[0]).etag, '"v1-a"')
+
+    def test_entradas_ja_vistas_nao_consultam_o_banco(self):
+        feeds = [f"{self.base_url}/feed/a"]
+        tasks.executar_extracao(feeds=feeds, prazo=10)
+        # Servidor sem suporte a ETag: o feed volta inteiro
+        EstadoFeed.objects.update(etag='')
+
+        with self.assertNumQueries(2):
+            segunda = tasks.executar_extracao(feeds=feeds, prazo=10)
+
+        self.assertEqual(segunda['novas'], 0)
+        self.assertEqual(segunda['ignoradas'], 5)
+
+    def test_feed_com_erro_nao_interrompe_os_demais(self):
+        feeds = [f"{self.base_url}/feed/a", f"{self.base_url}/inexistente"]
+
+        resultado = tasks.executar_extracao(feeds=feeds, prazo=10)
+
+        self.assertEqual(resultado['novas'], 5)
+        self.assertIsNotNone(resultado['feeds'][feeds[1]]['erro'])
+
+    def test_prazo_global_descarta_feeds_atrasados(self):
+        feeds = [f"{self.base_url}/feed/a"]
+
+        resultado = tasks.executar_extracao(feeds=feeds, prazo=0.05)
+
+        self.assertEqual(resultado['novas'], 0)
+        self.assertEqual(resultado['feeds'][feeds[0]]['erro'], 'prazo global esgotado')
+
+    def test_imagem_de_capa_usa_cache_por_url(self):
+        url = f"{self.base_url}/artigo/x-1"
+
+        self.assertEqual(tasks.get_image_url_from_page(url), f"{self.base_url}/img/artigo/x-1.jpg")
+        self.assertEqual(tasks.get_image_url_from_page(url), f"{self.base_url}/img/artigo/x-1.jpg")
+
+        self.assertEqual(StubHandler.acessos, ['/artigo/x-1'])
+
+    def test_sem_og_image_usa_o_primeiro_img_do_corpo(self):
+        url = f"{self.base_url}/so-img/1"
+        self.assertEqual(tasks.get_image_url_from_page(url), f"{self.base_url}/img/so-img/1.png")
+
+    def test_cache_negativo_para_pagina_sem_imagem(self):
+        url = f"{self.base_url}/sem-imagem/1"
+
+        self.assertIsNone(tasks.get_image_url_from_page(url))
+        self.assertIsNone(tasks.get_image_url_from_page(url))
+        self.assertIsNone(tasks.get_image_url_from_page(f"{self.base_url}/inexistente"))
+        self.assertIsNone(tasks.get_image_url_from_page(f"{self.base_url}/inexistente"))
+
+        self.assertEqual(StubHandler.acessos, ['/sem-imagem/1', '/inexistente'])
+
+
+class PublicTipsListTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('membro', password='senha-forte-123')
+        self.client.force_login(self.user)
+
+    def criar_tip(self, match_date, **extra):
+        return Tip.objects.create(league='Série A', match_date=match_date, odd_value='1.50', **extra)
+
+    def test_classifica_pela_data_local_no_banco(self):
+        agora = timezone.localtime(timezone.now())
+        fim_de_hoje = agora.replace(hour=23, minute=59)
+        # 23:59 em São Paulo já é o dia seguinte em UTC
+        hoje_tarde = self.criar_tip(fim_de_hoje)
+        amanha = self.criar_tip(fim_de_hoje + timedelta(days=1))
+        self.criar_tip(agora - timedelta(days=1))
+        self.criar_tip(agora - timedelta(days=1), status='WIN')
+        self.criar_tip(fim_de_hoje, access_level='PREMIUM')
+
+        response = self.client.get('/')
+        categorias = response.context['tips_categorias']
+
+        self.assertEqual(list(categorias['hoje']), [hoje_tarde])
+        self.assertEqual(list(categorias['proximos']), [amanha])
+        # A home só lista hoje e próximos: nada de jogos passados (nem COUNT de paginação)
+        self.assertEqual(set(categorias), {'hoje', 'proximos'})
+
+
+class HomeFragmentosTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        PromocaoBanner.objects.create(titulo='Bônus de boas-vindas', imagem='promo_banners/bonus.jpg', link_url='https://exemplo.com/a')
+        Noticia.objects.create(titulo='Clássico confirmado', fonte_url='https://exemplo.com/noticia/1')
+
+    def test_visitante_le_os_fragmentos_do_cache(self):
+        primeira = self.client.get('/')
+        self.assertContains(primeira, 'Bônus de boas-vindas')
+        self.assertContains(primeira, 'Clássico confirmado')
+
+        # Outra URL (fora do cache de página): só as 2 consultas de versão da
+        # página; com os fragmentos em cache, banners e notícias nem são lidos
+        with self.assertNumQueries(2):
+            segunda = self.client.get('/', {'origem': 'newsletter'})
+        self.assertContains(segunda, 'Bônus de boas-vindas')
+        self.assertContains(segunda, 'Clássico confirmado')
+
+    def test_banner_salvo_invalida_so_o_carrossel(self):
+        self.client.get('/')
+        PromocaoBanner.objects.create(titulo='Odds turbinadas', imagem='promo_banners/odds.jpg', link_url='https://exemplo.com/b')
+
+        # versões da página + banners (carrossel refeito); o bloco de notícias continua em cache
+        with self.assertNumQueries(3):
+            response = self.client.get('/')
+        self.assertContains(response, 'Odds turbinadas')
+
+        # Notícia cadastrada pelo admin (fora do extrator) também refaz o bloco
+        Noticia.objects.create(titulo='Notícia fora do extrator', fonte_url='https://exemplo.com/noticia/2')
+        self.assertContains(self.client.get('/'), 'Notícia fora do extrator')
+
+    def test_gravacao_sem_signals_tambem_refaz_os_fragmentos(self):
+        # Como o extrator no cron (outro processo) ou um UPDATE em massa: nenhum
+        # signal roda neste processo, mas a chave dos fragmentos vem do banco
+        self.client.get('/')
+        Noticia.objects.bulk_create([Noticia(titulo='Gravada pelo cron', fonte_url='https://exemplo.com/noticia/3')])
+        PromocaoBanner.objects.update(titulo='Banner editado em massa', atualizado_em=timezone.now())
+
+        response = self.client.get('/')
+        self.assertContains(response, 'Gravada pelo cron')
+        self.assertContains(response, 'Banner editado em massa')
+
+
+class CachePaginaAnonimaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.banner = PromocaoBanner.objects.create(titulo='Bônus', imagem='promo_banners/bonus.jpg', link_url='https://exemplo.com/a')
+
+    def test_etag_forte_e_304_sem_renderizar(self):
+        primeira = self.client.get('/')
+        etag = primeira['ETag']
+        self.assertRegex(etag, r'^"[0-9a-f]{40}"$')
+        self.assertIn('public', primeira['Cache-Control'])
+        self.assertIn('s-maxage=300', primeira['Cache-Control'])
+        self.assertIn('Cookie', primeira['Vary'])
+        self.assertNotIn('csrfmiddlewaretoken', primeira.content.decode())
+
+        # só as consultas de versão: nada é renderizado
+        with self.assertNumQueries(2):
+            response = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIsNone(response.context)
+
+        self.assertEqual(self.client.get('/calculadora-dutching/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_muda_com_banner_ou_noticia_nova(self):
+        etags = [self.client.get('/')['ETag']]
+        self.banner.titulo = 'Bônus dobrado'
+        self.banner.save()
+        etags.append(self.client.get('/')['ETag'])
+        Noticia.objects.create(titulo='Clássico confirmado', fonte_url='https://exemplo.com/noticia/1')
+        etags.append(self.client.get('/')['ETag'])
+        self.assertEqual(len(set(etags)), 3)
+
+        # ETag antigo: a página nova é enviada inteira
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Bônus dobrado')
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=etags[-1]).status_code, 304)
+
+    def test_parametros_desconhecidos_nao_entram_no_cache(self):
+        self.client.get('/')
+        chaves = len(cache._cache)
+        for indice in range(5):
+            response = self.client.get('/', {'x': indice})
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header('ETag'))
+            self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(len(cache._cache), chaves)
+
+    def test_logado_nao_usa_o_cache_publico(self):
+        self.client.force_login(get_user_model().objects.create_user('membro', password='senha-forte-123'))
+        response = self.client.get('/')
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertContains(response, 'Bem-vindo(a) de volta!')
+
+
+class ResumoDesempenhoTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def criar_tip(self, **extra):
+        dados = {
+            'league': 'Série A', 'match_date': timezone.now() - timedelta(days=1), 'odd_value': '1.50',
+            'method': 'LAY0X1', 'valor_aposta': '100.00', 'valor_ganho': '40.00', 'valor_perda': '100.00',
+        }
+        dados.update(extra)
+        return Tip.objects.create(**dados)
+
+    def test_resumo_acompanha_alteracoes_das_tips(self):
+        tip = self.criar_tip()
+        self.assertFalse(ResumoDesempenho.objects.exists())
+
+        tip.status = 'WIN'
+        tip.save()
+        self.criar_tip(status='LOSS')
+        resumo = ResumoDesempenho.objects.get()
+        self.assertEqual((resumo.total_wins, resumo.total_losses), (1, 1))
+        self.assertEqual(resumo.lucro_liquido, Decimal('-60.00'))
+        self.assertEqual(resumo.total_aposta, Decimal('200.00'))
+
+        # Troca de método move a Tip para outro resumo
+        tip.method = 'BACKC'
+        tip.save()
+        self.assertEqual(ResumoDesempenho.objects.get(method='BACKC').total_wins, 1)
+        self.assertEqual(ResumoDesempenho.objects.get(method='LAY0X1').total_wins, 0)
+
+        tip.delete()
+        self.assertFalse(ResumoDesempenho.objects.filter(method='BACKC').exists())
+
+    def test_edicao_sem_impacto_nao_recalcula(self):
+        tip = self.criar_tip(status='WIN')
+        tip.refresh_from_db()
+        tip.observation = 'Jogo truncado'
+
+        # UPDATE + SELECT do estado anterior, sem recálculo do resumo
+        with self.assertNumQueries(2):
+            tip.save()
+
+    def test_reconstruir_equivale_a_manutencao_incremental(self):
+        self.criar_tip(status='WIN')
+        self.criar_tip(status='LOSS', method='BACKV', match_date=timezone.now() - timedelta(days=70))
+        self.criar_tip(status='VOID')
+        incremental = list(ResumoDesempenho.objects.values_list(
+            'ano', 'mes', 'method', 'total_aposta', 'lucro_liquido', 'total_wins', 'total_losses', 'ultima_data'))
+
+        self.assertEqual(ResumoDesempenho.reconstruir(), 2)
+        reconstruido = list(ResumoDesempenho.objects.values_list(
+            'ano', 'mes', 'method', 'total_aposta', 'lucro_liquido', 'total_wins', 'total_losses', 'ultima_data'))
+        self.assertEqual(incremental, reconstruido)
+
+    def test_dashboard_le_apenas_o_resumo(self):
+        self.criar_tip(status='WIN')
+        self.criar_tip(status='LOSS', method='BACKV')
+        self.client.force_login(get_user_model().objects.create_user('analista', password='senha-forte-123'))
+
+        response = self.client.get('/dashboard-analise/')
+
+        self.assertEqual(response.context['global_net_profit'], Decimal('-60.00'))
+        self.assertEqual(response.context['global_stakes'], Decimal('200.00'))
+        self.assertEqual(
+            {(item['method_code'], item['total_apostas']) for item in response.context['summary']},
+            {('LAY0X1', 1), ('BACKV', 1)},
+        )
+
+
+class DashboardCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(get_user_model().objects.create_user('analista', password='senha-forte-123'))
+        self.tip = Tip.objects.create(
+            league='Série A', match_date=timezone.now() - timedelta(days=1), odd_value='1.50',
+            status='WIN', valor_aposta='100.00', valor_ganho='40.00',
+        )
+
+    def test_cache_por_filtro_ate_alteracao_de_aposta_concluida(self):
+        self.client.get('/dashboard-analise/')
+        with self.assertNumQueries(3):   # sessão + usuário + versão dos resumos, nenhum cálculo
+            response = self.client.get('/dashboard-analise/')
+        self.assertEqual(response.context['global_net_profit'], Decimal('40.00'))
+
+        # Outro filtro é outra entrada de cache
+        self.client.get('/dashboard-analise/?month=1&year=2020')
+        self.assertEqual(cache_versionado.estatisticas('dashboard')['misses'], 2)
+
+        self.tip.status = 'LOSS'
+        self.tip.valor_perda = Decimal('100.00')
+        self.tip.save()
+
+        response = self.client.get('/dashboard-analise/')
+        self.assertEqual(response.context['global_net_profit'], Decimal('-100.00'))
+        self.assertEqual(cache_versionado.estatisticas('dashboard')['hits'], 1)
+        self.assertEqual(cache_versionado.estatisticas('dashboard')['misses'], 3)
+
+    def test_tip_pendente_nao_invalida_o_cache(self):
+        from .cache_pagina import DEPENDENCIAS
+        versao = DEPENDENCIAS['resumos']()
+        Tip.objects.create(league='Série A', match_date=timezone.now(), odd_value='2.00')
+        self.assertEqual(DEPENDENCIAS['resumos'](), versao)
+
+    def test_alteracao_sem_signals_tambem_invalida(self):
+        # Ex.: outro processo (importação, cron) reconstrói os resumos
+        self.client.get('/dashboard-analise/')
+        Tip.objects.filter(pk=self.tip.pk).update(status='LOSS', valor_perda=Decimal('100.00'))
+        call_command('reconstruir_resumos', stdout=StringIO())
+
+        response = self.client.get('/dashboard-analise/')
+        self.assertEqual(response.context['global_net_profit'], Decimal('-100.00'))
+
+
+class BenchmarkIndicesTests(TestCase):
+
+    def test_roda_no_banco_de_teste_e_desfaz_tudo(self):
+        saida = StringIO()
+        call_command('benchmark_indices', '--linhas', '300', '--times', '10', '--repeticoes', '1', stdout=saida)
+        self.assertIn('=== RESUMO (mediana em ms) ===', saida.getvalue())
+        self.assertFalse(Tip.objects.exists())
+        self.assertFalse(Team.objects.exists())
+
+    def test_recusa_banco_que_nao_e_de_teste(self):
+        from unittest import mock
+        from django.core.management.base import CommandError
+        from .management.commands.benchmark_indices import Command
+        with mock.patch.object(Command, 'banco_descartavel', return_value=False):
+            with self.assertRaisesMessage(CommandError, '--confirmar'):
+                call_command('benchmark_indices', '--linhas', '10', stdout=StringIO())
+        self.assertFalse(Tip.objects.exists())
+
+
+class DetalhesTimeTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_user('membro', password='senha-forte-123'))
+        self.time = Team.objects.create(name='Grêmio')
+        self.rival = Team.objects.create(name='Internacional')
+
+    def jogo(self, casa, fora, placar_casa, placar_fora, dias=1):
+        return Tip.objects.create(
+            home_team=casa, away_team=fora, score_home=placar_casa, score_away=placar_fora,
+            league='Série A', match_date=timezone.now() - timedelta(days=dias), odd_value='1.50',
+        )
+
+    def test_estatisticas_agregadas_em_casa_e_fora(self):
+        self.jogo(self.time, self.rival, 3, 1)       # vitória em casa
+        self.jogo(self.rival, self.time, 0, 2)       # vitória fora
+        self.jogo(self.rival, self.time, 2, 2)       # empate
+        self.jogo(self.time, self.rival, 0, 1)       # derrota em casa
+        self.jogo(self.time, self.rival, None, None) # sem placar
+
+        response = self.client.get(f'/banco-de-dados/time/{self.time.pk}/')
+        stats = response.context['stats']
+
+        self.assertEqual(
+            (stats['total'], stats['vitorias'], stats['empates'], stats['derrotas']),
+            (5, 2, 1, 1),
+        )
+        self.assertEqual((stats['gols_pro'], stats['gols_contra'], stats['saldo']), (7, 4, 3))
+
+    def test_numero_de_consultas_nao_cresce_com_o_historico(self):
+        for dia in range(60):
+            self.jogo(self.time, self.rival, 1, 0, dias=dia)
+
+        # sessão, usuário, time, agregação, contagem e página
+        with self.assertNumQueries(6):
+            response = self.client.get(f'/banco-de-dados/time/{self.time.pk}/?pagina=2')
+        self.assertEqual(len(response.context['jogos']), 25)
+
+
+class TeamStatsTests(TestCase):
+
+    def setUp(self):
+        self.casa = Team.objects.create(name='Bahia')
+        self.fora = Team.objects.create(name='Vitória')
+        self.outro = Team.objects.create(name='Sport')
+        self.user = get_user_model().objects.create_user('analista', password='senha-forte-123')
+
+    def tip(self, odd, dias, method='LAY0X1', casa=None):
+        return Tip.objects.create(
+            home_team=casa or self.casa, away_team=self.fora, league='Série A', method=method,
+            match_date=timezone.now() - timedelta(days=dias), odd_value=odd,
+        )
+
+    def test_estatisticas_acompanham_criacao_edicao_e_exclusao(self):
+        self.tip('1.50', dias=3)
+        recente = self.tip('2.50', dias=1, method='LAY1X0')
+
+        stats = TeamStats.objects.get(team=self.casa)
+        self.assertEqual((stats.total_jogos, stats.odd_media, stats.ultimo_metodo), (2, Decimal('2.00'), 'LAY1X0'))
+
+        # Troca o mandante: sai das estatísticas do Bahia e entra nas do Sport
+        recente.home_team = self.outro
+        recente.save()
+        self.assertEqual(TeamStats.objects.get(team=self.casa).total_jogos, 1)
+        self.assertEqual(TeamStats.objects.get(team=self.outro).ultimo_metodo, 'LAY1X0')
+
+        recente.delete()
+        self.assertEqual(TeamStats.objects.get(team=self.outro).total_jogos, 0)
+        self.assertEqual(TeamStats.objects.get(team=self.fora).total_jogos, 1)
+
+    def test_lista_de_times_usa_uma_consulta_por_pagina(self):
+        for dia in range(5):
+            self.tip('1.80', dias=dia)
+        self.client.force_login(self.user)
+
+        # sessão, usuário, contagem e página (times + estatísticas num JOIN)
+        with self.assertNumQueries(4):
+            response = self.client.get('/banco-de-dados/times/?search=ba')
+        times = list(response.context['times'])
+        self.assertEqual([t.name for t in times], ['Bahia'])
+        self.assertEqual(times[0].odd_media, Decimal('1.80'))
+
+
+class BuscaTimesTests(TestCase):
+
+    def setUp(self):
+        for nome in ['Grêmio', 'Grêmio Novorizontino', 'Vasco da Gama', 'Gama', 'Internacional']:
+            Team.objects.create(name=nome)
+
+    def nomes(self, termo):
+        return list(Team.objects.buscar(termo).values_list('name', flat=True))
+
+    def test_ignora_acentos_e_maiusculas(self):
+        self.assertEqual(self.nomes('GREMIO'), ['Grêmio', 'Grêmio Novorizontino'])
+        self.assertEqual(self.nomes('vasco da  gama'), ['Vasco da Gama'])
+
+    def test_ordena_por_relevancia(self):
+        # nome exato primeiro, depois "começa com", depois "contém"
+        self.assertEqual(self.nomes('gama'), ['Gama', 'Vasco da Gama'])
+
+    def test_renomear_atualiza_nome_normalizado(self):
+        time = Team.objects.get(name='Internacional')
+        time.name = 'Internacional São Paulo'
+        time.save(update_fields=['name'])
+        self.assertEqual(self.nomes('sao paulo'), ['Internacional São Paulo'])
+
+    def test_lista_de_times_e_admin_usam_a_busca(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'senha-forte-123')
+        self.client.force_login(admin)
+
+        response = self.client.get('/banco-de-dados/times/?search=gremio')
+        self.assertEqual([t.name for t in response.context['times']], ['Grêmio', 'Grêmio Novorizontino'])
+
+        response = self.client.get('/admin/tips_core/team/?q=gremio')
+        self.assertEqual(response.context['cl'].result_count, 2)
+
+    def test_termo_so_com_simbolos_nao_filtra(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'senha-forte-123')
+        self.client.force_login(admin)
+        for termo in ['★', '%20%20', '%E2%98%85%20%E2%9C%93']:
+            response = self.client.get(f'/banco-de-dados/times/?search={termo}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['times']), 5)
+        self.assertEqual(len(self.nomes('★')), 5)
+
+
+class DeduplicarTimesTests(TestCase):
+
+    def tip(self, casa, fora):
+        return Tip.objects.create(
+            home_team=casa, away_team=fora, league='Série A',
+            match_date=timezone.now(), odd_value='1.70',
+        )
+
+    def test_unifica_duplicados_e_guarda_aliases(self):
+        vasco = Team.objects.create(name='Vasco da Gama')
+        vasco_minusculo = Team.objects.create(name='Vasco da gama')
+        gremio = Team.objects.create(name='Grêmio')
+        gremio_sem_acento = Team.objects.create(name='Gremio ')
+        flamengo = Team.objects.create(name='Flamengo')
+        flamengo_rj = Team.objects.create(name='Flamengo RJ')
+        atletico = Team.objects.create(name='Atlético Mineiro')
+        atletico_erro = Team.objects.create(name='Atletico Mineir')
+
+        self.tip(vasco, gremio)
+        self.tip(vasco, flamengo)
+        self.tip(flamengo_rj, vasco_minusculo)
+        self.tip(gremio_sem_acento, flamengo)
+        self.tip(atletico, atletico_erro)
+
+        call_command('deduplicar_times', limite=0.8, confirmar=True, stdout=StringIO())
+
+        self.assertQuerySetEqual(
+            Team.objects.order_by('name').values_list('name', flat=True),
+            ['Atlético Mineiro', 'Flamengo', 'Flamengo RJ', 'Grêmio', 'Vasco da Gama'],
+        )
+        self.assertEqual(Tip.objects.filter(away_team=vasco).count(), 1)
+        self.assertEqual(Tip.objects.filter(home_team=gremio).count(), 1)
+        self.assertEqual(TeamStats.objects.get(team=vasco).total_jogos, 3)
+        # Só grafias que a normalização não resolve viram alias
+        self.assertQuerySetEqual(TeamAlias.objects.values_list('nome', 'team'), [('Atletico Mineir', atletico.pk)])
+
+    def test_simular_nao_altera_nada(self):
+        Team.objects.create(name='Vasco da Gama')
+        Team.objects.create(name='Vasco da gama')
+        call_command('deduplicar_times', '--simular', stdout=StringIO())
+        self.assertEqual(Team.objects.count(), 2)
+
+    def test_padrao_une_so_nomes_identicos(self):
+        Team.objects.create(name='Vasco da Gama')
+        Team.objects.create(name='Vasco da gama')
+        Team.objects.create(name='Atlético Mineiro')
+        Team.objects.create(name='Atletico Mineir')
+        call_command('deduplicar_times', stdout=StringIO())
+        self.assertEqual(Team.objects.count(), 3)
+
+    def test_similaridade_sem_confirmar_so_mostra_o_plano(self):
+        Team.objects.create(name='Atlético Mineiro')
+        Team.objects.create(name='Atletico Mineir')
+        saida = StringIO()
+        call_command('deduplicar_times', limite=0.8, stdout=saida)
+        self.assertIn('--confirmar', saida.getvalue())
+        self.assertIn('Atletico Mineir', saida.getvalue())
+        self.assertEqual(Team.objects.count(), 2)
+
+    def test_times_b_e_reservas_nunca_sao_unidos(self):
+        from .management.commands.deduplicar_times import agrupar_times
+        times = {
+            1: 'palmeiras', 2: 'palmeiras b', 3: 'real madrid', 4: 'real madrid b',
+            5: 'flamengo', 6: 'flamengo sub20', 7: 'corinthians', 8: 'corinthians feminino',
+            9: 'gremio', 10: 'gremio reservas', 11: 'santos', 12: 'santos u-23',
+        }
+        for limite in (0.8, 0.5, 0.3):
+            self.assertEqual(agrupar_times(times, limite), [], limite)
+
+        Team.objects.create(name='Palmeiras')
+        Team.objects.create(name='Palmeiras B')
+        call_command('deduplicar_times', limite=0.5, confirmar=True, stdout=StringIO())
+        self.assertEqual(Team.objects.count(), 2)
+
+    def test_agrupa_nomes_parecidos_pelo_limite(self):
+        from .management.commands.deduplicar_times import agrupar_times
+        times = {1: 'atletico mineiro', 2: 'atletico mineir', 3: 'atletico goianiense'}
+        self.assertEqual(agrupar_times(times, 0.8), [[1, 2]])
+        self.assertEqual(agrupar_times(times, 1), [])
+
+
+class ImportarDadosTests(TestCase):
+
+    def test_leitura_incremental_equivale_ao_json_load(self):
+        from .management.commands.importar_dados import iterar_registros
+        with open(settings.BASE_DIR / 'dados_reais.json', encoding='utf-8') as arquivo:
+            esperado = json.load(arquivo)
+            arquivo.seek(0)
+            # Blocos minúsculos forçam registros quebrados entre leituras
+            self.assertEqual(list(iterar_registros(arquivo, tamanho_leitura=7)), esperado)
+
+    def test_importa_em_lotes_e_reaproveita_times_existentes(self):
+        vasco = Team.objects.create(name='Vasco da Gama')
+        dump = [
+            {'model': 'tips_core.team', 'pk': 10, 'fields': {'name': 'Vasco da gama', 'logo': ''}},
+            {'model': 'tips_core.team', 'pk': 11, 'fields': {'name': 'Flamengo', 'logo': ''}},
+            {'model': 'tips_core.customuser', 'pk': 1, 'fields': {'username': 'ignorado'}},
+        ] + [
+            {'model': 'tips_core.tip', 'pk': pk, 'fields': {
+                'home_team': 10, 'away_team': 11, 'league': 'Série A', 'method': 'LAY0X1',
+                'match_date': '2026-01-06T18:00:00Z', 'odd_value': '2.00', 'status': 'WIN',
+                'valor_aposta': '100.00', 'valor_ganho': '50.00', 'valor_perda': '0.00',
+            }}
+            for pk in range(1, 6)
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as arquivo:
+            json.dump(dump, arquivo)
+        self.addCleanup(os.remove, arquivo.name)
+
+        saida = StringIO()
+        call_command('importar_dados', arquivo.name, '--lote', '2', stdout=saida)
+        # Reimportar o mesmo dump atualiza em vez de duplicar
+        call_command('importar_dados', arquivo.name, stdout=StringIO())
+
+        self.assertEqual(Team.objects.count(), 2)
+        self.assertEqual(Tip.objects.filter(home_team=vasco).count(), 5)
+        self.assertEqual(TeamStats.objects.get(team=vasco).total_jogos, 5)
+        self.assertEqual(ResumoDesempenho.objects.get(ano=2026, mes=1).total_wins, 5)
+        self.assertIn('linhas/s', saida.getvalue())
+
+    def test_tip_sem_time_importa_com_fk_nula(self):
+        dump = [
+            {'model': 'tips_core.tip', 'pk': 1, 'fields': {
+                'home_team': None, 'away_team': 42, 'league': 'Série B', 'method': 'LAY0X1',
+                'match_date': '2026-02-10T18:00:00Z', 'odd_value': '2.00', 'status': 'WIN',
+                'valor_aposta': '100.00', 'valor_ganho': '50.00', 'valor_perda': '0.00',
+            }},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as arquivo:
+            json.dump(dump, arquivo)
+        self.addCleanup(os.remove, arquivo.name)
+
+        call_command('importar_dados', arquivo.name, stdout=StringIO())
+
+        tip = Tip.objects.get(pk=1)
+        self.assertIsNone(tip.home_team_id)
+        self.assertEqual(tip.away_team.name, 'Time 42')
+        self.assertFalse(Team.objects.filter(name='Time None').exists())
+
+    def test_time_provisorio_reaproveita_nome_ja_usado(self):
+        # "Time 42" já existe com outro pk (ex.: importação anterior com outro banco)
+        provisorio = Team.objects.create(name='Time 42')
+        dump = [
+            {'model': 'tips_core.tip', 'pk': 1, 'fields': {
+                'home_team': 42, 'away_team': 43, 'league': 'Série B', 'method': 'LAY0X1',
+                'match_date': '2026-02-10T18:00:00Z', 'odd_value': '2.00', 'status': 'WIN',
+                'valor_aposta': '100.00', 'valor_ganho': '50.00', 'valor_perda': '0.00',
+            }},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as arquivo:
+            json.dump(dump, arquivo)
+        self.addCleanup(os.remove, arquivo.name)
+
+        call_command('importar_dados', arquivo.name, stdout=StringIO())
+
+        tip = Tip.objects.get(pk=1)
+        self.assertEqual(tip.home_team_id, provisorio.pk)
+        self.assertEqual(tip.away_team.name, 'Time 43')
+        self.assertEqual(Team.objects.filter(name='Time 42').count(), 1)
+
+
+class ExportacaoHistoricoTests(TestCase):
+
+    def setUp(self):
+        casa = Team.objects.create(name='Santos')
+        fora = Team.objects.create(name='Palmeiras')
+        for dia in range(1, 8):
+            Tip.objects.create(
+                home_team=casa, away_team=fora, league='Série A', method='LAY0X1', odd_value='3.10',
+                match_date=timezone.make_aware(datetime(2026, 3, dia, 16)),
+            )
+
+    def ler_csv_gz(self, dados):
+        return list(csv.DictReader(io.StringIO(gzip.decompress(dados).decode('utf-8'))))
+
+    def test_exporta_intervalo_em_lotes(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'historico.csv.gz')
+            call_command(
+                'exportar_historico', '--formato', 'csv', '--saida', caminho,
+                '--desde', '2026-03-02', '--ate', '2026-03-05', '--lote', '2', stdout=StringIO(),
+            )
+            with open(caminho, 'rb') as arquivo:
+                linhas = self.ler_csv_gz(arquivo.read())
+
+        self.assertEqual(len(linhas), 4)
+        self.assertEqual((linhas[0]['home_team'], linhas[0]['away_team']), ('Santos', 'Palmeiras'))
+        self.assertTrue(linhas[0]['match_date'].startswith('2026-03-02'))
+
+    def test_data_invalida_vira_erro_de_uso(self):
+        from django.core.management.base import CommandError
+        with self.assertRaisesMessage(CommandError, 'Data inválida: 2024-13-01'):
+            call_command('exportar_historico', '--desde', '2024-13-01', stdout=StringIO())
+
+    @skipUnless(exportacao.parquet_disponivel(), 'pyarrow não instalado')
+    def test_exporta_parquet(self):
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'historico.parquet')
+            call_command('exportar_historico', '--formato', 'parquet', '--saida', caminho, '--lote', '3', stdout=StringIO())
+            tabela = pq.read_table(caminho)
+        self.assertEqual(tabela.num_rows, 7)
+        self.assertEqual(tabela.column('odd_value').to_pylist()[0], 3.1)
+
+    def test_acao_do_admin_envia_csv_compactado(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'senha-forte-123')
+        self.client.force_login(admin)
+        response = self.client.post('/admin/tips_core/tip/', {
+            'action': 'exportar_historico_csv',
+            '_selected_action': list(Tip.objects.values_list('pk', flat=True)[:3]),
+        })
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(len(self.ler_csv_gz(b''.join(response.streaming_content))), 3)
+
+
+class PremiumAtivoTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('assinante', password='senha-forte-123')
+
+    def test_vencimento_vale_sem_precisar_salvar_o_usuario(self):
+        self.user.premium_expiration_date = timezone.localdate()
+        self.user.save()
+        self.assertTrue(self.user.premium_ativo)
+
+        # Venceu ontem: o booleano gravado ficou desatualizado, a data não
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            premium_expiration_date=timezone.localdate() - timedelta(days=1),
+        )
+        self.client.force_login(self.user)
+        response = self.client.get('/premium/content/')
+        self.assertRedirects(response, '/acesso-negado/', fetch_redirect_response=False)
+
+    def test_pagina_premium_nao_recarrega_o_usuario(self):
+        self.user.premium_expiration_date = timezone.localdate() + timedelta(days=10)
+        self.user.save()
+        self.client.force_login(self.user)
+
+        # sessão, usuário e tips
+        with self.assertNumQueries(3):
+            response = self.client.get('/premium/content/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'badge bg-warning text-dark">Premium')
+
+
+class ExpirarPremiumTests(TestCase):
+
+    def criar(self, username, dias):
+        user = get_user_model().objects.create_user(username, password='senha-forte-123')
+        Assinatura.objects.create(user=user, is_active=True)
+        # Grava a data como se tivesse vencido depois do último save()
+        get_user_model().objects.filter(pk=user.pk).update(
+            is_premium_member=True,
+            premium_expiration_date=timezone.localdate() + timedelta(days=dias) if dias is not None else None,
+        )
+        return user
+
+    def test_expira_em_massa_sem_signals(self):
+        vencido = self.criar('vencido', -1)
+        sem_data = self.criar('sem_data', None)
+        ativo = self.criar('ativo', 0)
+
+        with self.assertNumQueries(4):  # savepoint, 2 UPDATEs, release
+            call_command('expirar_premium', stdout=StringIO())
+
+        Usuario = get_user_model()
+        self.assertEqual(
+            set(Usuario.objects.filter(is_premium_member=True).values_list('username', flat=True)),
+            {'ativo'},
+        )
+        self.assertEqual(
+            set(Assinatura.objects.filter(is_active=True).values_list('user', flat=True)),
+            {ativo.pk},
+        )
+        self.assertFalse(Usuario.objects.get(pk=vencido.pk).premium_ativo)
+        self.assertFalse(Usuario.objects.get(pk=sem_data.pk).premium_ativo)
+
+    def test_assinatura_expira_mesmo_com_a_flag_ja_desligada(self):
+        vencido = self.criar('vencido', -1)
+        # Um save() depois do vencimento recalcula is_premium_member (False)
+        Usuario = get_user_model()
+        Usuario.objects.get(pk=vencido.pk).save()
+        self.assertFalse(Usuario.objects.get(pk=vencido.pk).is_premium_member)
+
+        call_command('expirar_premium', stdout=StringIO())
+        self.assertFalse(Assinatura.objects.get(user=vencido).is_active)
+
+
+class SincronizacaoAssinaturaTests(TestCase):
+
+    def setUp(self):
+        Usuario = get_user_model()
+        self.user = Usuario.objects.create_user('cliente', password='senha-forte-123')
+        Usuario.objects.filter(pk=self.user.pk).update(
+            premium_expiration_date=timezone.localdate() + timedelta(days=5),
+        )
+
+    def estado(self):
+        user = get_user_model().objects.get(pk=self.user.pk)
+        return user.is_premium_member, user.premium_expiration_date
+
+    def test_criacao_sincroniza_com_um_update(self):
+        # INSERT da assinatura + UPDATE do usuário
+        with self.assertNumQueries(2):
+            Assinatura.objects.create(user=self.user, is_active=True)
+        self.assertTrue(self.estado()[0])
+
+    def test_salvar_sem_mudar_is_active_nao_toca_no_usuario(self):
+        Assinatura.objects.create(user=self.user, is_active=True)
+        assinatura = Assinatura.objects.get(user=self.user)
+        with self.assertNumQueries(1):
+            assinatura.save()
+
+    def test_desativar_remove_premium_e_data(self):
+        Assinatura.objects.create(user=self.user, is_active=True)
+        assinatura = Assinatura.objects.get(user=self.user)
+        assinatura.is_active = False
+        # UPDATE da assinatura, dos períodos em vigor e do usuário
+        with self.assertNumQueries(3):
+            assinatura.save()
+        self.assertEqual(self.estado(), (False, None))
+
+    def test_acao_em_massa_do_admin_usa_consultas_fixas(self):
+        Usuario = get_user_model()
+        for indice in range(5):
+            Assinatura.objects.create(user=Usuario.objects.create_user(f'lote{indice}'), is_active=True)
+        admin = Usuario.objects.create_superuser('admin', 'admin@example.com', 'senha-forte-123')
+        self.client.force_login(admin)
+
+        dados = {
+            'action': 'desativar_assinaturas',
+            '_selected_action': list(Assinatura.objects.values_list('pk', flat=True)),
+        }
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.post('/admin/tips_core/assinatura/', dados)
+        updates = [q['sql'] for q in consultas.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 3)  # assinaturas, períodos e usuários
+        self.assertFalse(Assinatura.objects.filter(is_active=True).exists())
+
+
+# --- SERVIDOR FALSO DO PAGSEGURO ---
+
+class PagSeguroFalsoHandler(BaseHTTPRequestHandler):
+    # código da notificação -> (código da transação, referência, status[, id do item])
+    transacoes = {}
+    falhas_restantes = {}
+    acessos = []
+
+    def do_GET(self):
+        codigo = self.path.split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+        PagSeguroFalsoHandler.acessos.append(codigo)
+        if PagSeguroFalsoHandler.falhas_restantes.get(codigo):
+            PagSeguroFalsoHandler.falhas_restantes[codigo] -= 1
+            self.send_error(503)
+            return
+        if codigo not in self.transacoes:
+            self.send_error(404)
+            return
+        transacao, referencia, status, *item = self.transacoes[codigo]
+        item = item[0] if item else '1'
+        corpo = (
+            f'<?xml version="1.0" encoding="ISO-8859-1"?><transaction><code>{transacao}</code>'
+            f'<reference>{referencia}</reference><status>{status}</status>'
+            f'<items><item><id>{item}</id></item></items></transaction>'
+        ).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def imagem_png(largura, altura):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGBA', (largura, altura), (255, 193, 7, 255)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class ImagensVariantesTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        configuracao = override_settings(MEDIA_ROOT=pasta.name, IMAGENS_EM_SEGUNDO_PLANO=False)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def test_upload_gera_variantes_sem_ampliar(self):
+        from django.core.files.base import ContentFile
+        time_obj = Team(name='Bahia')
+        time_obj.logo.save('escudo bahia.png', ContentFile(imagem_png(150, 100)), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            time_obj.save()
+
+        time_obj.refresh_from_db()
+        variantes = time_obj.logo_variantes
+        self.assertEqual(variantes['origem'], time_obj.logo.name)
+        self.assertTrue(variantes['placeholder'].startswith('data:image/webp;base64,'))
+        self.assertEqual((variantes['tamanhos']['thumb']['largura'], variantes['tamanhos']['thumb']['altura']), (96, 64))
+        # A original tem 150px: card e hero não são ampliados
+        self.assertEqual(variantes['tamanhos']['hero']['largura'], 150)
+        for variante in variantes['tamanhos'].values():
+            for _, extensao, _ in imagens.FORMATOS:
+                self.assertTrue(time_obj.logo.storage.exists(variante[extensao]))
+
+        # Salvar de novo sem trocar o arquivo não reprocessa
+        with self.captureOnCommitCallbacks() as callbacks:
+            time_obj.save()
+        self.assertEqual(callbacks, [])
+
+    def test_template_tag_emite_srcset_por_formato(self):
+        from django.core.files.base import ContentFile
+        from django.template import Context, Template
+        banner = PromocaoBanner(titulo='Bônus', link_url='https://exemplo.com/a')
+        banner.imagem.save('bonus.png', ContentFile(imagem_png(1600, 400)), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            banner.save()
+        banner.refresh_from_db()
+
+        html = Template(
+            "{% load imagens %}{% imagem_responsiva banner.imagem banner.imagem_variantes alt=banner.titulo tamanho='hero' %}"
+        ).render(Context({'banner': banner}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('_thumb.webp 96w', html)
+        self.assertIn('_hero.webp 1200w', html)
+        self.assertIn('width="1200" height="300"', html)
+        self.assertIn('alt="Bônus"', html)
+
+        # A home (carrossel) já usa as variantes
+        self.assertContains(self.client.get('/'), '_hero.webp 1200w')
+
+    def test_comando_processa_imagens_antigas(self):
+        from django.core.files.base import ContentFile
+        time_obj = Team(name='Sport')
+        time_obj.logo.save('sport.png', ContentFile(imagem_png(64, 64)), save=False)
+        time_obj.save()   # sem executar o on_commit: fica sem variantes
+        self.assertEqual(Team.objects.get(pk=time_obj.pk).logo_variantes, {})
+
+        saida = StringIO()
+        call_command('processar_imagens', workers=1, stdout=saida)
+        self.assertIn('1 imagens processadas', saida.getvalue())
+        self.assertEqual(Team.objects.get(pk=time_obj.pk).logo_variantes['tamanhos']['card']['largura'], 64)
+
+
+class StaticOtimizadoTests(TestCase):
+
+    def test_collectstatic_otimiza_imagens_e_inclui_no_manifesto(self):
+        from contextlib import redirect_stdout
+        from django.core.files.storage import FileSystemStorage
+        from PIL import Image
+        from .storage import StaticOtimizadoStorage
+
+        with tempfile.TemporaryDirectory() as origem, tempfile.TemporaryDirectory() as destino:
+            os.makedirs(os.path.join(origem, 'img'))
+            # JPEG de qualidade máxima, como os exportados por editores de imagem
+            gradiente = Image.linear_gradient('L').resize((1600, 400)).convert('RGB')
+            gradiente.save(os.path.join(origem, 'img', 'banner 1.jpg'), 'JPEG', quality=100)
+            original = os.path.getsize(os.path.join(origem, 'img', 'banner 1.jpg'))
+
+            storage = StaticOtimizadoStorage(location=destino, base_url='/static/')
+            paths = {'img/banner 1.jpg': (FileSystemStorage(location=origem), 'img/banner 1.jpg')}
+            saida = StringIO()
+            with redirect_stdout(saida):
+                processados = list(storage.post_process(paths, dry_run=False))
+
+            self.assertFalse([erro for _, _, erro in processados if isinstance(erro, Exception)])
+            self.assertLess(os.path.getsize(os.path.join(destino, 'img', 'banner 1.jpg')), original)
+            # Irmão WebP e tamanhos menores que a original, todos com hash no manifesto
+            for nome in ('img/banner-1.webp', 'img/banner-1-640w.jpg', 'img/banner-1-640w.webp', 'img/banner-1-1280w.webp'):
+                self.assertIn(nome, storage.hashed_files)
+                self.assertTrue(storage.exists(storage.hashed_files[nome]))
+            self.assertNotIn('img/banner-1-1920w.webp', storage.hashed_files)
+            self.assertIn('img/banner 1.jpg: ', saida.getvalue())
+            self.assertIn('Imagens: ', saida.getvalue())
+
+    def test_minifica_css_e_js_sem_mexer_em_strings(self):
+        from .storage import minificar_css, minificar_js
+        self.assertEqual(
+            minificar_css("/* tema */\n.card {\n    color: #fff;\n    content: 'a  b';\n}\n"),
+            ".card{color:#fff;content:'a  b'}",
+        )
+        self.assertEqual(
+            minificar_js("// soma\nconst total = a / b;  /* fim */\nconst r = /x\\/y/g;\nhtml = `  ${total}  ` + 'it\\'s';\n"),
+            "const total=a/b;\nconst r=/x\\/y/g;\nhtml=`  ${total}  `+'it\\'s';\n",
+        )
+
+    def test_templates_carregam_os_bundles_estaticos(self):
+        response = self.client.get('/calculadora-dutching/')
+        self.assertContains(response, '/static/tips_core/js/dutching_calculator.js')
+        self.assertContains(response, '/static/tips_core/css/dutching_calculator.css')
+        self.assertNotContains(response, 'function calculateDutching')
+
+        response = self.client.get('/')
+        self.assertContains(response, '/static/tips_core/js/tip_list.js')
+        self.assertNotContains(response, 'function calcularProtecao')
+
+
+class NotificacoesPagSeguroTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), PagSeguroFalsoHandler)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.configuracao = override_settings(
+            PAGSEGURO_NOTIFICATION_URL=f"http://127.0.0.1:{cls.servidor.server_address[1]}/v3/transactions/notifications/",
+        )
+        cls.configuracao.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.configuracao.disable()
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        PagSeguroFalsoHandler.transacoes = {}
+        PagSeguroFalsoHandler.falhas_restantes = {}
+        PagSeguroFalsoHandler.acessos = []
+        self.user = get_user_model().objects.create_user('pagante', password='senha-forte-123')
+
+    def notificar(self, codigo):
+        return self.client.post('/pagseguro/notificacao/', {'notificationCode': codigo, 'notificationType': 'transaction'})
+
+    def processar(self):
+        call_command('processar_notificacoes', stdout=StringIO())
+
+    def test_webhook_so_guarda_e_responde(self):
+        self.assertEqual(self.notificar('N1').status_code, 200)
+        self.assertEqual(self.notificar('N1').status_code, 200)  # reenvio do PagSeguro
+        self.assertEqual(self.client.get('/pagseguro/notificacao/').status_code, 405)
+        self.assertEqual(self.client.post('/pagseguro/notificacao/', {'notificationType': 'transaction'}).status_code, 400)
+
+        self.assertEqual(NotificacaoPagSeguro.objects.count(), 1)
+        self.assertEqual(PagSeguroFalsoHandler.acessos, [])
+
+    def test_pagamento_credita_uma_unica_vez(self):
+        # O mesmo pagamento notificado como "Paga" (3) e depois "Disponível" (4)
+        PagSeguroFalsoHandler.transacoes = {'N1': ('T1', 'pagante', '3'), 'N2': ('T1', 'pagante', '4')}
+        self.notificar('N1')
+        self.notificar('N2')
+        self.processar()
+        self.processar()
+
+        user = get_user_model().objects.get(pk=self.user.pk)
+        self.assertEqual(user.premium_expiration_date, timezone.localdate() + timedelta(days=30))
+        self.assertEqual(SubscriptionPeriod.objects.get(user=user).transacao, 'T1')
+        self.assertTrue(user.is_premium_member)
+        self.assertTrue(Assinatura.objects.get(user=user).is_active)
+        self.assertEqual(NotificacaoPagSeguro.objects.filter(status='PROCESSADA').count(), 2)
+        self.assertEqual(NotificacaoPagSeguro.objects.filter(credito_aplicado=True).count(), 1)
+        self.assertEqual(sorted(PagSeguroFalsoHandler.acessos), ['N1', 'N2'])
+
+    def test_falha_temporaria_e_repetida_na_mesma_sessao(self):
+        PagSeguroFalsoHandler.transacoes = {'N1': ('T1', 'pagante', '3')}
+        PagSeguroFalsoHandler.falhas_restantes = {'N1': 1}
+        self.notificar('N1')
+        self.processar()
+        self.assertEqual(NotificacaoPagSeguro.objects.get().status, 'PROCESSADA')
+        self.assertEqual(PagSeguroFalsoHandler.acessos, ['N1', 'N1'])
+
+    def test_erro_reagenda_a_notificacao(self):
+        self.notificar('DESCONHECIDA')
+        with self.assertLogs('tips_core.pagamentos', 'WARNING'):
+            self.processar()
+        notificacao = NotificacaoPagSeguro.objects.get()
+        self.assertEqual((notificacao.status, notificacao.tentativas), ('PENDENTE', 1))
+        self.assertGreater(notificacao.proxima_tentativa, timezone.now())
+
+    def test_referencia_desconhecida_falha_e_pode_ser_reprocessada(self):
+        from django.contrib import admin as django_admin
+        from .admin import NotificacaoPagSeguroAdmin
+        PagSeguroFalsoHandler.transacoes = {'N1': ('T1', 'digitado-errado', '3')}
+        self.notificar('N1')
+        with self.assertLogs('tips_core.pagamentos', 'WARNING'):
+            self.processar()
+
+        notificacao = NotificacaoPagSeguro.objects.get()
+        self.assertEqual(notificacao.status, 'FALHOU')
+        self.assertFalse(notificacao.credito_aplicado)
+        self.assertIn('digitado-errado', notificacao.ultimo_erro)
+
+        # Corrigida a referência, o admin devolve a notificação para a fila
+        get_user_model().objects.filter(pk=self.user.pk).update(username='digitado-errado')
+        admin = NotificacaoPagSeguroAdmin(NotificacaoPagSeguro, django_admin.site)
+        admin.message_user = lambda *args, **kwargs: None
+        admin.reprocessar(None, NotificacaoPagSeguro.objects.all())
+        self.processar()
+        self.assertTrue(NotificacaoPagSeguro.objects.get().credito_aplicado)
+
+    def test_plano_nao_identificado_falha_sem_creditar(self):
+        PagSeguroFalsoHandler.transacoes = {'N1': ('T1', 'pagante', '3', '999')}
+        self.notificar('N1')
+        with self.assertLogs('tips_core.pagamentos', 'WARNING'):
+            self.processar()
+
+        notificacao = NotificacaoPagSeguro.objects.get()
+        self.assertEqual(notificacao.status, 'FALHOU')
+        self.assertIn('Plano não identificado', notificacao.ultimo_erro)
+        self.assertFalse(SubscriptionPeriod.objects.exists())
+        self.assertFalse(get_user_model().objects.get(pk=self.user.pk).premium_ativo)
+
+    def test_erro_inesperado_nao_trava_as_seguintes(self):
+        from unittest import mock
+        from . import pagamentos
+
+        aplicar = pagamentos.aplicar_notificacao
+
+        def aplicar_com_erro(notificacao_id, dados):
+            if dados['code'] == 'T_RUIM':
+                raise ValueError('dados inesperados')
+            return aplicar(notificacao_id, dados)
+
+        PagSeguroFalsoHandler.transacoes = {'N1': ('T_RUIM', 'pagante', '3'), 'N2': ('T2', 'pagante', '3')}
+        self.notificar('N1')
+        self.notificar('N2')
+        with mock.patch.object(pagamentos, 'aplicar_notificacao', aplicar_com_erro), \
+                self.assertLogs('tips_core.pagamentos', 'ERROR') as logs:
+            resultado = pagamentos.processar_pendentes()
+        self.assertIn('N1', logs.output[0])
+
+        self.assertEqual(resultado, {'processadas': 1, 'creditadas': 1, 'falhas': 1})
+        ruim = NotificacaoPagSeguro.objects.get(codigo='N1')
+        self.assertEqual((ruim.status, ruim.tentativas), ('PENDENTE', 1))
+        self.assertIn('dados inesperados', ruim.ultimo_erro)
+        self.assertGreater(ruim.proxima_tentativa, timezone.now())
+        self.assertEqual(NotificacaoPagSeguro.objects.get(codigo='N2').status, 'PROCESSADA')
+        self.assertTrue(get_user_model().objects.get(pk=self.user.pk).premium_ativo)
+
+    def test_cancelamento_remove_o_premium(self):
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            premium_expiration_date=timezone.localdate() + timedelta(days=20),
+        )
+        Assinatura.objects.create(user=self.user, is_active=True)
+        PagSeguroFalsoHandler.transacoes = {'N1': ('T1', 'pagante', '7')}
+        self.notificar('N1')
+        self.processar()
+        self.assertFalse(get_user_model().objects.get(pk=self.user.pk).premium_ativo)
+
+
+class PlanosEPeriodosTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('renovador', password='senha-forte-123')
+        self.trimestral = Plan.objects.get(pk=3)
+
+    def test_renovacao_emenda_no_fim_do_periodo_atual(self):
+        hoje = timezone.localdate()
+        primeiro = SubscriptionPeriod.registrar(self.user, self.trimestral)
+        segundo = SubscriptionPeriod.registrar(self.user, Plan.objects.get(pk=1))
+
+        self.assertEqual((primeiro.inicio, primeiro.fim), (hoje, hoje + timedelta(days=90)))
+        self.assertEqual((segundo.inicio, segundo.fim), (primeiro.fim, primeiro.fim + timedelta(days=30)))
+        self.assertEqual(SubscriptionPeriod.expiracoes([self.user.pk]), {self.user.pk: segundo.fim})
+        self.assertEqual(get_user_model().objects.get(pk=self.user.pk).premium_expiration_date, segundo.fim)
+
+    def test_pagamento_identifica_o_plano_pelo_item(self):
+        from .pagamentos import identificar_plano
+        self.assertEqual(identificar_plano({'item': '6', 'valor': ''}).pk, 6)
+        self.assertEqual(identificar_plano({'item': '', 'valor': '120.00'}).pk, 3)
+        self.assertIsNone(identificar_plano({'item': '', 'valor': ''}))
+        self.assertIsNone(identificar_plano({'item': '999', 'valor': '87.50'}))
+
+    def test_sem_plano_ativo_nao_registra_periodo(self):
+        from .pagamentos import identificar_plano
+        Plan.objects.update(ativo=False)
+        # Plano inativo ainda é reconhecido pelo item pago
+        self.assertEqual(identificar_plano({'item': '1', 'valor': ''}).pk, 1)
+
+        self.client.force_login(self.user)
+        response = self.client.get(f'/checkout/confirmar/{self.user.username}/')
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        self.assertFalse(SubscriptionPeriod.objects.exists())
+        with self.assertRaises(ValueError):
+            SubscriptionPeriod.registrar(self.user, None)
+
+    def test_cancelamento_nunca_deixa_fim_antes_do_inicio(self):
+        hoje = timezone.localdate()
+        atual = SubscriptionPeriod.registrar(self.user, self.trimestral)
+        renovacao = SubscriptionPeriod.registrar(self.user, self.trimestral)
+        self.assertGreater(renovacao.inicio, hoje)
+
+        # O período de hoje e a renovação emendada, que nem tinha começado
+        Assinatura.sincronizar_usuarios([self.user.pk], ativa=False)
+
+        ontem = hoje - timedelta(days=1)
+        for periodo in SubscriptionPeriod.objects.filter(pk__in=[atual.pk, renovacao.pk]):
+            self.assertEqual((periodo.inicio, periodo.fim), (ontem, ontem))
+        self.assertEqual(SubscriptionPeriod.expiracoes([self.user.pk]), {self.user.pk: ontem})
+
+    def test_pagina_de_planos_vem_do_cache_ate_um_plano_mudar(self):
+        cache.clear()
+        self.client.get('/checkout/planos/')
+        # só a versão da página (último plano alterado)
+        with self.assertNumQueries(1):
+            response = self.client.get('/checkout/planos/')
+        self.assertContains(response, 'R$ 120,00')
+
+        self.trimestral.preco = Decimal('99.90')
+        self.trimestral.save()
+        self.assertContains(self.client.get('/checkout/planos/'), 'R$ 99,90')
+
+
+class PaginacaoPremiumTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('premium', password='senha-forte-123')
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            premium_expiration_date=timezone.localdate() + timedelta(days=10),
+        )
+        self.client.force_login(self.user)
+
+        casa = Team.objects.create(name='Ceará')
+        fora = Team.objects.create(name='Fortaleza')
+        mesma_data = timezone.now() - timedelta(days=1)
+        # 30 tips com a mesma data + 20 em datas diferentes: o desempate é o id
+        self.tips = [
+            Tip.objects.create(
+                home_team=casa, away_team=fora, league='Série A', odd_value='1.90', access_level='PREMIUM',
+                match_date=mesma_data if indice < 30 else mesma_data - timedelta(hours=indice),
+            )
+            for indice in range(50)
+        ]
+
+    def test_cursor_percorre_tudo_sem_repetir_nem_pular(self):
+        vistos = []
+        # sessão, usuário e a página (times no mesmo JOIN)
+        with self.assertNumQueries(3):
+            response = self.client.get('/premium/content/')
+        vistos += [tip.id for tip in response.context['tips']]
+        proximo = response.context['proximo']
+
+        while proximo:
+            dados = self.client.get('/premium/content/mais/', {'antes': proximo}).json()
+            vistos += [tip['id'] for tip in dados['tips']]
+            self.assertEqual(dados['html'].count('Tip Premium'), len(dados['tips']))
+            proximo = dados['proximo']
+
+        esperado = list(
+            Tip.objects.filter(access_level='PREMIUM').order_by('-match_date', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(vistos, esperado)
+
+    def test_endpoint_exige_premium(self):
+        get_user_model().objects.filter(pk=self.user.pk).update(premium_expiration_date=None)
+        self.assertEqual(self.client.get('/premium/content/mais/').status_code, 403)
+
+    def test_tip_sem_time_vai_como_null(self):
+        # As duas mais recentes (mesma data, maior id primeiro)
+        sem_mandante, sem_visitante = self.tips[29], self.tips[28]
+        Tip.objects.filter(pk=sem_mandante.pk).update(home_team=None)
+        Tip.objects.filter(pk=sem_visitante.pk).update(away_team=None)
+
+        response = self.client.get('/premium/content/mais/')
+        self.assertEqual(response.status_code, 200)
+        por_id = {tip['id']: tip for tip in response.json()['tips']}
+        self.assertIsNone(por_id[sem_mandante.pk]['home_team'])
+        self.assertEqual(por_id[sem_mandante.pk]['away_team'], 'Fortaleza')
+        self.assertIsNone(por_id[sem_visitante.pk]['away_team'])
@@ -11,6 +11,7 @@ urlpatterns = [
     
     # Rota de Análise de Desempenho (NOVA IMPLEMENTAÇÃO)
     path('dashboard-analise/', views.analysis_dashboard, name='analysis_dashboard'),
+    path('dashboard-analise/cache/', views.dashboard_cache_stats, name='dashboard_cache_stats'),
 
     # Rota da Calculadora (CORRIGIDA)
     path('calculadora-dutching/', views.calculator_page, name='calculator_page'),
@@ -20,6 +21,7 @@ urlpatterns = [
     
     # Rota de CONTEÚDO Premium (Protegida pelo @login_required na view)
     path('premium/content/', views.premium_tips, name='premium_tips_content'), 
+    path('premium/content/mais/', views.premium_tips_json, name='premium_tips_json'),
     
     # NOVO FLUXO DE PAGAMENTO:
     
@@ -31,6 +33,7 @@ urlpatterns = [
     
     # 3. Rota de Confirmação/Webhook
     path('checkout/confirmar/<str:username>/', views.confirm_payment, name='confirm_payment'),
+    path('pagseguro/notificacao/', views.pagseguro_notificacao, name='pagseguro_notificacao'),
 
     # Rota de Ação de Desativação (Admin)
     path('desativar-tip/<int:tip_id>/', views.deactivate_tip, name='deactivate_tip'),
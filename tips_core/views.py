@@ -2,17 +2,25 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.db import transaction 
 from django.contrib import messages
-from datetime import datetime, timedelta, date # Adicionado 'date'
+from datetime import datetime, timedelta, date, timezone as dt_timezone # Adicionado 'date'
+from functools import partial
+import hashlib
 import pytz 
 from django.contrib.auth import get_user_model, update_session_auth_hash 
 # IMPORTAÇÕES ESSENCIAIS PARA O CÁLCULO DE ANÁLISE
 from django.db.models import Sum, Count, F, Case, When, DecimalField, Max, functions, Q, Avg, Subquery, OuterRef# Adicionado Max e functions
-from django.db.models.functions import Coalesce
+from django.db.models.functions import Coalesce, TruncDate
+from django.core.paginator import Paginator
 from django.conf import settings 
-from .models import Tip, Noticia, Assinatura, METHOD_CHOICES, PromocaoBanner, Team
+from .models import Tip, Noticia, Assinatura, METHOD_CHOICES, PromocaoBanner, Team, ResumoDesempenho, NotificacaoPagSeguro, Plan, SubscriptionPeriod
 from .forms import CustomUserCreationForm
 from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
 from django.views.decorators.csrf import csrf_exempt
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
+from . import cache_versionado
+from .cache_pagina import DEPENDENCIAS, cache_pagina_anonima, versao_dependencia
 import requests 
 import xml.etree.ElementTree as ET
 from django.utils import timezone
@@ -21,28 +29,32 @@ from .models import Team
 
 # --- VIEWS DE CONTEÚDO ---
 
+@cache_pagina_anonima()
 def jogos_flashscore(request):
     """
     Renderiza a página de jogos usando o widget Scores24 (Estilo FlashScore).
     """
     return render(request, 'analysis/jogos_flashscore.html')
 
+
+@cache_pagina_anonima('noticias', 'banners')
 def public_tips_list(request):
     """
     Exibe a lista de tips gratuitas, separando-as corretamente por data local.
+    A classificação por dia é feita no banco (TruncDate no fuso de São Paulo).
+    Jogos passados não aparecem na home (ficam no histórico de cada time).
     """
     noticias_recentes = None
     promo_banners = None
 
     # CORREÇÃO 1: Pega a data de HOJE baseada no fuso horário local (Brasil)
     # Isso evita que o jogo mude de bloco antes da meia-noite real.
-    today = timezone.localtime(timezone.now()).date()
+    agora_local = timezone.localtime(timezone.now())
+    today = agora_local.date()
     
     tips_categorias = {
         'hoje': [],
         'proximos': [],
-        'passados': [], # Passados com status PENDING
-        'concluidos': [], # Passados com status WIN/LOSS/VOID
     }
 
     # 1. VISUALIZAÇÃO PÚBLICA (Usuário NÃO logado)
@@ -52,37 +64,33 @@ def public_tips_list(request):
         
     # 2. VISUALIZAÇÃO DE MEMBRO (Usuário logado)
     else:
-        # Filtra tips ativas e gratuitas
-        all_free_tips = Tip.objects.filter(
+        # CORREÇÃO 2: A data local de cada Tip é calculada pelo próprio banco
+        free_tips = Tip.objects.filter(
             access_level='FREE', 
             is_active=True
-        ).order_by('match_date')
-        
-        for tip in all_free_tips:
-            # CORREÇÃO 2: Converte a data da Tip para o horário local antes de comparar
-            tip_date = timezone.localtime(tip.match_date).date()
-            
-            # --- Regras de Classificação Corrigidas ---
-            if tip_date == today:
-                # Se a data for EXATAMENTE igual a hoje (ex: 05/01)
-                tips_categorias['hoje'].append(tip)
-                
-            elif tip_date > today:
-                # Se a data for no FUTURO (ex: 06/01 em diante)
-                tips_categorias['proximos'].append(tip)
-                
-            else: 
-                # Se a data for no PASSADO (ex: 04/01 para trás)
-                if tip.status in ['WIN', 'LOSS', 'VOID']:
-                    tips_categorias['concluidos'].append(tip)
-                else:
-                    tips_categorias['passados'].append(tip)
+        ).select_related('home_team', 'away_team').annotate(
+            data_local=TruncDate('match_date', tzinfo=timezone.get_current_timezone())
+        )
+
+        # Início do dia local: mantém o filtro em match_date (usa índice)
+        inicio_hoje = agora_local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # --- Regras de Classificação Corrigidas ---
+        futuras = free_tips.filter(match_date__gte=inicio_hoje).order_by('match_date')
+        tips_categorias['hoje'] = futuras.filter(data_local=today)
+        tips_categorias['proximos'] = futuras.filter(data_local__gt=today)
 
     context = {
         'tips_categorias': tips_categorias, 
         'noticias': noticias_recentes,
         'promo_banners': promo_banners,
-        'title': 'Tips e Análises do Dia' 
+        'title': 'Tips e Análises do Dia',
+        # Chaves dos fragmentos em cache do template ({% cache %}), lidas do banco
+        # (as mesmas do ETag da página) só quando o fragmento é renderizado. As
+        # consultas acima são preguiçosas: com o fragmento em cache, nem chegam ao banco.
+        'versao_deploy': settings.DEPLOY_VERSION,
+        'versao_banners': partial(versao_dependencia, request, 'banners'),
+        'versao_noticias': partial(versao_dependencia, request, 'noticias'),
     }
     return render(request, 'tips_core/tip_list.html', context)
 
@@ -112,54 +120,42 @@ def access_denied(request):
 
 # --- VIEW DE ANÁLISE DE DESEMPENHO (Cálculo Corrigido) ---
 
-@login_required
-def analysis_dashboard(request):
+# A chave do dashboard em cache leva a versão dos resumos lida do banco (último
+# atualizado_em + total de linhas): qualquer alteração, de qualquer processo,
+# troca a chave. O TTL só descarta as entradas de versões antigas.
+DASHBOARD_CACHE_TTL = 60 * 60 * 24
+
+
+def _calcular_dashboard(month_filter, year_filter):
     """
-    Calcula e exibe o resumo de ganhos e perdas por Método de Aposta,
-    incluindo dados históricos mensais para o gráfico de linha e filtros.
+    Monta os dados do dashboard (tabela por método, totais e gráfico mensal)
+    a partir do resumo mensal. O resultado só depende dos filtros e das
+    apostas concluídas, por isso pode ser guardado em cache.
     """
-    # 1. Captura de filtros da URL (via GET)
-    today = timezone.localtime(timezone.now())
-    month_filter = request.GET.get('month')
-    year_filter = request.GET.get('year')
-
-    # 2. Filtra apenas as apostas CONCLUÍDAS (WIN, LOSS)
-    concluded_tips = Tip.objects.filter(status__in=['WIN', 'LOSS'])
+    # 2. Lê apenas o resumo mensal (ano, mês, método) das apostas CONCLUÍDAS
+    #    (WIN, LOSS), mantido pelos signals de Tip: custo O(meses x métodos)
+    resumos = ResumoDesempenho.objects.all()
 
     # 3. Aplicação dos filtros na QuerySet (Se selecionados)
     if month_filter and month_filter != 'all':
-        concluded_tips = concluded_tips.filter(match_date__month=month_filter)
+        resumos = resumos.filter(mes=month_filter)
     if year_filter and year_filter != 'all':
-        concluded_tips = concluded_tips.filter(match_date__year=year_filter)
-    
-    # 4. Define a lógica do Lucro Líquido
-    net_profit_case = Case(
-        When(status='WIN', then=F('valor_ganho')), 
-        When(status='LOSS', then=F('valor_perda') * -1), 
-        default=0,
-        output_field=DecimalField()
-    )
+        resumos = resumos.filter(ano=year_filter)
 
     # --- CONSULTA 1: DETALHES POR MÉTODO (Tabela) ---
-    summary_data = concluded_tips.values('method').annotate(
-        total_aposta=Sum('valor_aposta'),
-        lucro_liquido_total=Sum(net_profit_case),
-        total_apostas=Count('id'),
-        total_wins=Count(Case(When(status='WIN', then=1))),
-        total_losses=Count(Case(When(status='LOSS', then=1))),
-        match_date=Max('match_date'), 
+    summary_data = resumos.values('method').annotate(
+        total_aposta=Sum('total_aposta'),
+        lucro_liquido_total=Sum('lucro_liquido'),
+        total_wins=Sum('total_wins'),
+        total_losses=Sum('total_losses'),
+        match_date=Max('ultima_data'), 
     ).order_by('-lucro_liquido_total')
 
     # --- CONSULTA 2: EVOLUÇÃO MENSAL (Gráfico de Linha - Histórico Global) ---
-    # Usamos Tip.objects diretamente para o gráfico não "sumir" ao filtrar um mês específico
-    evolution_tips = Tip.objects.filter(status__in=['WIN', 'LOSS'])
-    
-    monthly_summary = evolution_tips.annotate(
-        year=functions.ExtractYear('match_date'),
-        month=functions.ExtractMonth('match_date')
-    ).values('year', 'month').annotate(
-        monthly_profit=Sum(net_profit_case)
-    ).order_by('year', 'month')
+    # Usamos o resumo sem filtros para o gráfico não "sumir" ao filtrar um mês específico
+    monthly_summary = ResumoDesempenho.objects.values('ano', 'mes').annotate(
+        monthly_profit=Sum('lucro_liquido')
+    ).order_by('ano', 'mes')
     
     # --- FORMATAÇÃO DOS DADOS MENSAIS PARA O CHART.JS ---
     monthly_labels = []
@@ -168,8 +164,8 @@ def analysis_dashboard(request):
     cumulative_profit = 0
     
     for entry in monthly_summary:
-        month_name = MONTH_NAMES[entry['month'] - 1]
-        label = f"{month_name}/{entry['year']}"
+        month_name = MONTH_NAMES[entry['mes'] - 1]
+        label = f"{month_name}/{entry['ano']}"
         profit_of_month = entry['monthly_profit'] or 0 
         cumulative_profit += profit_of_month
         monthly_labels.append(label)
@@ -181,9 +177,9 @@ def analysis_dashboard(request):
     }
     
     # --- FORMATAÇÃO FINAL PARA O CONTEXTO ---
-    global_totals = concluded_tips.aggregate(
-        total_stakes=Sum('valor_aposta'),
-        total_net_profit=Sum(net_profit_case)
+    global_totals = resumos.aggregate(
+        total_stakes=Sum('total_aposta'),
+        total_net_profit=Sum('lucro_liquido')
     )
 
     analysis_summary = []
@@ -199,22 +195,52 @@ def analysis_dashboard(request):
             'method_name': method_dict.get(item['method'], 'Desconhecido'),
             'total_aposta': item['total_aposta'],
             'lucro_liquido_total': item['lucro_liquido_total'],
-            'total_apostas': item['total_apostas'],
+            'total_apostas': item['total_wins'] + item['total_losses'],
             'total_wins': item['total_wins'],
             'total_losses': item['total_losses'],
             'yield_percent': yield_percent,
             'match_date': item['match_date'], 
         })
 
+    return {
+        'summary': analysis_summary,
+        'global_stakes': global_totals.get('total_stakes') or 0,
+        'global_net_profit': global_totals.get('total_net_profit') or 0,
+        'monthly_data_json': json.dumps(monthly_data_for_chart),
+    }
+
+
+@login_required
+def analysis_dashboard(request):
+    """
+    Calcula e exibe o resumo de ganhos e perdas por Método de Aposta,
+    incluindo dados históricos mensais para o gráfico de linha e filtros.
+    Os dados calculados ficam em cache por filtro até a próxima alteração
+    em uma aposta concluída.
+    """
+    # 1. Captura de filtros da URL (via GET)
+    today = timezone.localtime(timezone.now())
+    month_filter = request.GET.get('month')
+    year_filter = request.GET.get('year')
+
+    # Filtros inválidos valem como "todos" (e não geram chaves arbitrárias no cache)
+    mes = month_filter if month_filter and month_filter.isdigit() else 'all'
+    ano = year_filter if year_filter and year_filter.isdigit() else 'all'
+
+    versao = hashlib.sha1(str(DEPENDENCIAS['resumos']()).encode()).hexdigest()[:16]
+    chave_cache = f'dashboard:{versao}:{mes}:{ano}'
+    dados = cache.get(chave_cache)
+    cache_versionado.registrar_acesso('dashboard', dados is not None)
+    if dados is None:
+        dados = _calcular_dashboard(mes, ano)
+        cache.set(chave_cache, dados, DASHBOARD_CACHE_TTL)
+
     # Lista de anos para o filtro (3 anos atrás até o atual)
     years_range = range(today.year - 2, today.year + 1)
 
     context = {
         'title': 'Dashboard de Análise de Desempenho',
-        'summary': analysis_summary,
-        'global_stakes': global_totals.get('total_stakes') or 0,
-        'global_net_profit': global_totals.get('total_net_profit') or 0,
-        'monthly_data_json': json.dumps(monthly_data_for_chart),
+        **dados,
         'selected_month': month_filter,
         'selected_year': year_filter,
         'years_range': years_range,
@@ -222,7 +248,14 @@ def analysis_dashboard(request):
     return render(request, 'tips_core/analysis_dashboard.html', context)
 
 
+@staff_member_required
+def dashboard_cache_stats(request):
+    """Contadores de acerto/erro do cache do dashboard (apenas equipe)."""
+    return JsonResponse(cache_versionado.estatisticas('dashboard'))
+
+
 # --- VIEW DA CALCULADORA ---
+@cache_pagina_anonima()
 def calculator_page(request):
     """Renderiza a página da Calculadora Dutching."""
     return render(request, 'tips_core/dutching_calculator.html', {
@@ -260,50 +293,114 @@ def go_to_premium(request):
         return redirect('login') 
 
 
+TIPS_PREMIUM_POR_PAGINA = 24
+
+
+EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _codificar_cursor(tip):
+    """Cursor opaco da última tip da página: "<match_date em microssegundos>-<id>" (aritmética inteira, sem arredondar)."""
+    return f"{(tip.match_date - EPOCA) // timedelta(microseconds=1)}-{tip.id}"
+
+
+def _decodificar_cursor(cursor):
+    try:
+        micros, tip_id = (int(parte) for parte in cursor.split('-', 1))
+        return EPOCA + timedelta(microseconds=micros), tip_id
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def _pagina_premium(cursor):
+    """
+    Paginação por chave (keyset) em (match_date, id): cada página é um
+    "WHERE (match_date, id) < cursor ORDER BY ... LIMIT n" sobre o índice
+    tip_ativa_acesso_data_idx, com o mesmo custo na 1ª ou na milésima página.
+    """
+    tips = Tip.objects.filter(access_level='PREMIUM', is_active=True).select_related(
+        'home_team', 'away_team',
+    ).order_by('-match_date', '-id')
+
+    posicao = _decodificar_cursor(cursor) if cursor else None
+    if posicao:
+        data, tip_id = posicao
+        tips = tips.filter(Q(match_date__lt=data) | Q(match_date=data, id__lt=tip_id))
+
+    # Um a mais só para saber se existe próxima página
+    tips = list(tips[:TIPS_PREMIUM_POR_PAGINA + 1])
+    proximo = None
+    if len(tips) > TIPS_PREMIUM_POR_PAGINA:
+        tips = tips[:TIPS_PREMIUM_POR_PAGINA]
+        proximo = _codificar_cursor(tips[-1])
+    return tips, proximo
+
+
 @login_required
 def premium_tips(request):
     """
     Página de tips premium. Acessível apenas para membros premium.
     """
-    # FORÇA O RECARREGAMENTO DO OBJETO USUÁRIO DO BANCO DE DADOS
-    try:
-        user = request.user.__class__.objects.get(pk=request.user.pk)
-    except Exception:
-        user = request.user 
-        
-    # Verifica o status atual
-    if not user.is_premium_member:
+    # O usuário já vem do banco a cada requisição; a validade é checada pela data
+    if not request.user.premium_ativo:
         messages.error(request, "Você precisa ser um membro Premium para acessar este conteúdo.")
         return redirect('access_denied')
         
     # AQUI: Filtro adicionado para garantir que só tips ativas (is_active=True) sejam mostradas
-    premium_tips = Tip.objects.filter(access_level='PREMIUM', is_active=True).order_by('-match_date')
+    tips, proximo = _pagina_premium(request.GET.get('antes'))
     
     return render(request, 'tips_core/premium_tips.html', {
         'title': 'Tips Premium Exclusivas',
-        'tips': premium_tips,
+        'tips': tips,
+        'proximo': proximo,
+    })
+
+
+@login_required
+def premium_tips_json(request):
+    """Próximo lote de tips premium para a rolagem infinita (HTML dos cards + cursor)."""
+    if not request.user.premium_ativo:
+        return JsonResponse({'erro': 'Acesso exclusivo para membros Premium.'}, status=403)
+
+    tips, proximo = _pagina_premium(request.GET.get('antes'))
+    html = ''.join(
+        render_to_string('tips_core/includes/tip_premium_card.html', {'tip': tip}, request=request)
+        for tip in tips
+    )
+    return JsonResponse({
+        'tips': [
+            {
+                'id': tip.id,
+                # Time sem cadastro (FK nula) vai como null, como o card mostra vazio
+                'home_team': tip.home_team.name if tip.home_team else None,
+                'away_team': tip.away_team.name if tip.away_team else None,
+                'league': tip.league,
+                'match_date': tip.match_date.isoformat(),
+                'method': tip.get_method_display(),
+                'odd_value': str(tip.odd_value),
+                'status': tip.status,
+            }
+            for tip in tips
+        ],
+        'html': html,
+        'proximo': proximo,
     })
 
 
+PLANOS_CACHE_TTL = 3600
+
+
+@cache_pagina_anonima('planos')
 def choose_plan(request):
     """
-    Página que permite ao usuário escolher entre 3 planos de assinatura.
-    AGORA: Adiciona as URLs do PagSeguro do settings.py.
+    Página que permite ao usuário escolher entre os planos de assinatura.
+    Os planos vêm da tabela Plan, em cache até algum plano ser alterado.
     """
-    plans = [
-        {'id': 1, 'name': 'Plano Mensal', 'duration': 1, 'price': 'R$ 50,00'},
-        {'id': 3, 'name': 'Plano Trimestral', 'duration': 3, 'price': 'R$ 120,00'},
-        {'id': 6, 'name': 'Plano Semestral', 'duration': 6, 'price': 'R$ 185,00'},
-    ]
-    
-    # PASSO CHAVE: Acessa o dicionário de URLs do PagSeguro
-    pagseguro_urls = settings.PAGSEGURO_PLAN_URLS 
-    
-    # Itera sobre os planos e adiciona a URL correspondente
-    for plan in plans:
-        # Usa o 'id' do plano (1, 3, ou 6) para buscar a URL correta
-        # Adiciona a URL do PagSeguro como uma nova chave no dicionário do plano
-        plan['pagseguro_url'] = pagseguro_urls.get(plan['id'])
+    chave = cache_versionado.chave('planos')
+    plans = cache.get(chave)
+    if plans is None:
+        plans = list(Plan.objects.filter(ativo=True))
+        cache.set(chave, plans, PLANOS_CACHE_TTL)
         
     context = {
         'title': 'Escolha seu Plano Premium',
@@ -312,6 +409,32 @@ def choose_plan(request):
     return render(request, 'tips_core/choose_plan.html', context)
 
 
+# ----------------------------------------------------------------------
+#   PAGSEGURO WEBHOOK (Notificação de Transação)
+# ----------------------------------------------------------------------
+@csrf_exempt
+def pagseguro_notificacao(request):
+    """
+    Só guarda a notificação na caixa de entrada e responde 200 na hora.
+    A consulta ao PagSeguro e a atualização da assinatura ficam com o
+    comando processar_notificacoes. Reenvios do mesmo código são ignorados.
+    """
+    if request.method != 'POST':
+        return HttpResponse('Apenas requisições POST são permitidas.', status=405)
+
+    codigo = request.POST.get('notificationCode', '').strip()
+    tipo = request.POST.get('notificationType', '')
+
+    if not codigo or tipo != 'transaction' or len(codigo) > 100:
+        return HttpResponse('Notificação Inválida', status=400)
+
+    NotificacaoPagSeguro.objects.bulk_create(
+        [NotificacaoPagSeguro(codigo=codigo, tipo=tipo)], ignore_conflicts=True,
+    )
+    # O PagSeguro/PagBank espera um HTTP 200 para não reenviar
+    return HttpResponse('OK', status=200)
+
+
 def confirm_payment(request, username):
     """
     Simula o Webhook/Retorno do PagBank e ativa/desativa o Premium.
@@ -324,15 +447,19 @@ def confirm_payment(request, username):
         messages.error(request, "Erro: Usuário não encontrado para ativar a assinatura.")
         return redirect('home')
         
-    if user.is_premium_member:
+    if user.premium_ativo:
         messages.info(request, "Sua assinatura já está ativa!")
         return redirect('premium_tips_content')
 
+    # Ativação manual: registra um período do plano mais curto no histórico
+    plano = Plan.objects.filter(ativo=True).order_by('duracao_dias').first()
+    if plano is None:
+        messages.error(request, "Erro: nenhum plano ativo para ativar a assinatura.")
+        return redirect('home')
+
     try:
         with transaction.atomic():
-            user.is_premium_member = True
-            user.premium_expiration_date = datetime.now().date() + timedelta(days=30)
-            user.save()
+            SubscriptionPeriod.registrar(user, plano, origem='MANUAL')
             
             update_session_auth_hash(request, user) 
 
@@ -349,86 +476,84 @@ def confirm_payment(request, username):
 # --- NOVAS VIEWS: ABA DE DADOS DOS TIMES (ENCICLOPÉDIA) ---
 # ----------------------------------------------------------------
 
+TIMES_POR_PAGINA = 50
+
+
 @login_required
 def lista_times(request):
+    """
+    Lista os times com último método e odd média lidos de TeamStats,
+    mantida pelos signals da Tip: uma consulta por página, sem agregar
+    as Tips de cada time a cada acesso.
+    """
     search_query = request.GET.get('search', '')
 
-    # Subquery para buscar o método da última Tip
-    ultima_tip_subquery = Tip.objects.filter(
-        Q(home_team=OuterRef('pk')) | Q(away_team=OuterRef('pk'))
-    ).order_by('-match_date').values('method')[:1]
-
-    times = Team.objects.all()
+    times = Team.objects.select_related('stats').order_by('name', 'pk')
 
     if search_query:
-        times = times.filter(name__icontains=search_query)
+        # Busca sem acento/maiúsculas; mantém a ordem por relevância do buscar()
+        # (e a similaridade de trigramas no Postgres)
+        times = times.buscar(search_query)
 
-    # Corrigindo a mistura de tipos (Mixed Types) usando output_field
-    times = times.annotate(
-        ultimo_metodo_code=Subquery(ultima_tip_subquery),
-        odd_media=(
-            Coalesce(Avg('home_matches__odd_value'), 0, output_field=DecimalField()) + 
-            Coalesce(Avg('away_matches__odd_value'), 0, output_field=DecimalField())
-        ) / 2
-    ).order_by('name')
+    pagina = Paginator(times, TIMES_POR_PAGINA).get_page(request.GET.get('pagina'))
 
     # Mapeamento para nomes amigáveis
     method_dict = dict(METHOD_CHOICES)
-    for time in times:
-        time.ultimo_metodo_display = method_dict.get(time.ultimo_metodo_code, "--")
+    for time in pagina:
+        stats = getattr(time, 'stats', None)
+        time.ultimo_metodo_display = method_dict.get(stats.ultimo_metodo, "--") if stats else "--"
+        time.odd_media = stats.odd_media if stats else 0
 
     context = {
-        'times': times,
+        'times': pagina,
+        'search_query': search_query,
         'title': 'Banco de Dados de Performance'
     }
     
     return render(request, 'tips_core/lista_times.html', context)
 
+JOGOS_POR_PAGINA_TIME = 25
+
+
 @login_required
 def detalhes_time(request, team_id):
-    """Calcula estatísticas de um time capturando todos os tipos de resultados."""
+    """
+    Calcula estatísticas de um time capturando todos os tipos de resultados.
+    Vitórias, empates, derrotas e gols saem de uma única agregação no banco
+    (perspectiva de mandante ou visitante), e o histórico é paginado.
+    """
     time = get_object_or_404(Team, pk=team_id)
     
     # BUSCA AMPLIADA: Pega todos os jogos onde o time participou (Mandante ou Visitante)
     # Removemos a exigência estrita de score_home__isnull para capturar mais dados
     jogos = Tip.objects.filter(
         Q(home_team=time) | Q(away_team=time)
-    ).order_by('-match_date')
-
-    vitorias = 0
-    derrotas = 0
-    empates = 0
-    gols_pro = 0
-    gols_contra = 0
-
-    for jogo in jogos:
-        # Só processamos o cálculo se houver números nos campos de gols
-        if jogo.score_home is not None and jogo.score_away is not None:
-            if jogo.home_team == time:
-                gols_pro += jogo.score_home
-                gols_contra += jogo.score_away
-                if jogo.score_home > jogo.score_away: vitorias += 1
-                elif jogo.score_home < jogo.score_away: derrotas += 1
-                else: empates += 1
-            else: # Time era visitante
-                gols_pro += jogo.score_away
-                gols_contra += jogo.score_home
-                if jogo.score_away > jogo.score_home: vitorias += 1
-                elif jogo.score_away < jogo.score_home: derrotas += 1
-                else: empates += 1
+    )
+
+    # Só entram no cálculo os jogos com números nos campos de gols
+    com_placar = Q(score_home__isnull=False, score_away__isnull=False)
+    em_casa = com_placar & Q(home_team=time)
+    fora = com_placar & ~Q(home_team=time)  # Time era visitante
+
+    stats = jogos.aggregate(
+        total=Count('id'),
+        vitorias=Count('id', filter=(em_casa & Q(score_home__gt=F('score_away'))) | (fora & Q(score_away__gt=F('score_home')))),
+        derrotas=Count('id', filter=(em_casa & Q(score_home__lt=F('score_away'))) | (fora & Q(score_away__lt=F('score_home')))),
+        empates=Count('id', filter=com_placar & Q(score_home=F('score_away'))),
+        gols_pro=Coalesce(Sum(Case(When(em_casa, then=F('score_home')), When(fora, then=F('score_away')))), 0),
+        gols_contra=Coalesce(Sum(Case(When(em_casa, then=F('score_away')), When(fora, then=F('score_home')))), 0),
+    )
+    stats['saldo'] = stats['gols_pro'] - stats['gols_contra']
+
+    jogos_pagina = Paginator(
+        jogos.select_related('home_team', 'away_team').order_by('-match_date', '-id'),
+        JOGOS_POR_PAGINA_TIME,
+    ).get_page(request.GET.get('pagina'))
 
     context = {
         'time': time,
-        'jogos': jogos,
+        'jogos': jogos_pagina,
         'title': f'Estatísticas: {time.name}',
-        'stats': {
-            'vitorias': vitorias,
-            'derrotas': derrotas,
-            'empates': empates,
-            'gols_pro': gols_pro,
-            'gols_contra': gols_contra,
-            'saldo': gols_pro - gols_contra,
-            'total': jogos.count()
-        }
+        'stats': stats,
     }
     return render(request, 'tips_core/detalhes_time.html', context)
\ No newline at end of file
@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.humanize', # Adicionado para filtros de template
     'django.contrib.sitemaps', # Se você estiver usando para sitemaps, senão remova
+    'django.contrib.postgres', # Lookups trigram_similar/TrigramSimilarity da busca de times
     # ... (Se houver outros apps de contrib, mantenha-os)
 
     # Apps do projeto
@@ -95,6 +96,60 @@ if os.environ.get('DATABASE_URL'):
         conn_health_checks=True,
     )
 
+# CACHE
+# Em produção (DEBUG desligado ou banco do Render) o cache é sempre o
+# DatabaseCache, compartilhado entre os workers, o cron e as threads: as
+# invalidações feitas num processo valem para todos. A tabela é criada pela
+# migração 0024 (createcachetable); sem ela o cache falha com erro de banco,
+# nunca volta em silêncio para um cache local. O LocMemCache (por processo)
+# fica só para o desenvolvimento local.
+CACHE_TABLE = os.environ.get('DJANGO_CACHE_TABLE', 'tipsgolbr_cache')
+
+if not DEBUG or os.environ.get('DATABASE_URL') or os.environ.get('DJANGO_CACHE_TABLE'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': CACHE_TABLE,
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'tipsgolbr',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# VERSÃO DO DEPLOY
+# Entra nas chaves dos fragmentos de template e no ETag das páginas em cache:
+# cada deploy (commit) usa chaves novas. Tem de ser igual em todos os workers,
+# então vem do commit (Render ou .git local) e nunca da hora de início do processo.
+def _commit_do_git():
+    git = BASE_DIR / '.git'
+    try:
+        head = (git / 'HEAD').read_text().strip()
+        if not head.startswith('ref: '):
+            return head
+        ref = head[5:]
+        if (git / ref).exists():
+            return (git / ref).read_text().strip()
+        for linha in (git / 'packed-refs').read_text().splitlines():
+            if linha.endswith(' ' + ref):
+                return linha.split(' ', 1)[0]
+    except OSError:
+        pass
+    return ''
+
+
+DEPLOY_VERSION = (
+    os.environ.get('DEPLOY_VERSION')
+    or os.environ.get('RENDER_GIT_COMMIT')
+    or _commit_do_git()
+    or 'dev'
+)[:12]
+
 # PASSWORDS
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -113,7 +168,13 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# STATICFILES_STORAGE deixou de existir no Django 5.1: o storage vai em STORAGES.
+# O do tips_core é o CompressedManifestStaticFilesStorage do WhiteNoise mais a
+# otimização das imagens (ver tips_core/storage.py).
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'tips_core.storage.StaticOtimizadoStorage'},
+}
 
 # Só mantenha essa linha se essa pasta realmente EXISTIR
 STATICFILES_DIRS = [
@@ -124,6 +185,10 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Variantes (WebP/AVIF) dos escudos e banners: geradas num pool de threads após o upload
+IMAGENS_EM_SEGUNDO_PLANO = True
+IMAGENS_WORKERS = 2
+
 
 # DEFAULT PK
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -141,3 +206,11 @@ PAGSEGURO_PLAN_URLS = {
     3: "https://pag.ae/81femFKQr",
     6: "https://pag.ae/81fej-om6",
 }
+
+# Credenciais e endpoint da consulta de notificações (webhook -> processar_notificacoes)
+PAGSEGURO_SELLER_EMAIL = os.environ.get('PAGSEGURO_SELLER_EMAIL', '')
+PAGSEGURO_TOKEN = os.environ.get('PAGSEGURO_TOKEN', '')
+PAGSEGURO_NOTIFICATION_URL = os.environ.get(
+    'PAGSEGURO_NOTIFICATION_URL',
+    'https://ws.pagseguro.uol.com.br/v3/transactions/notifications/'
+)